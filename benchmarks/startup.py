@@ -0,0 +1,96 @@
+"""Startup time of the CLI and the heaviest imports.
+
+Each command runs in a fresh interpreter and the best of ``--repeat`` runs is
+compared to its budget; the script exits non-zero if any is over budget.  The
+dry run uses a local SQLite warehouse in a temporary directory, created by
+the ``SETUP`` commands first as dry runs don't create one.
+
+A dry run generates DataFrames with factory-boy from keys read through
+SQLAlchemy, so it can't start faster than those imports (about 1.4s on a
+single slow core, pandas alone is half of it).  Its time over that floor,
+which is what dbt-faker itself adds, has a budget of its own.
+
+    python benchmarks/startup.py
+"""
+# stdlib
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name: (python arguments, budget in seconds); {warehouse} is the path of
+# the local warehouse
+CHECKS = {
+    'cli_help': (['-m', 'dbt_faker', '--help'], 0.5),
+    'import_db_base': (['-c', 'import dbt_faker.db.base'], 0.75),
+    'import_orms': (['-c', 'import dbt_faker.orms.tpch'], 1.0),
+    'import_dependencies': (['-c', 'import factory, pandas, sqlalchemy.orm'], 2.0),
+    'dry_run': ([
+        '-m', 'dbt_faker', 'generate', '--dry-run', '--rows', '100',
+        '--local', '{warehouse}',
+    ], 2.0),
+}
+
+# Untimed commands run once before the checks
+SETUP = [
+    ['-m', 'dbt_faker', 'generate', '--rows', '100', '--local', '{warehouse}'],
+]
+
+# name: (check, baseline check, budget in seconds) of the time a check takes
+# over its baseline
+OVERHEAD_CHECKS = {
+    'dry_run_overhead': ('dry_run', 'import_dependencies', 0.5),
+}
+
+
+def time_command(args, repeat):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.pop('WAREHOUSE_URL', None)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *args], env=env, check=True,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        warehouse = os.path.join(directory, 'warehouse.db')
+        for command in SETUP:
+            time_command([arg.format(warehouse=warehouse) for arg in command], 1)
+        for name, (command, budget) in CHECKS.items():
+            command = [arg.format(warehouse=warehouse) for arg in command]
+            seconds = time_command(command, args.repeat)
+            results[name] = {
+                'seconds': round(seconds, 4),
+                'budget': budget,
+                'ok': seconds <= budget,
+            }
+    for name, (check, baseline, budget) in OVERHEAD_CHECKS.items():
+        seconds = results[check]['seconds'] - results[baseline]['seconds']
+        results[name] = {
+            'seconds': round(seconds, 4),
+            'budget': budget,
+            'ok': seconds <= budget,
+        }
+    print(json.dumps(results, indent=2))
+    return 0 if all(result['ok'] for result in results.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,348 @@
+"""Throughput benchmarks for generation, updates and loading.
+
+SQLite and DuckDB databases stand in for the warehouse and parent key pools
+are primed with synthetic keys, so no warehouse credentials are needed.
+Every case runs in a fresh interpreter so its peak RSS is its own.  Results
+are written as JSON and two result files can be compared:
+
+    python benchmarks/suite.py --output before.json
+    python benchmarks/suite.py --output after.json --sizes 10000 100000
+    python benchmarks/suite.py --compare before.json after.json
+"""
+# stdlib
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FACTORIES = [
+    'RegionFactory',
+    'NationFactory',
+    'SupplierFactory',
+    'CustomerFactory',
+    'PartFactory',
+    'PartSuppFactory',
+    'OrderFactory',
+    'LineItemFactory',
+]
+SIZES = [10_000, 100_000, 1_000_000]
+BACKENDS = ['sqlite', 'duckdb']
+LOADERS = ['to_sql', 'stage']
+
+# Metrics where a higher value is better, used when comparing runs
+HIGHER_IS_BETTER = {'rows_per_sec', 'mb_per_sec'}
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def stand_in(backend: str, directory: str):
+    """Register a local database as the warehouse and create the TPCH
+    tables in it."""
+    # first party
+    from dbt_faker.db.local import use_local_warehouse
+    from dbt_faker.orms import tpch
+
+    extensions = {'sqlite': 'db', 'duckdb': 'duckdb'}
+    if backend not in extensions:
+        raise ValueError(f'Unknown backend {backend}')
+    return use_local_warehouse(
+        os.path.join(directory, f'warehouse.{extensions[backend]}'),
+        tpch.TpchSchemaMixin.__subclasses__(),
+    )
+
+
+def prime_key_pools(pool_size: int):
+    """Fill the key pool cache with keys 1..pool_size for every parent
+    table, instead of sampling the warehouse."""
+    # first party
+    from dbt_faker.factories import tpch
+    from dbt_faker.factories.common import RandomLazyFunction
+    from dbt_faker.factories.key_pools import key_pool_cache
+
+    for name in FACTORIES:
+        declarations = getattr(tpch, name)._meta.pre_declarations.declarations
+        for declaration in declarations.values():
+            if isinstance(declaration, RandomLazyFunction):
+                getter = declaration.function
+                key_pool_cache.get(
+                    getter.model, getter.primary_key, getter.sample,
+                    lambda *args: range(1, pool_size + 1),
+                )
+
+
+def bench_generate(case, directory):
+    # first party
+    from dbt_faker.factories import tpch
+    from dbt_faker.factories.columnar import factory_to_chunks, factory_to_df
+    from dbt_faker.factories.common import factory_to_dict
+
+    stand_in('sqlite', directory)
+    prime_key_pools(case['pool_size'])
+    factory_class = getattr(tpch, case['factory'])
+    rows = case['rows']
+
+    gc.collect()
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if case['method'] == 'dict':
+        generated = len(factory_to_dict(factory_class, rows))
+    elif case['method'] == 'df':
+        generated = len(factory_to_df(factory_class, rows))
+    else:
+        generated = sum(
+            len(df) for df in factory_to_chunks(factory_class, rows, 50_000)
+        )
+    elapsed = time.perf_counter() - start
+
+    return {
+        'seconds': elapsed,
+        'rows_per_sec': generated / elapsed,
+        'baseline_rss_mb': baseline,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def bench_update(case, directory):
+    # first party
+    from dbt_faker.etl.common import (
+        dataframe_to_sql,
+        get_ids_to_update,
+        update_rows,
+    )
+    from dbt_faker.factories import tpch
+    from dbt_faker.factories.columnar import factory_to_df
+    from dbt_faker.orms import tpch as tpch_orms
+
+    engine = stand_in(case['backend'], directory)
+    table = tpch_orms.Part.__table__
+    dataframe_to_sql(
+        factory_to_df(tpch.PartFactory, case['table_rows']), engine,
+        table.name, 'TPCH',
+    )
+
+    phases = {'sample': [], 'generate': [], 'update': [], 'total': []}
+    orm_config = {'update_rows': (case['rows'], case['rows'])}
+    for _ in range(case['repeat']):
+        start = time.perf_counter()
+        ids = get_ids_to_update(table, engine, orm_config, 'p_partkey')
+        sampled = time.perf_counter()
+        df = factory_to_df(tpch.PartFactory, len(ids))
+        df['p_partkey'] = ids
+        generated = time.perf_counter()
+        with engine.begin() as conn:
+            update_rows(
+                conn, table, df, 'p_partkey',
+                ['p_retailprice', '_etl_updated_timestamp'],
+            )
+        end = time.perf_counter()
+        phases['sample'].append(sampled - start)
+        phases['generate'].append(generated - sampled)
+        phases['update'].append(end - generated)
+        phases['total'].append(end - start)
+
+    result = {}
+    for phase, timings in phases.items():
+        timings = sorted(timings)
+        result[f'{phase}_p50_ms'] = statistics.median(timings) * 1000
+        result[f'{phase}_p95_ms'] = (
+            timings[min(len(timings) - 1, int(len(timings) * .95))] * 1000
+        )
+    return result
+
+
+def bench_load(case, directory):
+    # first party
+    from dbt_faker.etl.common import dataframe_to_sql
+    from dbt_faker.factories import tpch
+    from dbt_faker.factories.columnar import factory_to_df
+
+    engine = stand_in(case['backend'], directory)
+    prime_key_pools(case['pool_size'])
+    df = factory_to_df(tpch.LineItemFactory, case['rows'])
+    megabytes = df.memory_usage(index=False, deep=True).sum() / 1e6
+
+    start = time.perf_counter()
+    loaded = dataframe_to_sql(
+        df, engine, 'lineitem', 'TPCH', loader=case['loader'],
+    )
+    elapsed = time.perf_counter() - start
+    return {
+        'seconds': elapsed,
+        'rows_per_sec': loaded / elapsed,
+        'mb_per_sec': megabytes / elapsed,
+    }
+
+
+BENCHMARKS = {
+    'generate': bench_generate,
+    'update': bench_update,
+    'load': bench_load,
+}
+
+
+def run_case(case):
+    """Run ``case`` in a fresh interpreter and return its metrics."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    proc = subprocess.run(
+        [sys.executable, __file__, '--case', json.dumps(case)],
+        env=env, capture_output=True, text=True,
+    )
+    if proc.returncode:
+        return {'error': proc.stderr.strip().splitlines()[-1]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _backend_available(backend: str) -> bool:
+    if backend != 'duckdb':
+        return True
+    try:
+        # Only imported to check the SQLAlchemy duckdb dialect is installed
+        import duckdb_engine  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def plan(args):
+    cases = []
+    for factory_name in args.factories:
+        for rows in args.sizes:
+            methods = ['chunks', 'df']
+            if rows <= args.dict_max_rows:
+                methods.append('dict')
+            for method in methods:
+                cases.append({
+                    'benchmark': 'generate',
+                    'factory': factory_name,
+                    'rows': rows,
+                    'method': method,
+                    'pool_size': args.pool_size,
+                })
+    for backend in args.backends:
+        if not _backend_available(backend):
+            continue
+        cases.append({
+            'benchmark': 'update',
+            'backend': backend,
+            'table_rows': args.update_table_rows,
+            'rows': args.update_rows,
+            'repeat': args.repeat,
+        })
+        for loader in LOADERS:
+            cases.append({
+                'benchmark': 'load',
+                'backend': backend,
+                'loader': loader,
+                'rows': args.load_rows,
+                'pool_size': args.pool_size,
+            })
+    return cases
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+            text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _case_key(case):
+    return json.dumps(
+        {k: v for k, v in case.items() if k != 'metrics'}, sort_keys=True
+    )
+
+
+def compare(before_path, after_path):
+    with open(before_path) as f:
+        before = {_case_key(case): case for case in json.load(f)['results']}
+    with open(after_path) as f:
+        after = json.load(f)['results']
+
+    for case in after:
+        previous = before.get(_case_key(case))
+        if previous is None:
+            continue
+        label = ' '.join(
+            str(v) for k, v in case.items() if k not in ('metrics', 'pool_size')
+        )
+        for metric, value in case['metrics'].items():
+            old = previous['metrics'].get(metric)
+            if not isinstance(value, (int, float)) or not old:
+                continue
+            change = value / old
+            if metric not in HIGHER_IS_BETTER:
+                change = 1 / change if change else float('inf')
+            print(f'{label:<50} {metric:<18} {old:>12.2f} -> {value:>12.2f}  {change:.2f}x')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'))
+    parser.add_argument('--output', help='Write the results to this file')
+    parser.add_argument('--factories', nargs='+', default=FACTORIES)
+    parser.add_argument('--sizes', nargs='+', type=int, default=SIZES)
+    parser.add_argument('--backends', nargs='+', default=BACKENDS)
+    parser.add_argument(
+        '--dict-max-rows', type=int, default=10_000,
+        help='Largest size also generated with factory_to_dict',
+    )
+    parser.add_argument('--pool-size', type=int, default=10_000)
+    parser.add_argument('--update-table-rows', type=int, default=100_000)
+    parser.add_argument('--update-rows', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--load-rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    if args.case:
+        case = json.loads(args.case)
+        with tempfile.TemporaryDirectory() as directory:
+            metrics = BENCHMARKS[case['benchmark']](case, directory)
+        print(json.dumps(metrics))
+        return 0
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    results = []
+    for case in plan(args):
+        case['metrics'] = run_case(case)
+        print(json.dumps(case), file=sys.stderr)
+        results.append(case)
+
+    report = {
+        'commit': _git_commit(),
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return 1 if any('error' in case['metrics'] for case in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
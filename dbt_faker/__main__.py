@@ -0,0 +1,4 @@
+from dbt_faker.cli import main
+
+
+main()
@@ -0,0 +1,400 @@
+# stdlib
+import argparse
+import datetime
+import re
+import sys
+from typing import List, Optional, Tuple
+
+# Only the standard library is imported at module level so ``--help`` and
+# argument errors don't pay for pandas, factory-boy or the warehouse dialect.
+
+
+COMMANDS = ('run', 'generate', 'update', 'backfill', 'snapshot', 'list')
+
+_SIZE_UNITS = {
+    '': 1,
+    'b': 1,
+    'kb': 10 ** 3,
+    'mb': 10 ** 6,
+    'gb': 10 ** 9,
+    'tb': 10 ** 12,
+    'kib': 2 ** 10,
+    'mib': 2 ** 20,
+    'gib': 2 ** 30,
+    'tib': 2 ** 40,
+}
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'Invalid shard {value}, expected i/N')
+    if not 0 <= index < count:
+        raise argparse.ArgumentTypeError(
+            f'Invalid shard {value}, expected i/N with 0 <= i < N'
+        )
+    return index, count
+
+
+def parse_size(value: str) -> int:
+    """Parse a byte size such as ``500MB``, ``2GiB`` or ``1000``."""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([a-zA-Z]*)\s*', value)
+    unit = match and match.group(2).lower()
+    if not match or unit not in _SIZE_UNITS:
+        raise argparse.ArgumentTypeError(
+            f'Invalid size {value}, expected e.g. 500MB or 2GiB'
+        )
+    return int(float(match.group(1)) * _SIZE_UNITS[unit])
+
+
+def parse_date(value: str) -> datetime.date:
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'Invalid date {value}, expected YYYY-MM-DD')
+
+
+def parse_statsd(value: str) -> Tuple[str, int]:
+    host, _, port = value.partition(':')
+    try:
+        return host or 'localhost', int(port or 8125)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'Invalid StatsD address {value}')
+
+
+def _positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'Expected a positive integer, got {value}')
+    return number
+
+
+def _add_selection(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        '--source', action='append', dest='sources', metavar='SOURCE',
+        help='Only this ETL source (schema name); may be repeated',
+    )
+    parser.add_argument(
+        '--table', action='append', dest='tables', metavar='TABLE',
+        help='Only this table; may be repeated',
+    )
+
+
+def _add_metrics_options(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        '--metrics-json', metavar='PATH',
+        help='Write a JSON report of the time, rows and bytes of each stage',
+    )
+    parser.add_argument(
+        '--prometheus-textfile', metavar='PATH',
+        help='Write the run metrics for the node_exporter textfile collector',
+    )
+    parser.add_argument(
+        '--statsd', type=parse_statsd, metavar='HOST[:PORT]',
+        help='Send the run metrics to StatsD',
+    )
+
+
+def _add_profile_options(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        '--profile', action='store_true',
+        help='Rank factory declarations by time spent per row; runs tables '
+             'one at a time',
+    )
+    parser.add_argument(
+        '--profile-allocations', action='store_true',
+        help='Like --profile, also tracing memory allocated per row (slow)',
+    )
+
+
+def _add_warehouse_options(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        '--local', metavar='PATH',
+        help='Use a local DuckDB (.duckdb) or SQLite (.db) file as the '
+             'warehouse, creating the tables on first use; dry runs open an '
+             'existing one read-only',
+    )
+
+
+def _add_sink_options(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        '--sink', metavar='DIR',
+        help='Write the new rows to files in DIR instead of the warehouse; '
+             'nothing is updated',
+    )
+    parser.add_argument(
+        '--sink-format', choices=('parquet', 'csv'), default='parquet',
+        help='File format of --sink (default: parquet)',
+    )
+    parser.add_argument(
+        '--partition-by', metavar='COLUMN', default='_etl_updated_timestamp',
+        help='Partition --sink files on the date of COLUMN '
+             '(default: _etl_updated_timestamp)',
+    )
+    parser.add_argument(
+        '--max-file-size', type=parse_size, default='128MiB', metavar='SIZE',
+        help='Start a new --sink file once one reaches SIZE (default: 128MiB)',
+    )
+
+
+def _add_run_options(parser: argparse.ArgumentParser, rows_help: str):
+    _add_selection(parser)
+    _add_warehouse_options(parser)
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument('--rows', type=_positive_int, help=rows_help)
+    size.add_argument(
+        '--bytes', type=parse_size, dest='target_bytes', metavar='SIZE',
+        help='Size the new rows of each source to about SIZE in memory, '
+             'e.g. 500MB',
+    )
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help='Generate the rows without writing them to the warehouse; '
+             'parent keys and sequences are still read from it (or --local)',
+    )
+    parser.add_argument(
+        '--seed', type=int, default=None,
+        help='Seed for reproducible runs, overrides the seed of each ETL source',
+    )
+    parser.add_argument(
+        '--shard', type=parse_shard, default=(0, 1),
+        help='Only generate shard i of N (e.g. 0/4) of the batch; needs '
+             '--snapshot',
+    )
+    parser.add_argument(
+        '--snapshot', metavar='PATH',
+        help='Start from the sequences and parent keys of a batch snapshot '
+             'written by the snapshot command, so every shard generates the '
+             'same batch',
+    )
+    _add_sink_options(parser)
+    _add_metrics_options(parser)
+    _add_profile_options(parser)
+
+
+# Sequences are only reserved in-process, see ``SequenceAllocator``
+_CONCURRENT_WRITERS = (
+    'Keys are reserved in-process: running several processes that insert '
+    'into the same tables at once is not supported, use --shard and '
+    '--snapshot to split a batch instead.'
+)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='dbt-faker',
+        description='Generate fake data. Without a command, runs "run".',
+        epilog=_CONCURRENT_WRITERS,
+    )
+    commands = parser.add_subparsers(dest='command', metavar='command')
+
+    run = commands.add_parser(
+        'run', help='Update tables at their cadence and insert new rows',
+        epilog=_CONCURRENT_WRITERS,
+    )
+    _add_run_options(run, 'Insert exactly ROWS new rows in every table')
+    run.add_argument(
+        '--update-cadence', type=float, default=None, metavar='P',
+        help='Probability a table without its own cadence is updated',
+    )
+
+    generate = commands.add_parser(
+        'generate', help='Only insert new rows', epilog=_CONCURRENT_WRITERS,
+    )
+    _add_run_options(generate, 'Insert exactly ROWS new rows in every table')
+
+    update = commands.add_parser('update', help='Only update existing rows')
+    _add_selection(update)
+    _add_warehouse_options(update)
+    update.add_argument(
+        '--rows', type=_positive_int,
+        help='Update exactly ROWS rows of every table',
+    )
+    update.add_argument(
+        '--dry-run', action='store_true',
+        help='Generate the updates without writing them to the warehouse; '
+             'the rows to update are still sampled from it (or --local)',
+    )
+    update.add_argument('--seed', type=int, default=None)
+    _add_metrics_options(update)
+    _add_profile_options(update)
+
+    backfill = commands.add_parser(
+        'backfill',
+        help='Simulate the daily run over a range of past days in one go',
+        epilog=_CONCURRENT_WRITERS,
+    )
+    _add_selection(backfill)
+    _add_warehouse_options(backfill)
+    backfill.add_argument(
+        '--start', type=parse_date, required=True, metavar='YYYY-MM-DD',
+        help='First day to simulate',
+    )
+    backfill.add_argument(
+        '--end', type=parse_date, metavar='YYYY-MM-DD',
+        help='Last day to simulate (default: yesterday)',
+    )
+    size = backfill.add_mutually_exclusive_group()
+    size.add_argument(
+        '--rows', type=_positive_int,
+        help='Insert exactly ROWS new rows in every table every day',
+    )
+    size.add_argument(
+        '--bytes', type=parse_size, dest='target_bytes', metavar='SIZE',
+        help='Size the new rows of each source and day to about SIZE',
+    )
+    backfill.add_argument(
+        '--update-cadence', type=float, default=None, metavar='P',
+        help='Probability a table without its own cadence is updated each day',
+    )
+    backfill.add_argument(
+        '--batch-days', type=_positive_int, default=7, metavar='N',
+        help='Load the new rows of N days at a time (default: 7)',
+    )
+    backfill.add_argument('--seed', type=int, default=None)
+    _add_metrics_options(backfill)
+    _add_profile_options(backfill)
+
+    snapshot = commands.add_parser(
+        'snapshot',
+        help='Record where a sharded batch starts, for every shard to read',
+    )
+    snapshot.add_argument('path', metavar='PATH', help='File to write')
+    _add_selection(snapshot)
+    _add_warehouse_options(snapshot)
+    snapshot.add_argument(
+        '--seed', type=int, default=None,
+        help='Seed of the batch, overrides the seed of each ETL source',
+    )
+
+    list_ = commands.add_parser('list', help='List the sources and tables')
+    _add_selection(list_)
+    return parser
+
+
+def _list(selected):
+    for etl_source, config in selected:
+        print(etl_source['schema'])
+        for orm_config in config:
+            print(
+                f'  {orm_config["orm"].__tablename__:<12} '
+                f'{orm_config["perc_of_total_rows"]:>6.0%} of rows'
+            )
+
+
+def main(argv: Optional[List[str]] = None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] not in COMMANDS + ('-h', '--help'):
+        argv.insert(0, 'run')
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    from dbt_faker import main as runner
+
+    try:
+        selected = runner.select_sources(args.sources, args.tables)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.command == 'list':
+        _list(selected)
+        return
+
+    shard = getattr(args, 'shard', (0, 1))
+    if shard[1] > 1 and not args.snapshot:
+        parser.error('--shard needs --snapshot, see the snapshot command')
+
+    if args.local:
+        from dbt_faker.db.local import use_local_warehouse
+
+        dry_run = getattr(args, 'dry_run', False)
+        try:
+            use_local_warehouse(
+                args.local, runner.source_models(), create=not dry_run
+            )
+        except ValueError as e:
+            parser.error(str(e))
+        # Dry runs don't write, they need a warehouse seeded before
+        if not dry_run:
+            runner.seed_reference_tables()
+    else:
+        import sqlalchemy as sa
+
+        from dbt_faker.db.base import get_warehouse_engine
+
+        # Every command reads keys from the warehouse, dry runs included
+        try:
+            get_warehouse_engine()
+        except ValueError as e:
+            parser.error(f'{e}: set WAREHOUSE_URL or pass --local PATH')
+        except sa.exc.ArgumentError as e:
+            parser.error(f'Invalid WAREHOUSE_URL: {e}')
+
+    from dbt_faker.etl.snapshots import BatchSnapshot
+
+    if args.command == 'snapshot':
+        try:
+            batch = BatchSnapshot.take(selected, seed=args.seed)
+        except ValueError as e:
+            parser.error(str(e))
+        batch.write(args.path)
+        print(f'Batch snapshot written to {args.path}')
+        return
+
+    batch = None
+    if getattr(args, 'snapshot', None):
+        try:
+            batch = BatchSnapshot.read(args.snapshot)
+        except (OSError, ValueError, KeyError) as e:
+            parser.error(f'Invalid snapshot {args.snapshot}: {e}')
+        if args.seed is not None and args.seed != batch.seed:
+            parser.error(
+                f'--seed {args.seed} differs from the snapshot seed {batch.seed}'
+            )
+
+    sink = None
+    if getattr(args, 'sink', None):
+        from dbt_faker.etl.sinks import FileSink
+
+        sink = FileSink(
+            args.sink,
+            file_format=args.sink_format,
+            partition_by=args.partition_by,
+            max_file_bytes=args.max_file_size,
+        )
+
+    backfill = None
+    if args.command == 'backfill':
+        end = args.end or datetime.date.today() - datetime.timedelta(days=1)
+        if end < args.start:
+            parser.error(f'--end {end} is before --start {args.start}')
+        backfill = (args.start, end)
+
+    update_cadence = getattr(args, 'update_cadence', None)
+    runner.run(
+        command=args.command,
+        selected=selected,
+        rows=args.rows,
+        target_bytes=getattr(args, 'target_bytes', None),
+        update_cadence=(
+            update_cadence if update_cadence is not None
+            else runner.DEFAULT_UPDATE_CADENCE
+        ),
+        dry_run=getattr(args, 'dry_run', False),
+        seed=args.seed,
+        shard=shard,
+        metrics_json=args.metrics_json,
+        prometheus_textfile=args.prometheus_textfile,
+        statsd=args.statsd,
+        profile=args.profile,
+        profile_allocations=args.profile_allocations,
+        sink=sink,
+        backfill=backfill,
+        batch_days=getattr(args, 'batch_days', runner.DEFAULT_BACKFILL_BATCH_DAYS),
+        snapshot=batch,
+    )
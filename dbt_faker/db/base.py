@@ -1,6 +1,8 @@
 # stdlib
 import contextlib
 import os
+import threading
+from typing import Callable, Dict, Optional, Union
 
 # third party
 import sqlalchemy as sa
@@ -34,12 +36,49 @@ def create_engine(url: str) -> sa.engine.Engine:
     return engine
 
 
-_engine = create_engine(os.environ.get('WAREHOUSE_URL'))
+_engine_urls: Dict[str, Callable[[], Optional[str]]] = {}
+_engines: Dict[str, sa.engine.Engine] = {}
+_engines_lock = threading.Lock()
+
+
+def register_engine(name: str, url: Union[str, Callable[[], Optional[str]]]):
+    """Register a named engine.  It's only created the first time it's
+    requested; ``url`` may be a callable so it's read as late as possible."""
+    with _engines_lock:
+        _engine_urls[name] = url if callable(url) else (lambda: url)
+        stale = _engines.pop(name, None)
+    if stale is not None:
+        stale.dispose()
+
+
+def get_engine(name: str = 'warehouse') -> sa.engine.Engine:
+    """Get the named engine, creating it on first use."""
+    with _engines_lock:
+        if name not in _engines:
+            if name not in _engine_urls:
+                raise ValueError(f'No engine registered as "{name}"')
+            url = _engine_urls[name]()
+            if not url:
+                raise ValueError(f'No URL configured for the "{name}" engine')
+            _engines[name] = create_engine(url)
+        return _engines[name]
+
+
+def dispose_engines():
+    """Close the pools of every engine created so far."""
+    with _engines_lock:
+        engines = list(_engines.values())
+        _engines.clear()
+    for engine in engines:
+        engine.dispose()
+
+
+register_engine('warehouse', lambda: os.environ.get('WAREHOUSE_URL'))
 
 
 def get_warehouse_engine():
     """Get the snowflake engine."""
-    return _engine
+    return get_engine('warehouse')
 
 
 _session_binds = {}
@@ -0,0 +1,159 @@
+# stdlib
+from typing import Dict, List, Optional, Type
+
+# third party
+import sqlalchemy as sa
+
+
+# ORDER BY functions returning rows in random order
+RANDOM_FUNCTIONS = {
+    'duckdb': sa.func.random,
+    'mariadb': sa.func.rand,
+    'mssql': sa.func.newid,
+    'mysql': sa.func.rand,
+    'postgresql': sa.func.random,
+    'sqlite': sa.func.random,
+}
+
+
+class WarehouseDialect:
+    """The SQL the pipeline needs that differs between warehouses:
+    sampling, updating rows from a list of values and switching schema.
+
+    The base class sticks to SQL most databases share; statements a
+    dialect can't express are returned as None so callers fall back to
+    doing the work client side.
+    """
+
+    def __init__(self, dialect: sa.engine.Dialect):
+        self.dialect = dialect
+        self.preparer = dialect.identifier_preparer
+
+    @property
+    def name(self) -> str:
+        return self.dialect.name
+
+    def random(self) -> Optional[sa.sql.ColumnElement]:
+        function = RANDOM_FUNCTIONS.get(self.name)
+        return function() if function is not None else None
+
+    def sample(
+        self,
+        column: sa.Column,
+        percent: float = None,
+        rows: int = None,
+        seed: int = None,
+    ) -> Optional[sa.sql.Executable]:
+        """Select ``column`` of about ``percent`` percent of the rows of its
+        table, or of ``rows`` rows.  A ``seed`` makes the sample repeatable
+        for the same table contents."""
+        if rows is None and percent >= 100:
+            return sa.select(column)
+        if seed is not None or self.random() is None:
+            return None
+        if rows is not None:
+            return sa.select(column).order_by(self.random()).limit(rows)
+        return sa.select(column).where(self.random() < percent / 100)
+
+    def update_from_values(
+        self, table: sa.Table, columns: List[str], values: List[List[str]]
+    ) -> str:
+        """Update the rows of ``table`` matching the first of ``columns``
+        from ``values``, rows of bind parameter names (``:name``)."""
+        target = self.preparer.format_table(table)
+        quoted = [self.preparer.quote(col) for col in columns]
+        key, set_cols = quoted[0], quoted[1:]
+        # A union of selects names the columns portably, unlike VALUES
+        first, *rest = values
+        values_sql = ' union all '.join(
+            [f'select {", ".join(f"{n} as {c}" for n, c in zip(first, quoted))}']
+            + [f'select {", ".join(names)}' for names in rest]
+        )
+        return f'''
+            update {target}
+            set {', '.join(f'{col} = changed.{col}' for col in set_cols)}
+            from ({values_sql}) as changed
+            where {target}.{key} = changed.{key}
+        '''
+
+    def use_schema(self, schema: str) -> Optional[str]:
+        """Make ``schema`` the default for unqualified names, or None if
+        the dialect has no such notion."""
+        return f'set search_path to {self.preparer.quote_schema(schema)}'
+
+
+class SnowflakeDialect(WarehouseDialect):
+    def sample(self, column, percent=None, rows=None, seed=None):
+        if rows is None and percent >= 100:
+            return sa.select(column)
+        # Fixed size samples can't be seeded on Snowflake
+        method = f'{int(rows)} rows' if rows is not None else f'{percent}'
+        repeatable = f' seed ({int(seed)})' if seed is not None and rows is None else ''
+        return sa.text(
+            f'select {self.preparer.quote(column.name)} '
+            f'from {self.preparer.format_table(column.table)} '
+            f'sample ({method}){repeatable}'
+        ).columns(column)
+
+    def update_from_values(self, table, columns, values):
+        target = self.preparer.format_table(table)
+        quoted = [self.preparer.quote(col) for col in columns]
+        key, set_cols = quoted[0], quoted[1:]
+        values_sql = ', '.join(f'({", ".join(names)})' for names in values)
+        return f'''
+            merge into {target} as s
+            using (
+                select * from (values {values_sql}) as v ({', '.join(quoted)})
+            ) as changed
+            on s.{key} = changed.{key}
+            when matched then update set
+                {', '.join(f's.{col} = changed.{col}' for col in set_cols)}
+        '''
+
+    def use_schema(self, schema):
+        return f'use schema {self.preparer.quote_schema(schema)}'
+
+
+class DuckDBDialect(WarehouseDialect):
+    def sample(self, column, percent=None, rows=None, seed=None):
+        if rows is None and percent >= 100:
+            return sa.select(column)
+        method = (
+            f'reservoir({int(rows)} rows)' if rows is not None
+            else f'bernoulli({percent} percent)'
+        )
+        repeatable = f' repeatable ({int(seed)})' if seed is not None else ''
+        return sa.text(
+            f'select {self.preparer.quote(column.name)} '
+            f'from {self.preparer.format_table(column.table)} '
+            f'using sample {method}{repeatable}'
+        ).columns(column)
+
+    def use_schema(self, schema):
+        return f'use {self.preparer.quote_schema(schema)}'
+
+
+class SQLiteDialect(WarehouseDialect):
+    def sample(self, column, percent=None, rows=None, seed=None):
+        if rows is None and percent is not None and percent < 100 and seed is None:
+            # random() is a 64-bit integer on SQLite
+            return sa.select(column).where(
+                sa.func.abs(sa.func.random() % 1_000_000) < percent * 10_000
+            )
+        return super().sample(column, percent=percent, rows=rows, seed=seed)
+
+    def use_schema(self, schema):
+        # Schemas are attached databases, always named explicitly
+        return None
+
+
+DIALECTS: Dict[str, Type[WarehouseDialect]] = {
+    'snowflake': SnowflakeDialect,
+    'duckdb': DuckDBDialect,
+    'sqlite': SQLiteDialect,
+}
+
+
+def get_dialect(bind) -> WarehouseDialect:
+    """The ``WarehouseDialect`` of an engine or connection."""
+    return DIALECTS.get(bind.dialect.name, WarehouseDialect)(bind.dialect)
@@ -0,0 +1,168 @@
+# stdlib
+import logging
+import os
+from typing import Iterable, List
+
+# third party
+import sqlalchemy as sa
+
+# first party
+from .base import get_warehouse_engine, register_engine
+
+
+logger = logging.getLogger(__name__)
+
+# Local warehouse backends, keyed on file extension
+LOCAL_BACKENDS = {
+    '.duckdb': 'duckdb',
+    '.db': 'sqlite',
+    '.sqlite': 'sqlite',
+    '.sqlite3': 'sqlite',
+}
+
+
+def local_backend(path: str) -> str:
+    backend = LOCAL_BACKENDS.get(os.path.splitext(path)[1].lower())
+    if backend is None:
+        raise ValueError(
+            f'Unknown local warehouse {path}, expected a file ending in one '
+            f'of {", ".join(LOCAL_BACKENDS)}'
+        )
+    return backend
+
+
+def local_table(model, metadata: sa.MetaData) -> sa.Table:
+    """Copy of the table of ``model`` to create locally.
+
+    Foreign keys are left out: they're informational on Snowflake, and
+    DuckDB refuses to update rows other tables reference.  Keys are plain
+    integers as the sequence allocator hands them out.
+    """
+    table = model.__table__
+    return sa.Table(table.name, metadata, *(
+        sa.Column(
+            col.name,
+            col.type,
+            primary_key=col.primary_key,
+            nullable=col.nullable,
+            autoincrement=False,
+        )
+        for col in table.c
+    ), schema=table.schema)
+
+
+# How long SQLite waits on another process' write lock, e.g. of a shard
+SQLITE_BUSY_TIMEOUT_MS = 120_000
+
+
+# Engine URLs of the local backends, opened read-only or not
+_LOCAL_URLS = {
+    ('duckdb', False): 'duckdb:///{path}',
+    ('duckdb', True): 'duckdb:///{path}?access_mode=read_only',
+    ('sqlite', False): 'sqlite:///{path}',
+    ('sqlite', True): 'sqlite:///file:{path}?mode=ro&uri=true',
+}
+
+
+def _schema_path(path: str, schema: str) -> str:
+    # SQLite has no schemas, each one is a database file next to ``path``
+    return f'{os.path.splitext(path)[0]}.{schema.lower()}.db'
+
+
+def _attach_schemas(
+    engine: sa.engine.Engine,
+    path: str,
+    schemas: List[str],
+    read_only: bool = False,
+):
+    @sa.event.listens_for(engine, 'connect')
+    def attach(dbapi_connection, connection_record):
+        dbapi_connection.execute(f'pragma busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}')
+        for schema in schemas:
+            schema_path = _schema_path(path, schema)
+            if read_only:
+                schema_path = f'file:{schema_path}?mode=ro'
+            dbapi_connection.execute(
+                f"attach database '{schema_path}' as \"{schema}\""
+            )
+
+
+def create_local_tables(engine: sa.engine.Engine, models: Iterable) -> List[str]:
+    """Create the schemas and the missing tables of ``models``; returns the
+    names of the tables created."""
+    metadata = sa.MetaData()
+    tables = [local_table(model, metadata) for model in models]
+    if engine.dialect.name == 'duckdb':
+        with engine.begin() as conn:
+            for schema in sorted({t.schema for t in tables if t.schema}):
+                conn.exec_driver_sql(f'create schema if not exists "{schema}"')
+
+    inspector = sa.inspect(engine)
+    missing = [
+        table for table in tables
+        if not inspector.has_table(table.name, schema=table.schema)
+    ]
+    metadata.create_all(engine, tables=missing)
+    return [table.fullname for table in missing]
+
+
+def use_local_warehouse(
+    path: str, models: Iterable, create: bool = True
+) -> sa.engine.Engine:
+    """Use a local DuckDB or SQLite file as the warehouse, creating the
+    tables of ``models`` in it if they don't exist yet.
+
+    Tables start empty: the first ``generate`` seeds them, parents first,
+    as new keys are shared with the tables loaded after.
+
+    Without ``create`` (dry runs) the file is opened read-only and it must
+    have every table already.
+    """
+    models = list(models)
+    path = os.path.abspath(os.path.expanduser(path))
+    backend = local_backend(path)
+    schemas = sorted({
+        model.__table__.schema for model in models if model.__table__.schema
+    })
+    if not create:
+        files = [path] + (
+            [_schema_path(path, schema) for schema in schemas]
+            if backend == 'sqlite' else []
+        )
+        missing = [file for file in files if not os.path.exists(file)]
+        if missing:
+            raise ValueError(
+                f'Local warehouse {", ".join(missing)} not found, run without '
+                '--dry-run first to create it'
+            )
+    register_engine('warehouse', _LOCAL_URLS[backend, not create].format(path=path))
+    try:
+        engine = get_warehouse_engine()
+    except sa.exc.NoSuchModuleError:
+        raise ValueError(
+            f'No SQLAlchemy dialect for {backend}; install duckdb-engine to '
+            'use a DuckDB warehouse'
+        )
+
+    if backend == 'sqlite':
+        _attach_schemas(engine, path, schemas, read_only=not create)
+
+    if not create:
+        inspector = sa.inspect(engine)
+        missing = [
+            model.__table__.fullname for model in models
+            if not inspector.has_table(
+                model.__table__.name, schema=model.__table__.schema
+            )
+        ]
+        if missing:
+            raise ValueError(
+                f'Local warehouse {path} has no {", ".join(missing)} table, '
+                'run without --dry-run first to create it'
+            )
+        return engine
+
+    created = create_local_tables(engine, models)
+    if created:
+        logger.info(f'Created {", ".join(created)} in {path}')
+    return engine
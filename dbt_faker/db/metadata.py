@@ -0,0 +1,153 @@
+# stdlib
+import threading
+from functools import cached_property
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# third party
+import sqlalchemy as sa
+
+
+def _string_dtype():
+    # Imported here so importing the orms doesn't load pandas
+    import pandas as pd
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return object
+    return pd.StringDtype('pyarrow')
+
+
+def column_dtypes(columns: Iterable[sa.Column]) -> Tuple[Dict, List[str]]:
+    """Compact pandas dtypes for ``columns`` based on their SQLAlchemy
+    types, and the names of the date and datetime columns to parse.
+
+    Strings are categorical when the column is marked with
+    ``info={'categorical': True}``, e.g. low cardinality enums.
+    """
+    dtypes = {}
+    parse_dates = []
+    for col in columns:
+        col_type = col.type
+        if isinstance(col_type, (sa.Date, sa.DateTime)):
+            parse_dates.append(col.name)
+        elif isinstance(col_type, sa.Boolean):
+            dtypes[col.name] = 'boolean'
+        elif isinstance(col_type, sa.BigInteger):
+            dtypes[col.name] = 'Int64'
+        elif isinstance(col_type, sa.Integer):
+            dtypes[col.name] = 'Int32'
+        elif isinstance(col_type, sa.Float):
+            dtypes[col.name] = 'float64'
+        elif isinstance(col_type, sa.Numeric):
+            dtypes[col.name] = 'Int64' if col_type.scale == 0 else 'float64'
+        elif isinstance(col_type, sa.String):
+            if getattr(col, 'info', {}).get('categorical'):
+                dtypes[col.name] = 'category'
+            else:
+                dtypes[col.name] = _string_dtype()
+    return dtypes, parse_dates
+
+
+class TableInfo:
+    """What the ETL needs to know about the table of an orm model, worked
+    out once rather than on every run."""
+
+    def __init__(self, model):
+        table = model.__table__
+        self.model = model
+        self.table = table
+        self.name = table.name
+        self.schema = table.schema
+        self.fullname = table.fullname
+        self.primary_key_column = list(table.primary_key.columns)[0]
+        self.primary_key = self.primary_key_column.name
+        self.columns = [col.name for col in table.c]
+        self.date_columns = [
+            col.name for col in table.c
+            if isinstance(col.type, (sa.Date, sa.DateTime))
+        ]
+        self.bookkeeping_columns = [
+            col.name for col in table.c if getattr(col, 'is_bookkeeping', False)
+        ]
+        # Column name to the (table, column) it references
+        self.foreign_keys: Dict[str, Tuple[str, str]] = {}
+        for fk in table.foreign_keys:
+            target_table, target_column = fk.target_fullname.split('.')[-2:]
+            self.foreign_keys[fk.parent.name] = (target_table, target_column)
+        self.referenced_tables: Set[str] = {
+            target_table.lower() for target_table, _ in self.foreign_keys.values()
+        }
+        self._tables = {table.schema: table}
+        self._lock = threading.Lock()
+
+    @cached_property
+    def _dtypes(self) -> Tuple[Dict, List[str]]:
+        # Lazy as the string dtype imports pandas and pyarrow
+        return column_dtypes(self.table.c)
+
+    def dtypes(self, columns: Iterable[str] = None) -> Tuple[Dict, List[str]]:
+        """``column_dtypes`` of ``columns`` (every column by default)."""
+        dtypes, parse_dates = self._dtypes
+        if columns is None:
+            return dict(dtypes), list(parse_dates)
+        columns = set(columns)
+        return (
+            {name: dtype for name, dtype in dtypes.items() if name in columns},
+            [name for name in parse_dates if name in columns],
+        )
+
+    def table_in(self, schema: str = None) -> sa.Table:
+        """The table in ``schema``, the model's own by default.  Copies for
+        other schemas are made once."""
+        schema = schema if schema is not None else self.schema
+        with self._lock:
+            if schema not in self._tables:
+                self._tables[schema] = sa.Table(
+                    self.name,
+                    sa.MetaData(schema=schema),
+                    *(col._copy() for col in self.table.c),
+                )
+            return self._tables[schema]
+
+    def update_columns(self, columns: List[str] = None) -> List[str]:
+        """The columns an update writes: ``columns`` (every column but the
+        key by default) and the bookkeeping columns."""
+        if columns is None:
+            columns = [
+                name for name in self.columns
+                if name != self.primary_key and name not in self.bookkeeping_columns
+            ]
+        return list(dict.fromkeys([*columns, *self.bookkeeping_columns]))
+
+
+class TableRegistry:
+    """``TableInfo`` per orm model, also found by the full name of the
+    table."""
+
+    def __init__(self):
+        self._by_model: Dict[type, TableInfo] = {}
+        self._by_name: Dict[str, TableInfo] = {}
+        self._lock = threading.Lock()
+
+    def register(self, *models):
+        for model in models:
+            self.get(model)
+
+    def get(self, model) -> TableInfo:
+        info = self._by_model.get(model)
+        if info is None:
+            with self._lock:
+                info = self._by_model.get(model)
+                if info is None:
+                    info = TableInfo(model)
+                    self._by_model[model] = info
+                    self._by_name[info.fullname] = info
+        return info
+
+    def find(self, table: sa.Table) -> Optional[TableInfo]:
+        """The info of the model ``table`` belongs to, by full name."""
+        return self._by_name.get(table.fullname)
+
+
+table_registry = TableRegistry()
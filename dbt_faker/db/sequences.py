@@ -0,0 +1,75 @@
+# stdlib
+import threading
+from typing import Callable, Dict
+
+# third party
+import sqlalchemy as sa
+
+# first party
+from .base import get_warehouse_engine
+from .metadata import table_registry
+
+
+def primary_key_column(model) -> sa.Column:
+    return table_registry.get(model).primary_key_column
+
+
+class SequenceAllocator:
+    """Hands out non-overlapping blocks of primary key values per table.
+
+    The first reservation for a table reads ``max(pk)`` with a single
+    query; after that the high-water mark is kept in-process, so concurrent
+    generators in this process never get the same range.
+
+    Nothing is reserved in the warehouse, so separate processes writing to
+    the same tables at the same time get overlapping keys.  That isn't
+    supported: split a batch over processes with shards started from a
+    ``BatchSnapshot`` instead.
+    """
+
+    def __init__(self, engine_getter: Callable = get_warehouse_engine):
+        self.engine_getter = engine_getter
+        self._next: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _table_key(self, model) -> str:
+        return model.__table__.fullname
+
+    def _load(self, model) -> int:
+        key = self._table_key(model)
+        if key not in self._next:
+            stmt = sa.select(sa.func.max(primary_key_column(model)))
+            with self.engine_getter().connect() as conn:
+                current = conn.execute(stmt).scalar()
+            self._next[key] = (current or 0) + 1
+        return self._next[key]
+
+    def peek(self, model) -> int:
+        """The next unreserved key of ``model``."""
+        with self._lock:
+            return self._load(model)
+
+    def reserve(self, model, count: int) -> int:
+        """Reserve ``count`` keys of ``model``; returns the first one."""
+        with self._lock:
+            start = self._load(model)
+            self._next[self._table_key(model)] = start + count
+            return start
+
+    def start_at(self, model, start: int):
+        """Hand out the keys of ``model`` from ``start`` on, e.g. the start
+        a batch snapshot recorded, instead of reading ``max(pk)``."""
+        with self._lock:
+            self._next[self._table_key(model)] = start
+
+    def reset(self, model=None):
+        """Forget the high-water mark of ``model`` (or every table) so it's
+        read from the warehouse again."""
+        with self._lock:
+            if model is None:
+                self._next.clear()
+            else:
+                self._next.pop(self._table_key(model), None)
+
+
+sequence_allocator = SequenceAllocator()
@@ -1,28 +1,123 @@
 # stdlib
-import datetime
+import collections
+import contextlib
 import random
-from typing import Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
 
 # third party
 import pandas as pd
 import sqlalchemy as sa
 from sqlalchemy.sql.expression import FromClause
 
+# first party
+from dbt_faker.db.dialects import get_dialect
+from dbt_faker.db.metadata import column_dtypes, table_registry
+from dbt_faker.etl.dedup import RowHashSet, drop_duplicate_rows, row_hashes
+from dbt_faker.etl.loaders import get_loader
+from dbt_faker.utils.metrics import run_metrics
 
-def select_to_df(stmt: FromClause, engine: sa.engine.Connectable):
-    python_dt_types = {datetime.date, datetime.datetime}
-    parse_dates = []
-    for col in stmt.c:
-        try:
-            if col.type.python_type in python_dt_types:
-                parse_dates.append(col.name)
-        except NotImplementedError:
-            continue
 
-    df = pd.read_sql(stmt, engine, parse_dates=parse_dates)
+def _selected_dtypes(columns) -> Tuple[Dict, List[str]]:
+    # Columns of one registered table use its precomputed dtypes
+    tables = {getattr(col, 'table', None) for col in columns}
+    if len(tables) == 1 and all(isinstance(col, sa.Column) for col in columns):
+        table_info = table_registry.find(tables.pop())
+        if table_info is not None:
+            return table_info.dtypes(col.name for col in columns)
+    return column_dtypes(columns)
+
+
+def _apply_dtypes(df: pd.DataFrame, dtypes: Dict) -> pd.DataFrame:
+    for name, dtype in dtypes.items():
+        if name not in df.columns:
+            continue
+        try:
+            df[name] = df[name].astype(dtype)
+        except (TypeError, ValueError, OverflowError):
+            # e.g. an Integer column holding values beyond Int32
+            if dtype == 'Int32':
+                df[name] = df[name].astype('Int64')
     return df
 
 
+def select_to_df(
+    stmt: FromClause,
+    engine: sa.engine.Connectable,
+    columns: List[str] = None,
+    chunksize: int = None,
+    dtypes: Dict = None,
+):
+    """Read ``stmt`` into a DataFrame with compact dtypes derived from the
+    column types (see ``column_dtypes``), overridden by ``dtypes``.
+
+    ``columns`` only reads those columns.  With ``chunksize`` the rows are
+    streamed and an iterator of DataFrames of at most ``chunksize`` rows is
+    returned instead.
+    """
+    if not hasattr(stmt, 'selected_columns'):
+        # Tables and other FromClauses aren't executable themselves
+        stmt = sa.select(stmt)
+    if columns is not None:
+        stmt = stmt.with_only_columns(
+            *(stmt.selected_columns[name] for name in columns)
+        )
+    column_types, parse_dates = _selected_dtypes(stmt.selected_columns)
+    column_types.update(dtypes or {})
+
+    if chunksize is None:
+        df = pd.read_sql(stmt, engine, parse_dates=parse_dates)
+        return _apply_dtypes(df, column_types)
+    return _select_chunks(stmt, engine, chunksize, parse_dates, column_types)
+
+
+def _select_chunks(stmt, engine, chunksize, parse_dates, dtypes):
+    with contextlib.ExitStack() as stack:
+        conn = engine
+        if not isinstance(engine, sa.engine.Connection):
+            conn = stack.enter_context(engine.connect())
+        conn = conn.execution_options(stream_results=True)
+        for df in pd.read_sql(
+            stmt, conn, parse_dates=parse_dates, chunksize=chunksize
+        ):
+            yield _apply_dtypes(df, dtypes)
+
+
+def _reservoir_sample(rows: Iterable, n: int) -> List:
+    sample = []
+    for i, row in enumerate(rows):
+        if i < n:
+            sample.append(row)
+        else:
+            j = random.randint(0, i)
+            if j < n:
+                sample[j] = row
+    return sample
+
+
+def sample_primary_keys(
+    source_table: sa.Table,
+    source_engine: sa.engine.Connectable,
+    primary_key: str,
+    n: int,
+) -> List:
+    """Sample up to ``n`` primary keys, reading only the key column.
+
+    Sampling is pushed into the database where the dialect supports it
+    (see ``WarehouseDialect.sample``), otherwise the key column is
+    streamed through a reservoir sample.
+    """
+    key_col = source_table.c[primary_key]
+    stmt = get_dialect(source_engine).sample(key_col, rows=n)
+    with source_engine.connect() as conn:
+        if stmt is None:
+            chunks = select_to_df(sa.select(key_col), conn, chunksize=50000)
+            return _reservoir_sample(
+                (key for df in chunks for key in df[primary_key].tolist()), n
+            )
+        return select_to_df(stmt, conn)[primary_key].tolist()
+
+
 def get_ids_to_update(
     source_table: sa.Table,
     source_engine: sa.engine.Connectable,
@@ -30,16 +125,64 @@ def get_ids_to_update(
     primary_key: str,
     default_rows: Tuple[int, int] = (1, 100),
 ):
-    select = sa.select([source_table])
-    df = select_to_df(select, source_engine)
-    if len(df) > 0:
-        sample_df = df.sample(
-            n=random.randint(*orm_config.get('update_rows', default_rows))
-        )
-        primary_keys = sample_df[primary_key].tolist()
-        return primary_keys
-    
-    return []
+    n = random.randint(*orm_config.get('update_rows', default_rows))
+    return sample_primary_keys(source_table, source_engine, primary_key, n)
+
+
+def _python_rows(df: pd.DataFrame) -> List[Tuple]:
+    # DBAPI drivers don't all understand numpy scalars or pd.Timestamp
+    columns = []
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            columns.append([
+                None if pd.isna(value) else value.to_pydatetime()
+                for value in df[col]
+            ])
+        else:
+            columns.append(df[col].tolist())
+    return list(zip(*columns))
+
+
+def update_rows(
+    conn: sa.engine.Connection,
+    source_table: sa.Table,
+    df: pd.DataFrame,
+    primary_key: str,
+    update_cols: List[str],
+    batch_rows: int = 1000,
+) -> int:
+    """Update ``update_cols`` of the rows in ``source_table`` matching the
+    primary keys in ``df``, on the caller's connection and transaction.
+
+    Changed rows are sent inline in the dialect's ``update_from_values``
+    statement (a MERGE on Snowflake).  Only the key and ``update_cols`` are
+    sent.  Returns the number of rows matched, or -1 if the driver doesn't
+    report it.
+    """
+    dialect = get_dialect(conn)
+    cols = list(dict.fromkeys([primary_key, *update_cols]))
+
+    matched = 0
+    rows = _python_rows(df[cols])
+    for offset in range(0, len(rows), batch_rows):
+        batch = rows[offset:offset + batch_rows]
+        params = {}
+        values = []
+        for i, row in enumerate(batch):
+            names = []
+            for j, value in enumerate(row):
+                params[f'v{i}_{j}'] = value
+                names.append(f':v{i}_{j}')
+            values.append(names)
+
+        sql = dialect.update_from_values(source_table, cols, values)
+        result = conn.execute(sa.text(sql), params)
+        if result.rowcount < 0 or matched < 0:
+            # The driver doesn't report affected rows
+            matched = -1
+        else:
+            matched += result.rowcount
+    return matched
 
 
 def dataframe_to_sql(
@@ -51,13 +194,177 @@ def dataframe_to_sql(
     index: bool = False,
     chunksize: int = 16000,
     unique_subset: List[str] = None,
+    loader: str = 'to_sql',
+    **loader_kwargs,
 ):
-    df = df.drop_duplicates(subset=unique_subset)
-    df.to_sql(
-        table,
-        engine,
-        schema=schema,
-        if_exists=if_exists,
-        index=index,
-        chunksize=chunksize
-    )
\ No newline at end of file
+    name = f'{schema}.{table}'
+    if unique_subset:
+        with run_metrics.stage(name, 'dedup'):
+            df = drop_duplicate_rows(df, unique_subset)
+    with run_metrics.stage(name, 'load') as stage:
+        get_loader(loader)(
+            df,
+            engine,
+            table,
+            schema,
+            if_exists=if_exists,
+            index=index,
+            chunksize=chunksize,
+            **loader_kwargs,
+        )
+        stage.rows = len(df)
+        stage.bytes = int(df.memory_usage(index=False, deep=True).sum())
+    return len(df)
+
+
+def dedupe_chunks(
+    chunks: Iterable[pd.DataFrame],
+    unique_subset: List[str] = None,
+    seen: RowHashSet = None,
+) -> Iterator[pd.DataFrame]:
+    """Drop rows whose ``unique_subset`` values were already seen, earlier
+    in the chunk, in an earlier chunk or in ``seen`` (e.g. the hashes of
+    the rows already in the warehouse from ``existing_row_hashes``).
+    """
+    if not unique_subset:
+        yield from chunks
+        return
+
+    seen = seen if seen is not None else RowHashSet()
+    for df in chunks:
+        keep = seen.new_rows(df, unique_subset)
+        yield df if keep.all() else df[keep]
+
+
+def timed_dedupe_chunks(
+    chunks: Iterable[pd.DataFrame],
+    name: str,
+    unique_subset: List[str] = None,
+    seen: RowHashSet = None,
+) -> Iterator[pd.DataFrame]:
+    """``dedupe_chunks``, timing the production of ``chunks`` as the
+    'generate' stage of table ``name`` and deduplicating them as 'dedup'.
+    Tables without a ``unique_subset`` have no 'dedup' stage."""
+    chunks = run_metrics.timed(chunks, name, 'generate')
+    if not unique_subset:
+        return chunks
+    return run_metrics.timed(dedupe_chunks(chunks, unique_subset, seen), name, 'dedup')
+
+
+def existing_row_hashes(
+    table: sa.Table,
+    engine: sa.engine.Connectable,
+    columns: List[str],
+    chunksize: int = 100_000,
+    where: sa.sql.ColumnElement = None,
+) -> RowHashSet:
+    """Hashes of the ``columns`` of every row already in ``table`` (matching
+    ``where``), read in chunks of only those columns."""
+    stmt = sa.select(table)
+    if where is not None:
+        stmt = stmt.where(where)
+    seen = RowHashSet()
+    for df in select_to_df(stmt, engine, columns=columns, chunksize=chunksize):
+        seen.add(row_hashes(df, columns))
+    return seen
+
+
+def stream_to_sql(
+    chunks: Iterable[pd.DataFrame],
+    engine: sa.engine.Engine,
+    table: str,
+    schema: str,
+    unique_subset: List[str] = None,
+    loader: str = 'to_sql',
+    on_load: Callable[[pd.DataFrame], None] = None,
+    max_in_flight: int = 2,
+    seen: RowHashSet = None,
+    **loader_kwargs,
+) -> int:
+    """Load each chunk as soon as it's produced; returns the rows loaded.
+
+    Rows repeating the ``unique_subset`` of an earlier row, or of a row in
+    ``seen``, are dropped before loading (see ``dedupe_chunks``).
+
+    Chunks are loaded in order on a background thread while the next ones
+    are generated.  At most ``max_in_flight`` chunks wait or load at a time;
+    generation blocks beyond that.  ``max_in_flight=0`` loads synchronously.
+    ``on_load`` is called with every chunk once it has been loaded.
+    """
+    def load(df):
+        # Already deduplicated across chunks
+        return dataframe_to_sql(
+            df,
+            engine,
+            table,
+            schema,
+            loader=loader,
+            **loader_kwargs,
+        )
+
+    return _stream(
+        chunks, f'{schema}.{table}', load, unique_subset, seen, on_load,
+        max_in_flight,
+    )
+
+
+def dataframe_to_sink(df: pd.DataFrame, sink, table: str, schema: str) -> int:
+    """Write ``df`` to a ``sink`` (see ``etl.sinks``)."""
+    with run_metrics.stage(f'{schema}.{table}', sink.stage) as stage:
+        rows = sink.write(df, table, schema)
+        stage.rows = rows
+        stage.bytes = int(df.memory_usage(index=False, deep=True).sum())
+    return rows
+
+
+def stream_to_sink(
+    chunks: Iterable[pd.DataFrame],
+    sink,
+    table: str,
+    schema: str,
+    unique_subset: List[str] = None,
+    on_load: Callable[[pd.DataFrame], None] = None,
+    max_in_flight: int = 2,
+    seen: RowHashSet = None,
+) -> int:
+    """``stream_to_sql`` writing to a ``sink`` instead of a database;
+    returns the rows written."""
+    return _stream(
+        chunks,
+        f'{schema}.{table}',
+        lambda df: dataframe_to_sink(df, sink, table, schema),
+        unique_subset,
+        seen,
+        on_load,
+        max_in_flight,
+    )
+
+
+def _stream(chunks, name, load, unique_subset, seen, on_load, max_in_flight):
+    def load_chunk(df):
+        loaded = load(df)
+        if on_load is not None:
+            on_load(df)
+        return loaded
+
+    chunks = timed_dedupe_chunks(chunks, name, unique_subset, seen)
+    if not max_in_flight:
+        return sum(load_chunk(df) for df in chunks)
+
+    rows = 0
+    in_flight = collections.deque()
+    with ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix=f'load-{name}'
+    ) as executor:
+        try:
+            for df in chunks:
+                in_flight.append(executor.submit(load_chunk, df))
+                if len(in_flight) >= max_in_flight:
+                    rows += in_flight.popleft().result()
+            while in_flight:
+                rows += in_flight.popleft().result()
+        finally:
+            # Don't start queued loads once one has failed
+            for future in in_flight:
+                future.cancel()
+    return rows
@@ -0,0 +1,73 @@
+# stdlib
+from typing import List
+
+# third party
+import numpy as np
+import pandas as pd
+
+
+def row_hashes(df: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    """64-bit hash of the ``columns`` of every row.  Values hash the same
+    whatever their pandas dtype (int64, Int32, category, string...)."""
+    subset = df[columns]
+    # Integers are hashed by their bytes, so narrower ones (e.g. Int32 read
+    # back from the warehouse) are widened to hash like generated int64s
+    narrow = {
+        col: 'Int64' for col in columns
+        if pd.api.types.is_integer_dtype(subset[col].dtype)
+        and subset[col].dtype.itemsize < 8
+    }
+    if narrow:
+        subset = subset.astype(narrow)
+    return pd.util.hash_pandas_object(subset, index=False).to_numpy()
+
+
+class RowHashSet:
+    """Set of 64-bit row hashes, 8 bytes per row.
+
+    Hashes are kept in sorted runs whose sizes at least double from the
+    newest to the oldest, so adding a chunk merges O(log n) runs at most
+    and a lookup is a binary search per run.  With 64-bit hashes a false
+    duplicate needs ~10^9 rows before it becomes likely.
+    """
+
+    def __init__(self):
+        self._runs: List[np.ndarray] = []
+
+    def __len__(self):
+        return sum(len(run) for run in self._runs)
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self._runs:
+            positions = np.searchsorted(run, hashes)
+            positions[positions == len(run)] = 0
+            found |= run[positions] == hashes
+        return found
+
+    def add(self, hashes: np.ndarray):
+        if not len(hashes):
+            return
+        self._runs.append(np.unique(hashes))
+        while len(self._runs) > 1 and len(self._runs[-2]) <= 2 * len(self._runs[-1]):
+            newest = self._runs.pop()
+            self._runs[-1] = np.union1d(self._runs[-1], newest)
+
+    def new_rows(self, df: pd.DataFrame, columns: List[str]) -> np.ndarray:
+        """Mask of the rows of ``df`` whose ``columns`` weren't seen yet,
+        nor earlier in ``df``; those rows are added to the set."""
+        hashes = row_hashes(df, columns)
+        keep = ~pd.Series(hashes).duplicated().to_numpy()
+        if self._runs:
+            keep &= ~self.contains(hashes)
+        self.add(hashes[keep])
+        return keep
+
+
+def drop_duplicate_rows(df: pd.DataFrame, columns: List[str] = None) -> pd.DataFrame:
+    """Drop rows repeating the ``columns`` of an earlier row, hashing only
+    those columns.  Without ``columns`` rows are returned as they are."""
+    if not columns:
+        return df
+    keep = ~pd.Series(row_hashes(df, columns)).duplicated().to_numpy()
+    return df if keep.all() else df[keep]
@@ -0,0 +1,193 @@
+# stdlib
+import logging
+import os
+import tempfile
+import uuid
+from typing import Callable, Dict
+
+# third party
+import pandas as pd
+import sqlalchemy as sa
+
+
+logger = logging.getLogger(__name__)
+
+
+def to_sql_loader(
+    df: pd.DataFrame,
+    engine: sa.engine.Engine,
+    table: str,
+    schema: str,
+    if_exists: str = 'append',
+    index: bool = False,
+    chunksize: int = 16000,
+    **kwargs,
+):
+    df.to_sql(
+        table,
+        engine,
+        schema=schema,
+        if_exists=if_exists,
+        index=index,
+        chunksize=chunksize
+    )
+
+
+def write_chunk(
+    df: pd.DataFrame, directory: str, file_format: str = 'parquet'
+) -> str:
+    """Write ``df`` to a compressed file in ``directory`` and return its path.
+
+    Falls back to gzipped CSV when parquet support (pyarrow) isn't installed.
+    """
+    if file_format == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            logger.warning('pyarrow is not installed, staging as csv instead.')
+            file_format = 'csv'
+
+    name = uuid.uuid4().hex
+    if file_format == 'parquet':
+        path = os.path.join(directory, f'{name}.parquet')
+        df.to_parquet(path, compression='snappy', index=False)
+    elif file_format == 'csv':
+        path = os.path.join(directory, f'{name}.csv.gz')
+        df.to_csv(path, index=False, compression='gzip')
+    else:
+        raise ValueError(f'Unsupported file format: {file_format}')
+    return path
+
+
+def _read_chunk(path: str) -> pd.DataFrame:
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path, compression='gzip')
+
+
+def _snowflake_copy_into(conn, path: str, columns, table: str, schema: str):
+    preparer = conn.dialect.identifier_preparer
+    target = f'{preparer.quote_schema(schema)}.{preparer.quote(table)}'
+    stage = f'@{preparer.quote_schema(schema)}.%{preparer.quote(table)}'
+    filename = os.path.basename(path)
+    if path.endswith('.parquet'):
+        copy_sql = f'''
+            copy into {target}
+            from {stage}
+            files = ('{filename}')
+            file_format = (type = parquet)
+            match_by_column_name = case_insensitive
+            purge = true
+        '''
+    else:
+        copy_sql = f'''
+            copy into {target} ({', '.join(preparer.quote(c) for c in columns)})
+            from {stage}
+            files = ('{filename}')
+            file_format = (
+                type = csv
+                compression = gzip
+                skip_header = 1
+                field_optionally_enclosed_by = '"'
+            )
+            purge = true
+        '''
+
+    conn.exec_driver_sql(
+        f"put 'file://{path}' {stage} auto_compress = false overwrite = true"
+    )
+    conn.exec_driver_sql(copy_sql)
+
+
+def _duckdb_copy_into(conn, path: str, columns, table: str, schema: str):
+    preparer = conn.dialect.identifier_preparer
+    target = preparer.quote(table)
+    if schema:
+        target = f'{preparer.quote_schema(schema)}.{target}'
+    reader = 'read_parquet' if path.endswith('.parquet') else 'read_csv_auto'
+    conn.exec_driver_sql(
+        f"insert into {target} by name select * from {reader}('{path}')"
+    )
+
+
+def _sqlite_copy_into(conn, path: str, columns, table: str, schema: str):
+    # SQLite can't read files itself, so the file is read back and inserted
+    # with a single executemany
+    df = _read_chunk(path)
+    for col in df.select_dtypes(include=['datetime', 'datetimetz']).columns:
+        df[col] = df[col].dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+    stmt = sa.table(table, *(sa.column(c) for c in df.columns), schema=schema)
+    conn.execute(stmt.insert(), df.to_dict('records'))
+
+
+# Dialect specific "copy a staged file into a table" implementations
+STAGE_COPIERS: Dict[str, Callable] = {
+    'snowflake': _snowflake_copy_into,
+    'duckdb': _duckdb_copy_into,
+    'sqlite': _sqlite_copy_into,
+}
+
+
+# Tables staging failed for, as (engine url, schema, table)
+_staging_failed = set()
+
+
+def stage_loader(
+    df: pd.DataFrame,
+    engine: sa.engine.Engine,
+    table: str,
+    schema: str,
+    if_exists: str = 'append',
+    file_format: str = 'parquet',
+    **kwargs,
+):
+    """Bulk load ``df`` by writing it to a compressed file and copying that
+    file into the table (PUT + COPY INTO on Snowflake).
+
+    Uses ``to_sql`` instead when the dialect has no staging support or the
+    table has to be (re)created.  If staging fails, e.g. without privileges
+    on the table stage, the chunk and the later ones of the table are loaded
+    with ``to_sql``.
+    """
+    copier = STAGE_COPIERS.get(engine.dialect.name)
+    target = (str(engine.url), schema, table)
+    if copier is None or if_exists != 'append' or target in _staging_failed:
+        if copier is None:
+            logger.warning(
+                f'Staged loading is not available for {engine.dialect.name}, '
+                'using to_sql.'
+            )
+        return to_sql_loader(
+            df, engine, table, schema, if_exists=if_exists, **kwargs
+        )
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_chunk(df, directory, file_format)
+        try:
+            with engine.begin() as conn:
+                copier(conn, path, list(df.columns), table, schema)
+        except sa.exc.DBAPIError as e:
+            # The copy is rolled back, so the chunk can be loaded again
+            logger.warning(
+                f'Staged loading into {schema}.{table} failed, using to_sql: '
+                f'{e.orig}'
+            )
+            _staging_failed.add(target)
+            return to_sql_loader(
+                df, engine, table, schema, if_exists=if_exists, **kwargs
+            )
+
+
+LOADERS: Dict[str, Callable] = {
+    'to_sql': to_sql_loader,
+    'stage': stage_loader,
+}
+
+
+def get_loader(name: str) -> Callable:
+    try:
+        return LOADERS[name]
+    except KeyError:
+        raise ValueError(
+            f'Unknown loader "{name}", expected one of {sorted(LOADERS)}'
+        )
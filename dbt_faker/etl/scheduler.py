@@ -0,0 +1,106 @@
+# stdlib
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Set
+
+# first party
+from dbt_faker.db.metadata import table_registry
+from dbt_faker.factories.common import RandomLazyFunction
+
+
+logger = logging.getLogger(__name__)
+
+
+def _model_names(model) -> Set[str]:
+    # ForeignKeys in the orms reference either the class or the table name
+    return {model.__name__.lower(), model.__tablename__.lower()}
+
+
+def _referenced_models(orm_config: Dict) -> Set[str]:
+    """Names of the models an orm_config entry draws keys from."""
+    # The registry records the table part of schema qualified targets
+    names = set(table_registry.get(orm_config['orm']).referenced_tables)
+
+    declarations = orm_config['factory']._meta.pre_declarations.declarations
+    for declaration in declarations.values():
+        if isinstance(declaration, RandomLazyFunction):
+            model = getattr(declaration.function, 'model', None)
+            if model is not None:
+                names |= _model_names(model)
+    return names
+
+
+def table_dependencies(config: List[Dict]) -> Dict[int, Set[int]]:
+    """Map the index of each config entry to the indexes it depends on.
+
+    Dependencies come from the ``sa.ForeignKey`` declarations on the orm and
+    the models behind ``RandomLazyFunction`` key lookups on the factory.
+    Models that aren't part of ``config`` are ignored.
+    """
+    dependencies = {}
+    for i, orm_config in enumerate(config):
+        referenced = _referenced_models(orm_config)
+        dependencies[i] = {
+            j for j, other in enumerate(config)
+            if j != i and _model_names(other['orm']) & referenced
+        }
+    return dependencies
+
+
+def run_tables(
+    config: List[Dict],
+    run_table: Callable[[Dict], None],
+    max_workers: int = 4,
+) -> Dict[str, float]:
+    """Run ``run_table`` for every config entry, running entries concurrently
+    once everything they depend on has finished.
+
+    Returns the wall time, in seconds, spent on each table.
+    """
+    dependencies = table_dependencies(config)
+    cycle = _cycle_members(dependencies)
+    if cycle:
+        tables = sorted(config[i]['orm'].__tablename__ for i in cycle)
+        raise ValueError(f'Circular dependencies between tables {tables}')
+
+    timings = {}
+
+    def timed(orm_config):
+        start = time.perf_counter()
+        run_table(orm_config)
+        elapsed = time.perf_counter() - start
+        table = orm_config['orm'].__tablename__
+        timings[table] = elapsed
+        logger.info(f'{table} finished in {elapsed:.2f}s')
+
+    pending = set(dependencies)
+    done = set()
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            ready = [i for i in sorted(pending) if dependencies[i] <= done]
+            for i in ready:
+                pending.remove(i)
+                running[executor.submit(timed, config[i])] = i
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                i = running.pop(future)
+                # Re-raise errors from the worker; dependents never start
+                future.result()
+                done.add(i)
+
+    return timings
+
+
+def _cycle_members(dependencies: Dict[int, Set[int]]) -> Set[int]:
+    remaining = {i: set(deps) for i, deps in dependencies.items()}
+    while True:
+        free = [i for i, deps in remaining.items() if not deps]
+        if not free:
+            return set(remaining)
+        for i in free:
+            del remaining[i]
+        for deps in remaining.values():
+            deps.difference_update(free)
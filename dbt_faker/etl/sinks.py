@@ -0,0 +1,238 @@
+# stdlib
+import logging
+import os
+import threading
+import uuid
+from typing import TYPE_CHECKING, Dict, List, Tuple, Union
+
+# third party
+import pandas as pd
+
+if TYPE_CHECKING:
+    import pyarrow
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_FILE_BYTES = 128 * 2 ** 20
+DEFAULT_PARTITION_BY = '_etl_updated_timestamp'
+
+FILE_EXTENSIONS = {'parquet': 'parquet', 'csv': 'csv.gz'}
+
+
+def _pyarrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def to_arrow(data) -> 'pyarrow.Table':
+    """``data`` as an Arrow table.  Numeric and Arrow backed columns of a
+    DataFrame are wrapped without copying."""
+    import pyarrow as pa
+
+    if isinstance(data, pa.Table):
+        return data
+    if isinstance(data, pa.RecordBatch):
+        return pa.Table.from_batches([data])
+    return pa.Table.from_pandas(data, preserve_index=False)
+
+
+class _ParquetFile:
+    def __init__(self, path: str, schema):
+        import pyarrow.parquet as pq
+
+        self.path = path
+        self.schema = schema
+        self._writer = pq.ParquetWriter(path, schema, compression='snappy')
+
+    def write(self, table):
+        self._writer.write_table(table.cast(self.schema))
+
+    def close(self):
+        self._writer.close()
+
+
+class _ArrowCsvFile:
+    def __init__(self, path: str, schema):
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+
+        self.path = path
+        self.schema = schema
+        self._stream = pa.CompressedOutputStream(path, 'gzip')
+        self._writer = pacsv.CSVWriter(self._stream, schema)
+
+    def write(self, table):
+        self._writer.write_table(table.cast(self.schema))
+
+    def close(self):
+        self._writer.close()
+        self._stream.close()
+
+
+class _PandasCsvFile:
+    # Without pyarrow every write appends a gzip member, still one valid file
+    def __init__(self, path: str, schema=None):
+        self.path = path
+        self._header = True
+
+    def write(self, df: pd.DataFrame):
+        df.to_csv(
+            self.path, mode='a', header=self._header, index=False,
+            compression='gzip',
+        )
+        self._header = False
+
+    def close(self):
+        pass
+
+
+class FileSink:
+    """Writes generated rows to compressed files under ``directory`` instead
+    of loading them into the warehouse, laid out as::
+
+        {directory}/TPCH/orders/etl_updated_timestamp_date=2024-01-31/part-00000-{run}.parquet
+
+    Rows are partitioned on the date of ``partition_by`` when the table has
+    that column (Hive style, so external tables can prune on it).  Each
+    partition is appended to one file until it reaches about
+    ``max_file_bytes``, then a new file is started.  Parquet, and CSV when
+    pyarrow is installed, are written from Arrow tables.
+    """
+
+    # Metrics stage the writes are recorded as
+    stage = 'load'
+
+    def __init__(
+        self,
+        directory: str,
+        file_format: str = 'parquet',
+        partition_by: str = DEFAULT_PARTITION_BY,
+        max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+    ):
+        if file_format not in FILE_EXTENSIONS:
+            raise ValueError(
+                f'Unsupported file format: {file_format}, expected one of '
+                f'{sorted(FILE_EXTENSIONS)}'
+            )
+        self.arrow = _pyarrow_available()
+        if file_format == 'parquet' and not self.arrow:
+            logger.warning('pyarrow is not installed, writing csv instead.')
+            file_format = 'csv'
+
+        self.directory = directory
+        self.file_format = file_format
+        self.partition_by = partition_by
+        self.max_file_bytes = max_file_bytes
+        self.run_id = uuid.uuid4().hex[:8]
+        self.files: List[str] = []
+        self._open: Dict[Tuple[str, str, str], object] = {}
+        self._counts: Dict[Tuple[str, str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def _file_class(self):
+        if self.file_format == 'parquet':
+            return _ParquetFile
+        return _ArrowCsvFile if self.arrow else _PandasCsvFile
+
+    def _partitions(self, data) -> List[Tuple[str, object]]:
+        columns = getattr(data, 'column_names', None) or list(data.columns)
+        if not self.partition_by or self.partition_by not in columns:
+            return [('', data)]
+        name = f'{self.partition_by.strip("_")}_date'
+
+        if not self.arrow:
+            dates = pd.to_datetime(data[self.partition_by]).dt.strftime('%Y-%m-%d')
+            return [
+                (f'{name}={date}', group)
+                for date, group in data.groupby(dates, sort=True)
+            ]
+
+        import pyarrow.compute as pc
+
+        dates = pc.strftime(data[self.partition_by], format='%Y-%m-%d')
+        unique = pc.unique(dates).to_pylist()
+        if len(unique) == 1:
+            return [(f'{name}={unique[0]}', data)]
+        return [
+            (f'{name}={date}', data.filter(pc.equal(dates, date)))
+            for date in sorted(d for d in unique if d is not None)
+        ]
+
+    def write(
+        self, data: Union[pd.DataFrame, 'pyarrow.Table'], table: str, schema: str
+    ) -> int:
+        """Append ``data`` (a DataFrame or Arrow table) to the files of
+        ``schema.table``; returns the number of rows written."""
+        if self.arrow:
+            data = to_arrow(data)
+        for partition, part in self._partitions(data):
+            key = (schema or '', table, partition)
+            with self._lock:
+                file = self._open.get(key)
+                if file is None:
+                    file = self._open[key] = self._new_file(key, part)
+            file.write(part)
+            if os.path.getsize(file.path) >= self.max_file_bytes:
+                with self._lock:
+                    self._open.pop(key).close()
+        return len(data)
+
+    def _new_file(self, key, data):
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        directory = os.path.join(self.directory, *(part for part in key if part))
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(
+            directory,
+            f'part-{count:05d}-{self.run_id}.{FILE_EXTENSIONS[self.file_format]}',
+        )
+        self.files.append(path)
+        return self._file_class()(path, getattr(data, 'schema', None))
+
+    def close(self) -> List[str]:
+        """Finish every open file; returns the paths of the files written."""
+        with self._lock:
+            open_files = list(self._open.values())
+            self._open.clear()
+        for file in open_files:
+            file.close()
+        return list(self.files)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class BufferSink:
+    """Keeps the rows written to it in memory, per table, so the rows of
+    several runs can be loaded together."""
+
+    stage = 'buffer'
+
+    def __init__(self):
+        self._frames: Dict[Tuple[str, str], List[pd.DataFrame]] = {}
+        self._lock = threading.Lock()
+
+    def write(self, data: pd.DataFrame, table: str, schema: str) -> int:
+        with self._lock:
+            self._frames.setdefault((schema, table), []).append(data)
+        return len(data)
+
+    def rows(self) -> int:
+        with self._lock:
+            return sum(len(df) for frames in self._frames.values() for df in frames)
+
+    def drain(self, table: str, schema: str) -> pd.DataFrame:
+        """The rows written to ``schema.table`` since it was last drained,
+        or None."""
+        with self._lock:
+            frames = self._frames.pop((schema, table), None)
+        if not frames:
+            return None
+        return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,104 @@
+# stdlib
+import contextlib
+import json
+from typing import Dict, List, Tuple
+
+# third party
+import numpy as np
+
+# first party
+from dbt_faker.db.sequences import sequence_allocator
+from dbt_faker.factories.common import (
+    sample_key_pools,
+    seed_key_pools,
+    use_key_snapshot,
+)
+
+
+class BatchSnapshot:
+    """The warehouse state a sharded batch starts from.
+
+    A coordinator takes the snapshot once, before any shard runs, and every
+    shard reads it: sequences start where the snapshot says and parent keys
+    are drawn from the pools it sampled, not from the live warehouse.  The
+    shards then generate the rows of one unsharded run whether they run
+    together or one after another against the same warehouse.
+    """
+
+    def __init__(
+        self,
+        seed: int,
+        sequences: Dict[str, int],
+        key_pools: Dict[Tuple[str, str, int], np.ndarray],
+    ):
+        self.seed = seed
+        self.sequences = sequences
+        self.key_pools = key_pools
+
+    @classmethod
+    def take(cls, selected: List[Tuple[Dict, List[Dict]]], seed: int = None):
+        """Read the next key of every table of ``selected`` and sample the
+        key pools their factories draw from, with the seed of the run."""
+        sequences = {}
+        key_pools = {}
+        for etl_source, config in selected:
+            source_seed = seed if seed is not None else etl_source.get('seed')
+            if source_seed is None:
+                raise ValueError(
+                    f'{etl_source["schema"]} has no seed, sharded batches need one'
+                )
+            seed_key_pools(source_seed)
+            for orm_config in config:
+                model = orm_config['orm']
+                sequences[model.__table__.fullname] = sequence_allocator.peek(model)
+            key_pools.update(
+                sample_key_pools([orm_config['factory'] for orm_config in config])
+            )
+        return cls(seed, sequences, key_pools)
+
+    @contextlib.contextmanager
+    def applied(self, selected: List[Tuple[Dict, List[Dict]]]):
+        """Start the sequences of ``selected`` and draw parent keys from the
+        snapshot until exiting."""
+        for etl_source, config in selected:
+            for orm_config in config:
+                table = orm_config['orm'].__table__.fullname
+                if table not in self.sequences:
+                    raise ValueError(f'No {table} sequence in the batch snapshot')
+                sequence_allocator.start_at(orm_config['orm'], self.sequences[table])
+        use_key_snapshot(self.key_pools)
+        try:
+            yield self
+        finally:
+            use_key_snapshot(None)
+
+    def write(self, path: str):
+        with open(path, 'w') as f:
+            json.dump({
+                'seed': self.seed,
+                'sequences': self.sequences,
+                'key_pools': [
+                    {
+                        'table': table,
+                        'primary_key': primary_key,
+                        'sample': sample,
+                        'dtype': str(keys.dtype),
+                        'keys': keys.tolist(),
+                    }
+                    for (table, primary_key, sample), keys in self.key_pools.items()
+                ],
+            }, f)
+
+    @classmethod
+    def read(cls, path: str):
+        with open(path) as f:
+            snapshot = json.load(f)
+        return cls(
+            snapshot['seed'],
+            snapshot['sequences'],
+            {
+                (pool['table'], pool['primary_key'], pool['sample']):
+                    np.asarray(pool['keys'], dtype=pool['dtype'])
+                for pool in snapshot['key_pools']
+            },
+        )
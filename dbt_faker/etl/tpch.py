@@ -36,6 +36,8 @@ tpch_etl = {
             'perc_of_total_rows': .15,
             'orm': tpch_orms.PartSupp,
             'unique_subset': ['ps_partkey', 'ps_suppkey'],
+            # Also skip pairs already in the warehouse
+            'dedupe_existing': True,
             'update_cols': ['ps_availqty', 'ps_supplycost'],
         },
         {
@@ -50,26 +52,25 @@ tpch_etl = {
             'perc_of_total_rows': 1,
             'orm': tpch_orms.LineItem,
             'update_cols': ['l_returnflag'],
+            'loader': 'stage',
+        },
+    ],
+    # Tables the config draws keys from but never inserts into, seeded once
+    # with ``rows`` rows in a new local warehouse
+    'reference_tables': [
+        {
+            'factory': tpch_factories.RegionFactory,
+            'orm': tpch_orms.Region,
+            'rows': 5,
+        },
+        {
+            'factory': tpch_factories.NationFactory,
+            'orm': tpch_orms.Nation,
+            'rows': 25,
         },
     ],
     'rows': (500, 1000),
+    # Set for reproducible runs, required to generate in shards
+    'seed': None,
     'schema': 'TPCH',
-    'post_sql': [
-        '''
-        delete from doug_demo_v2.tpch.partsupp
-        where ps_partsuppkey in (
-            select ps_partsuppkey
-            from (
-                select
-                    ps_partsuppkey
-                    , row_number() over (
-                        partition by ps_partkey, ps_suppkey
-                        order by ps_partsuppkey
-                    ) as rn
-                from doug_demo_v2.tpch.partsupp
-            )
-            where rn > 1
-        );
-        '''
-    ]
 }
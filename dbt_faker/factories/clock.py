@@ -0,0 +1,40 @@
+# stdlib
+import contextlib
+import datetime
+
+# third party
+from faker.providers.date_time import Provider as DateTimeProvider
+
+
+# How far the simulated clock runs behind the real one, in whole days
+_offset = datetime.timedelta(0)
+
+
+def now() -> datetime.datetime:
+    """The current time, on the simulated day during a backfill."""
+    return datetime.datetime.now() - _offset
+
+
+def today() -> datetime.date:
+    return now().date()
+
+
+def parse_date(value) -> datetime.date:
+    """Faker style date argument (a date, ``'-30d'``, ``'today'``, a
+    timedelta...) with relative values taken from the simulated today."""
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return DateTimeProvider._parse_date(value)
+    return DateTimeProvider._parse_date(value) - _offset
+
+
+@contextlib.contextmanager
+def simulate(day: datetime.date):
+    """Run the block as if today was ``day``: timestamps keep the real time
+    of day, relative dates move with the day."""
+    global _offset
+    previous = _offset
+    _offset = datetime.timedelta(days=(datetime.date.today() - day).days)
+    try:
+        yield
+    finally:
+        _offset = previous
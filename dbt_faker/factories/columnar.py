@@ -0,0 +1,296 @@
+# stdlib
+import contextlib
+import threading
+import zlib
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+# third party
+import factory
+import faker
+import numpy as np
+import pandas as pd
+from factory import enums
+
+# first party
+from dbt_faker.db.sequences import sequence_allocator
+from dbt_faker.factories import clock
+from dbt_faker.factories.common import (
+    CombinationKey,
+    RandomLazyFunction,
+    factory_model,
+)
+from dbt_faker.factories.profiling import active_profiler
+from dbt_faker.factories.samplers import element_sampler
+from dbt_faker.factories.text_pools import DEFAULT_TEXT_POOL_SIZES, text_pools
+
+
+_rng = np.random.default_rng()
+
+# Faker providers that can be drawn as a whole column, keyed on provider name.
+# Each vectorizer is called as ``func(rng, rows, **provider_kwargs)`` and may
+# return None to fall back to calling Faker per row.
+FAKER_VECTORIZERS: Dict[str, Callable] = {}
+
+
+def register_faker_vectorizer(provider: str):
+    def decorator(func):
+        FAKER_VECTORIZERS[provider] = func
+        return func
+
+    return decorator
+
+
+@register_faker_vectorizer('random_int')
+def _random_int(rng, rows, min=0, max=9999, step=1):
+    return min + step * rng.integers(0, (max - min) // step + 1, size=rows)
+
+
+@register_faker_vectorizer('pyint')
+def _pyint(rng, rows, min_value=0, max_value=9999, step=1):
+    return _random_int(rng, rows, min=min_value, max=max_value, step=step)
+
+
+@register_faker_vectorizer('random_element')
+def _random_element(rng, rows, elements=('a', 'b', 'c')):
+    return element_sampler(elements).draw(rng, rows)
+
+
+@register_faker_vectorizer('date_between')
+def _date_between(rng, rows, start_date='-30y', end_date='today'):
+    start = np.datetime64(clock.parse_date(start_date), 'D')
+    end = np.datetime64(clock.parse_date(end_date), 'D')
+    days = (end - start).astype(int)
+    return start + rng.integers(0, days + 1, size=rows)
+
+
+def register_text_pool(provider: str, size: int = None):
+    """Draw ``provider`` from a pre-generated pool of (up to) ``size``
+    distinct values instead of calling Faker for every row."""
+    if size is not None:
+        text_pools.set_size(provider, size)
+    elif provider not in text_pools.sizes:
+        raise ValueError(f'No text pool size configured for {provider}')
+
+    @register_faker_vectorizer(provider)
+    def draw(rng, rows, **kwargs):
+        # Pools are built without provider arguments
+        if kwargs:
+            return None
+        return text_pools.get(provider).draw(rng, rows)
+
+
+for _provider in DEFAULT_TEXT_POOL_SIZES:
+    register_text_pool(_provider)
+
+
+def _sequence_column(declaration, sequences):
+    # Sequence functions are usually simple arithmetic (``lambda n: n``) and
+    # work on the whole array at once; anything else is mapped element-wise.
+    try:
+        values = declaration.function(sequences)
+    except Exception:
+        values = None
+    if isinstance(values, np.ndarray) and values.shape == sequences.shape:
+        return values
+    return [declaration.function(int(n)) for n in sequences]
+
+
+_local = threading.local()
+
+
+def _thread_faker(locale=None) -> faker.Faker:
+    # Faker instances aren't safe to reseed while other tables' threads use
+    # them, so every thread gets its own
+    fakers = getattr(_local, 'fakers', None)
+    if fakers is None:
+        fakers = _local.fakers = {}
+    locale = locale or factory.Faker._DEFAULT_LOCALE
+    if locale not in fakers:
+        fakers[locale] = faker.Faker(locale)
+    return fakers[locale]
+
+
+def _faker_column(declaration, rng, rows):
+    kwargs = dict(declaration._defaults)
+    locale = kwargs.pop('locale', None)
+    if any(enums.get_builder_phase(v) for v in kwargs.values()):
+        return None
+
+    vectorizer = FAKER_VECTORIZERS.get(declaration.provider)
+    if vectorizer is not None and locale is None:
+        column = vectorizer(rng, rows, **kwargs)
+        if column is not None:
+            return column
+
+    # Not vectorizable, but still cheaper than going through factory-boy.
+    # The faker is reseeded from ``rng`` so seeded runs stay reproducible.
+    fake = _thread_faker(locale)
+    fake.seed_instance(int(rng.integers(2 ** 32)))
+    return [fake.format(declaration.provider, **kwargs) for _ in range(rows)]
+
+
+def _column(declaration, rng, rows, sequences):
+    """Generate a whole column for ``declaration``, or None if it must be
+    resolved row by row by factory-boy."""
+    if enums.get_builder_phase(declaration) is None:
+        return [declaration] * rows
+
+    if isinstance(declaration, CombinationKey):
+        return declaration.draw(sequences)
+
+    if isinstance(declaration, RandomLazyFunction):
+        return declaration.sampler().draw(rng, rows)
+
+    if isinstance(declaration, factory.Faker):
+        return _faker_column(declaration, rng, rows)
+
+    if isinstance(declaration, factory.Sequence) and not isinstance(
+        declaration, factory.LazyAttributeSequence
+    ):
+        return _sequence_column(declaration, sequences)
+
+    if isinstance(declaration, factory.LazyFunction):
+        return [declaration.function() for _ in range(rows)]
+
+    return None
+
+
+def _build_df(dict_factory, rows: int, rng, start: int = None) -> pd.DataFrame:
+    meta = dict_factory._meta
+
+    if start is None:
+        start = sequence_allocator.reserve(factory_model(dict_factory), rows)
+    sequences = np.arange(start, start + rows)
+
+    profiler = active_profiler()
+    factory_name = meta.base_factory.__name__
+
+    columns = {}
+    fallback = []
+    for name in meta.pre_declarations.sorted():
+        declaration = meta.pre_declarations[name]
+        column = None
+        if not declaration.context:
+            if profiler is None:
+                column = _column(declaration.declaration, rng, rows, sequences)
+            else:
+                with profiler.measure(factory_name, name, rows) as measured:
+                    column = _column(declaration.declaration, rng, rows, sequences)
+                    measured.discard = column is None
+        if column is None:
+            fallback.append(name)
+        else:
+            columns[name] = column
+
+    df = pd.DataFrame(columns, index=pd.RangeIndex(rows))
+    if fallback:
+        with contextlib.ExitStack() as stack:
+            if profiler is not None:
+                stack.enter_context(profiler.per_row(factory_name, {
+                    name: meta.pre_declarations[name].declaration
+                    for name in fallback
+                }))
+            built = [
+                dict_factory.build(__sequence=int(sequence), **overrides)
+                for sequence, overrides in zip(sequences, df.to_dict('records'))
+            ]
+        for name in fallback:
+            if built and name in built[0]:
+                df[name] = [row[name] for row in built]
+
+    hidden = set(meta.exclude) | set(meta.parameters)
+    return df.drop(columns=[col for col in df.columns if col in hidden])
+
+
+def block_rng(seed: int, factory_class, block: int) -> np.random.Generator:
+    """Independent random stream for one block of a factory's rows.
+
+    Streams only depend on the seed, factory and block number, so a block
+    is generated identically whichever process or shard generates it.
+    """
+    name = zlib.crc32(factory_class.__name__.encode())
+    return np.random.default_rng([seed, name, block])
+
+
+def factory_to_df(
+    factory_class, rows: int, rng=None, start: int = None
+) -> pd.DataFrame:
+    """Columnar equivalent of ``factory_to_dict``.
+
+    Declarations are read off ``factory_class`` and generated a column at a
+    time.  Declarations that can't be vectorized (LazyAttribute, SubFactory,
+    ...) are resolved by factory-boy per row, with the vectorized values
+    passed in as overrides so they can still be referenced.
+
+    The rows get a newly reserved sequence range unless ``start`` is given,
+    e.g. for rows that replace existing ones and keep their keys.
+    """
+    rng = rng if rng is not None else _rng
+    dict_factory = factory.make_factory(dict, FACTORY_CLASS=factory_class)
+    return _build_df(dict_factory, rows, rng, start=start)
+
+
+def estimate_row_bytes(factory_class, rows: int = 1000, rng=None) -> float:
+    """Average in-memory size, in bytes, of a row of ``factory_class``.
+
+    Measured on a sample of ``rows`` rows; no keys are reserved for it.
+    """
+    rng = rng if rng is not None else _rng
+    dict_factory = factory.make_factory(dict, FACTORY_CLASS=factory_class)
+    start = sequence_allocator.peek(factory_model(factory_class))
+    df = _build_df(dict_factory, rows, rng, start=start)
+    return df.memory_usage(index=False, deep=True).sum() / rows
+
+
+def sequence_values(
+    factory_class, name: str, start: int, rows: int
+) -> Optional[np.ndarray]:
+    """Values of the ``name`` column of ``rows`` rows generated from
+    sequence ``start`` on, if it's a ``factory.Sequence``; None otherwise."""
+    declarations = factory_class._meta.pre_declarations.declarations
+    declaration = declarations.get(name)
+    if not isinstance(declaration, factory.Sequence) or isinstance(
+        declaration, factory.LazyAttributeSequence
+    ):
+        return None
+    return np.asarray(
+        _sequence_column(declaration, np.arange(start, start + rows))
+    )
+
+
+def factory_to_chunks(
+    factory_class,
+    rows: int,
+    chunk_rows: int,
+    rng=None,
+    seed: int = None,
+    shard: Tuple[int, int] = (0, 1),
+    start: int = None,
+) -> Iterator[pd.DataFrame]:
+    """Generate ``rows`` rows as a stream of DataFrames of at most
+    ``chunk_rows`` rows each.
+
+    The sequence range for all ``rows`` is reserved up front, unless it
+    starts at ``start``, and chunk ``b`` always gets the ``b``-th slice of
+    it.  With a ``seed`` each chunk draws
+    from its own ``block_rng`` stream, and ``shard=(i, n)`` only yields the
+    chunks ``b`` where ``b % n == i``.  N shards with the same seed therefore
+    generate exactly the rows of a single unsharded run.
+    """
+    rng = rng if rng is not None else _rng
+    shard_index, shard_count = shard
+    dict_factory = factory.make_factory(dict, FACTORY_CLASS=factory_class)
+
+    if start is None:
+        start = sequence_allocator.reserve(factory_model(factory_class), rows)
+    for block, offset in enumerate(range(0, rows, chunk_rows)):
+        if block % shard_count != shard_index:
+            continue
+        if seed is not None:
+            rng = block_rng(seed, factory_class, block)
+        yield _build_df(
+            dict_factory,
+            min(chunk_rows, rows - offset),
+            rng,
+            start=start + offset,
+        )
@@ -1,67 +1,249 @@
 # stdlib
-import datetime
-import random
-from functools import cache
+import logging
+from concurrent.futures import Future
+from typing import Dict, List
 
 # third party
 import factory
+import numpy as np
 import sqlalchemy as sa
+from factory import enums
 
 # first party
-from dbt_faker.db.base import get_session, get_warehouse_engine
+from dbt_faker.db.base import get_warehouse_engine
+from dbt_faker.db.dialects import get_dialect
+from dbt_faker.db.metadata import table_registry
+from dbt_faker.db.sequences import sequence_allocator
+from dbt_faker.factories import clock
+from dbt_faker.factories.key_pools import (
+    key_pool_cache,
+    key_registry,
+    model_key,
+)
+from dbt_faker.factories.profiling import active_profiler
+from dbt_faker.factories.samplers import combination_sampler, key_pool_sampler
+from dbt_faker.utils.metrics import run_metrics
 
 
-@cache
-def _get_current_records(model, primary_key, sample):
-    schema = model.__table_args__['schema']
-    table = model.__tablename__
+logger = logging.getLogger(__name__)
+
+_sample_seed = None
+_key_snapshot = None
+
+
+def seed_key_pools(seed):
+    """Make warehouse key samples repeatable: the same seed and table
+    contents give the same pool, in the same order.  Pools sampled with
+    the same seed are kept."""
+    global _sample_seed
+    if seed == _sample_seed:
+        return
+    _sample_seed = seed
+    key_pool_cache.invalidate()
+
+
+def use_key_snapshot(pools):
+    """Draw parent keys from ``pools``, keyed on (table, primary key,
+    sample) like ``sample_key_pools``, instead of sampling the warehouse.
+    ``None`` samples the warehouse again."""
+    global _key_snapshot
+    _key_snapshot = pools
+    key_pool_cache.invalidate()
+
+
+def _sample_records(model, primary_key, sample):
+    if _key_snapshot is not None:
+        keys = _key_snapshot.get((model_key(model), primary_key, sample))
+        if keys is None:
+            raise ValueError(
+                f'No {model_key(model)}.{primary_key} keys in the batch snapshot'
+            )
+        return keys
+
+    # Imported here as the etl package imports the factories
+    from dbt_faker.etl.common import select_to_df
+
     engine = get_warehouse_engine()
-    ls = []
-    sql = f'''
-        select {primary_key}
-        from {table}
-        sample ({sample})
-    '''
+    column = table_registry.get(model).table.c[primary_key]
+    stmt = get_dialect(engine).sample(column, percent=sample, seed=_sample_seed)
     with engine.connect() as conn:
-        conn.execute(f'USE SCHEMA {schema};')
-        result = conn.execute(sql)
-        for row in result:
-            ls.append(getattr(row, primary_key))
-    return ls
+        keys = select_to_df(stmt if stmt is not None else sa.select(column), conn)
+    keys = keys[primary_key]
+    keys = keys.to_numpy(dtype=keys.dtype.numpy_dtype)
+    if _sample_seed is not None:
+        keys = np.sort(keys)
+    if stmt is None:
+        # The dialect can't sample (repeatably), so every key was read
+        rng = np.random.default_rng(_sample_seed)
+        keys = keys[rng.random(len(keys)) < sample / 100]
+    return keys
+
+
+def _get_current_records(model, primary_key, sample):
+    table = model_key(model)
+    fetched = False
+
+    def fetch(model, primary_key, sample):
+        nonlocal fetched
+        fetched = True
+        with run_metrics.stage(table, 'key_fetch') as stage:
+            keys = _sample_records(model, primary_key, sample)
+            stage.rows = len(keys)
+        return keys
+
+    keys = key_pool_cache.get(model, primary_key, sample, fetch)
+    run_metrics.increment(
+        table, 'key_pool_misses' if fetched else 'key_pool_hits'
+    )
+    return keys
+
+
+def records_getter(model, primary_key, sample):
+    """Build a ``RandomLazyFunction`` source returning sampled keys of
+    ``model``.  The model, key and sample are kept on the getter so
+    dependencies between factories can be worked out and pools primed."""
+    def get_records():
+        return _get_current_records(model, primary_key, sample)
+
+    get_records.model = model
+    get_records.primary_key = primary_key
+    get_records.sample = sample
+    return get_records
+
+
+def key_pool_getters(factory_classes) -> List:
+    """The ``records_getter`` of every key pool ``factory_classes`` draw
+    parent keys from, once each."""
+    getters = {}
+    for factory_class in factory_classes:
+        declarations = factory_class._meta.pre_declarations.declarations
+        for declaration in declarations.values():
+            if isinstance(declaration, RandomLazyFunction):
+                getters[id(declaration.function)] = declaration.function
+    return list(getters.values())
+
+
+def sample_key_pools(factory_classes) -> Dict:
+    """Sample every key pool ``factory_classes`` draw from, bypassing the
+    cache; returns the keys by (table, primary key, sample)."""
+    return {
+        (model_key(getter.model), getter.primary_key, getter.sample):
+            _sample_records(getter.model, getter.primary_key, getter.sample)
+        for getter in key_pool_getters(factory_classes)
+        if getattr(getter, 'model', None) is not None
+    }
+
+
+def prefetch_key_pools(factory_classes, executor) -> List[Future]:
+    """Start sampling every key pool ``factory_classes`` draw parent keys
+    from on ``executor``.  Factories needing a pool before it's loaded wait
+    for the prefetch rather than querying again."""
+    futures = []
+    for getter in key_pool_getters(factory_classes):
+        future = executor.submit(getter)
+        future.add_done_callback(_log_prefetch_error)
+        futures.append(future)
+    return futures
+
+
+def _log_prefetch_error(future: Future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning(f'Key pool prefetch failed: {future.exception()}')
+
+
+def factory_model(factory_class):
+    """The orm model behind ``factory_class`` or a dict factory built on it."""
+    if factory_class._meta.model is dict:
+        return factory_class._meta.base_factory._meta.model
+    return factory_class._meta.model
 
 
 def factory_to_dict(factory_class, rows):
-    return factory.build_batch(dict, rows, FACTORY_CLASS=factory_class)
+    dict_factory = factory.make_factory(dict, FACTORY_CLASS=factory_class)
+    dict_factory.reset_sequence(
+        sequence_allocator.reserve(factory_model(factory_class), rows)
+    )
+    profiler = active_profiler()
+    if profiler is None:
+        return dict_factory.build_batch(rows)
+
+    declarations = dict_factory._meta.pre_declarations
+    with profiler.per_row(factory_class.__name__, {
+        name: declarations[name].declaration
+        for name in declarations.sorted()
+        if enums.get_builder_phase(declarations[name].declaration) is not None
+    }):
+        return dict_factory.build_batch(rows)
 
 
 class dbtFactory(factory.alchemy.SQLAlchemyModelFactory):
-    _etl_updated_timestamp = factory.LazyFunction(datetime.datetime.now)
-    
+    _etl_updated_timestamp = factory.LazyFunction(clock.now)
+
     @classmethod
     def _setup_next_sequence(cls):
-        if cls._meta.model is dict:
-            model = cls._meta.base_factory._meta.model
-        else:
-            model = cls._meta.model
-        session = get_session()
-        primary_key = [col for col in model.__table__.c if col.primary_key][0].name
-        try:
-            obj = session.query(model).order_by(
-                getattr(model, primary_key).desc()
-            ).first()
-            return getattr(obj, primary_key) + 1
-
-        except AttributeError:
-            return 1
+        return sequence_allocator.peek(factory_model(cls))
 
 
 class RandomLazyFunction(factory.LazyFunction):
     def __init__(self, function):
         return super().__init__(function)
-    
+
+    def new_keys(self):
+        """Keys of the function's model created earlier in this run."""
+        model = getattr(self.function, 'model', None)
+        if model is None:
+            return ()
+        return key_registry.keys(model)
+
+    def sampler(self):
+        """Sampler over the warehouse pool plus keys created in this run."""
+        model = getattr(self.function, 'model', None)
+        what = f'parent keys for {model_key(model)}' if model else 'parent keys'
+        return key_pool_sampler(self.function(), self.new_keys(), what=what)
+
     def evaluate(self, instance, step, extra):
-        choices = self.function()
-        return random.choice(choices)
-        
-        
+        return self.sampler().draw_one()
+
+
+class CombinationKey(RandomLazyFunction):
+    """One column of a ``KeyCombination``."""
+
+    def __init__(self, combination, index, function):
+        super().__init__(function)
+        self.combination = combination
+        self.index = index
+
+    def draw(self, sequences) -> np.ndarray:
+        return self.combination.sampler().take(sequences)[self.index]
+
+    def evaluate(self, instance, step, extra):
+        return self.draw([step.sequence])[0]
+
+
+class KeyCombination:
+    """Parent keys drawn together so that rows get distinct combinations,
+    e.g. the (part, supplier) pairs of partsupp::
+
+        ps_partkey, ps_suppkey = KeyCombination(
+            get_part_records, get_supplier_records
+        ).keys
+
+    A row's combination is picked by its sequence number from the product
+    of the key pools, without replacement, so a batch no larger than the
+    product has no duplicate combinations to drop.
+    """
+
+    def __init__(self, *functions):
+        self.keys = tuple(
+            CombinationKey(self, index, function)
+            for index, function in enumerate(functions)
+        )
+
+    def sampler(self):
+        samplers = [key.sampler() for key in self.keys]
+        for sampler in samplers:
+            sampler.check_not_empty()
+        return combination_sampler(*(sampler.values for sampler in samplers))
+
+
 Session = sa.orm.scoped_session(sa.orm.sessionmaker())
@@ -0,0 +1,183 @@
+# stdlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, Optional
+
+# third party
+import numpy as np
+
+
+def model_key(model) -> str:
+    """Cache key for an orm model, e.g. ``TPCH.lineitem``."""
+    return f'{model.__table_args__["schema"]}.{model.__tablename__}'
+
+
+class _Pool:
+    __slots__ = ('keys', 'expires_at')
+
+    def __init__(self, keys: np.ndarray, expires_at: float):
+        self.keys = keys
+        self.expires_at = expires_at
+
+
+class KeyPoolCache:
+    """Cache of sampled primary keys, used as parent keys by factories.
+
+    Pools expire after a per-model TTL and the cache holds at most
+    ``max_keys`` keys in total, evicting the least recently used pools
+    first.  Keys inserted during a run are kept apart, in the
+    ``KeyRegistry``.
+
+    Concurrent requests for a pool that is being loaded wait for that load
+    instead of querying again, so pools can be prefetched in the background.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 3600,
+        max_keys: int = 5_000_000,
+        ttls: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.ttls = dict(ttls or {})
+        self.clock = clock
+        self._pools = OrderedDict()
+        self._loading: Dict[tuple, Future] = {}
+        self._size = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def set_ttl(self, model, ttl: float):
+        self.ttls[model_key(model)] = ttl
+
+    def get(self, model, primary_key: str, sample, loader: Callable) -> np.ndarray:
+        """Return the pool for ``model``, calling
+        ``loader(model, primary_key, sample)`` on a miss or expired entry."""
+        key = (model_key(model), primary_key, sample)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is not None and pool.expires_at > self.clock():
+                self._pools.move_to_end(key)
+                self.hits += 1
+                return pool.keys
+
+            loading = self._loading.get(key)
+            if loading is None:
+                self.misses += 1
+                if pool is not None:
+                    self._remove(key)
+                loading = self._loading[key] = Future()
+                owner = True
+            else:
+                self.hits += 1
+                owner = False
+
+        if not owner:
+            return loading.result()
+
+        # Query outside the lock so other pools can be served meanwhile
+        try:
+            keys = loader(model, primary_key, sample)
+            if not isinstance(keys, np.ndarray):
+                keys = np.asarray(list(keys))
+        except BaseException as e:
+            with self._lock:
+                del self._loading[key]
+            loading.set_exception(e)
+            raise
+
+        ttl = self.ttls.get(key[0], self.ttl)
+        with self._lock:
+            if key in self._pools:
+                self._remove(key)
+            self._pools[key] = _Pool(keys, self.clock() + ttl)
+            self._size += len(keys)
+            self._evict(keep=key)
+            del self._loading[key]
+        loading.set_result(keys)
+        return keys
+
+    def invalidate(self, model=None):
+        """Drop the pools of ``model``, or every pool if no model is given."""
+        with self._lock:
+            table = model_key(model) if model is not None else None
+            for key in list(self._pools):
+                if table is None or key[0] == table:
+                    self._remove(key)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'pools': {
+                    f'{table}.{pk} ({sample})': len(pool.keys)
+                    for (table, pk, sample), pool in self._pools.items()
+                },
+                'keys': self._size,
+            }
+
+    def _remove(self, key):
+        pool = self._pools.pop(key)
+        self._size -= len(pool.keys)
+
+    def _evict(self, keep=None):
+        for key in list(self._pools):
+            if self._size <= self.max_keys:
+                break
+            if key != keep:
+                self._remove(key)
+                self.evictions += 1
+
+
+key_pool_cache = KeyPoolCache()
+
+
+class KeyRegistry:
+    """Primary keys generated and loaded by this process, per model.
+
+    Factories drawing parent keys combine these with the sampled warehouse
+    pool, so rows created earlier in the run can be referenced without
+    querying for them.
+    """
+
+    def __init__(self):
+        self._chunks = {}
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def publish(self, model, keys: Iterable):
+        keys = np.asarray(keys)
+        table = model_key(model)
+        with self._lock:
+            self._chunks.setdefault(table, []).append(keys)
+            self._keys.pop(table, None)
+
+    def keys(self, model) -> np.ndarray:
+        table = model_key(model)
+        with self._lock:
+            if table not in self._keys:
+                chunks = self._chunks.get(table)
+                self._keys[table] = (
+                    np.concatenate(chunks) if chunks else np.empty(0, dtype=int)
+                )
+            return self._keys[table]
+
+    def clear(self, model=None):
+        with self._lock:
+            if model is None:
+                self._chunks.clear()
+                self._keys.clear()
+            else:
+                self._chunks.pop(model_key(model), None)
+                self._keys.pop(model_key(model), None)
+
+
+key_registry = KeyRegistry()
@@ -0,0 +1,175 @@
+# stdlib
+import contextlib
+import threading
+import time
+import tracemalloc
+from typing import Dict, Iterator, List, Optional
+
+
+class _Measurement:
+    __slots__ = ('started', 'child_ns', 'memory', 'child_bytes', 'discard')
+
+    def __init__(self, started: int, memory: int):
+        self.started = started
+        self.child_ns = 0
+        self.memory = memory
+        self.child_bytes = 0
+        self.discard = False
+
+
+class DeclarationProfiler:
+    """Time, and optionally memory, spent on each declaration of each
+    factory.
+
+    Columns generated in one go are recorded as 'vectorized', declarations
+    left to factory-boy as 'per_row'.  Time spent resolving a declaration
+    that another one references (e.g. a LazyAttribute reading a Faker
+    field) counts towards the referenced declaration only.
+
+    With ``allocations`` memory is traced with tracemalloc, which is slow
+    and process wide: profile with a single worker for exact numbers.
+    """
+
+    def __init__(self, allocations: bool = False):
+        self.allocations = allocations
+        self._totals: Dict[tuple, Dict] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._patched: Dict[int, list] = {}
+
+    def _memory(self) -> int:
+        return tracemalloc.get_traced_memory()[0] if self.allocations else 0
+
+    @contextlib.contextmanager
+    def measure(
+        self, factory_name: str, name: str, rows: int, path: str = 'vectorized'
+    ) -> Iterator[_Measurement]:
+        stack = self._local.__dict__.setdefault('stack', [])
+        current = _Measurement(time.perf_counter_ns(), self._memory())
+        stack.append(current)
+        try:
+            yield current
+        finally:
+            stack.pop()
+            elapsed = time.perf_counter_ns() - current.started
+            allocated = self._memory() - current.memory
+            if not current.discard:
+                if stack:
+                    stack[-1].child_ns += elapsed
+                    stack[-1].child_bytes += allocated
+                self.record(
+                    factory_name,
+                    name,
+                    path,
+                    rows,
+                    elapsed - current.child_ns,
+                    allocated - current.child_bytes,
+                )
+
+    def record(
+        self,
+        factory_name: str,
+        name: str,
+        path: str,
+        rows: int,
+        ns: int,
+        allocated: int = 0,
+    ):
+        with self._lock:
+            totals = self._totals.setdefault(
+                (factory_name, name, path), {'rows': 0, 'ns': 0, 'bytes': 0}
+            )
+            totals['rows'] += rows
+            totals['ns'] += ns
+            totals['bytes'] += allocated
+
+    @contextlib.contextmanager
+    def per_row(self, factory_name: str, declarations: Dict):
+        """Time every ``evaluate`` call of ``declarations`` (name to
+        declaration) while factory-boy builds rows."""
+        patched = []
+        with self._lock:
+            for name, declaration in declarations.items():
+                entry = self._patched.get(id(declaration))
+                if entry is None:
+                    entry = [declaration, 0]
+                    self._patched[id(declaration)] = entry
+                    declaration.evaluate = self._timed_evaluate(
+                        factory_name, name, declaration.evaluate
+                    )
+                entry[1] += 1
+                patched.append(declaration)
+        try:
+            yield
+        finally:
+            with self._lock:
+                for declaration in patched:
+                    entry = self._patched[id(declaration)]
+                    entry[1] -= 1
+                    if not entry[1]:
+                        del self._patched[id(declaration)]
+                        del declaration.evaluate
+
+    def _timed_evaluate(self, factory_name, name, evaluate):
+        def timed(instance, step, extra):
+            with self.measure(factory_name, name, 1, path='per_row'):
+                return evaluate(instance, step, extra)
+        return timed
+
+    def report(self) -> List[Dict]:
+        """Declarations ranked by the total time spent on them."""
+        with self._lock:
+            totals = dict(self._totals)
+        total_ns = sum(t['ns'] for t in totals.values()) or 1
+        ranked = [
+            {
+                'factory': factory_name,
+                'declaration': name,
+                'path': path,
+                'rows': t['rows'],
+                'seconds': t['ns'] / 1e9,
+                'ns_per_row': t['ns'] / t['rows'] if t['rows'] else 0,
+                'bytes_per_row': t['bytes'] / t['rows'] if t['rows'] else 0,
+                'share': t['ns'] / total_ns,
+            }
+            for (factory_name, name, path), t in totals.items()
+        ]
+        return sorted(ranked, key=lambda r: r['seconds'], reverse=True)
+
+    def format_report(self, top: Optional[int] = None) -> str:
+        lines = [
+            f'{"declaration":<40} {"path":<10} {"rows":>10} {"seconds":>9} '
+            f'{"ns/row":>11} {"share":>6}'
+            + (f' {"B/row":>9}' if self.allocations else '')
+        ]
+        for r in self.report()[:top]:
+            lines.append(
+                f'{r["factory"] + "." + r["declaration"]:<40} {r["path"]:<10} '
+                f'{r["rows"]:>10} {r["seconds"]:>9.3f} '
+                f'{r["ns_per_row"]:>11,.0f} {r["share"]:>6.1%}'
+                + (f' {r["bytes_per_row"]:>9,.0f}' if self.allocations else '')
+            )
+        return '\n'.join(lines)
+
+
+_active: Optional[DeclarationProfiler] = None
+
+
+def active_profiler() -> Optional[DeclarationProfiler]:
+    return _active
+
+
+@contextlib.contextmanager
+def profile_declarations(allocations: bool = False):
+    """Profile the declarations of every factory built inside the block."""
+    global _active
+    started_tracing = allocations and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    profiler = _active = DeclarationProfiler(allocations=allocations)
+    try:
+        yield profiler
+    finally:
+        _active = None
+        if started_tracing:
+            tracemalloc.stop()
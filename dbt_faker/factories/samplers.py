@@ -0,0 +1,219 @@
+# stdlib
+import random
+import threading
+import zlib
+from collections import OrderedDict
+from typing import List, Sequence
+
+# third party
+import numpy as np
+
+
+def as_array(values) -> np.ndarray:
+    arr = np.asarray(values)
+    if arr.dtype.kind in ('U', 'S'):
+        arr = arr.astype(object)
+    return arr
+
+
+class _ArraySampler:
+    """Base of the samplers drawing from the array ``values``."""
+
+    values: np.ndarray
+    _elements = None
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def elements(self) -> list:
+        """``values`` as Python objects for ``draw_one``.  Only built on the
+        first single draw, as columnar generation draws from ``values``."""
+        if self._elements is None:
+            self._elements = self.values.tolist()
+        return self._elements
+
+
+class UniformSampler(_ArraySampler):
+    """Uniform choice over ``elements``, converted to an array once.
+    ``what`` names the elements in the error raised when there are none."""
+
+    def __init__(self, elements: Sequence, what: str = 'elements'):
+        if not isinstance(elements, np.ndarray):
+            elements = list(elements)
+        self.values = as_array(elements)
+        self.what = what
+
+    def check_not_empty(self):
+        if not len(self.values):
+            raise ValueError(f'No {self.what} to draw from')
+
+    def draw(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        self.check_not_empty()
+        return self.values[rng.integers(0, len(self.values), size=n)]
+
+    def draw_one(self, rand=random):
+        self.check_not_empty()
+        return self.elements[rand.randrange(len(self.values))]
+
+
+class AliasSampler(_ArraySampler):
+    """Weighted choice in O(1) per draw using Vose's alias method."""
+
+    def __init__(self, elements: Sequence, weights: Sequence[float]):
+        self.values = as_array(list(elements))
+
+        k = len(self.values)
+        scaled = np.asarray(weights, dtype=float)
+        scaled = scaled * k / scaled.sum()
+        self.prob = np.ones(k)
+        self.alias = np.arange(k)
+        small = [i for i in range(k) if scaled[i] < 1]
+        large = [i for i in range(k) if scaled[i] >= 1]
+        while small and large:
+            s = small.pop()
+            g = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = g
+            scaled[g] -= 1 - scaled[s]
+            (small if scaled[g] < 1 else large).append(g)
+        self._prob = self.prob.tolist()
+        self._alias = self.alias.tolist()
+
+    def draw(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        i = rng.integers(0, len(self.values), size=n)
+        keep = rng.random(n) < self.prob[i]
+        return self.values[np.where(keep, i, self.alias[i])]
+
+    def draw_one(self, rand=random):
+        i = rand.randrange(len(self.values))
+        if rand.random() >= self._prob[i]:
+            i = self._alias[i]
+        return self.elements[i]
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    # splitmix64 finalizer
+    with np.errstate(over='ignore'):
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+class CombinationSampler:
+    """Distinct combinations of one element of each of ``pools``.
+
+    The Cartesian product of the pools is never built: combination ``i``
+    is decoded into one index per pool by mixed-radix arithmetic, and
+    positions are mapped to combinations by a keyed Feistel permutation of
+    ``[0, len(self))``.  Distinct positions, e.g. row sequence numbers,
+    therefore always get distinct combinations until they wrap around the
+    size of the product.  The key is derived from the pools, so the same
+    pools give the same combinations.
+    """
+
+    ROUNDS = 4
+
+    def __init__(self, pools: Sequence[Sequence]):
+        self.pools = [as_array(pool) for pool in pools]
+        self.sizes = [len(pool) for pool in self.pools]
+        self.space = 1
+        for size in self.sizes:
+            self.space *= size
+        if not self.space:
+            raise ValueError('Can\'t combine keys of an empty pool')
+        if self.space >= 2 ** 63:
+            raise ValueError(f'Too many combinations to draw from: {self.space}')
+
+        self._half_bits = max(1, ((self.space - 1).bit_length() + 1) // 2)
+        self._mask = np.uint64((1 << self._half_bits) - 1)
+        key = 0
+        for pool in self.pools:
+            key = zlib.crc32(np.asarray(pool, dtype=np.int64).tobytes(), key)
+        self._round_keys = _mix(
+            np.arange(self.ROUNDS, dtype=np.uint64) + np.uint64(key << 8)
+        )
+
+    def __len__(self):
+        return self.space
+
+    def _feistel(self, x: np.ndarray) -> np.ndarray:
+        half = np.uint64(self._half_bits)
+        left, right = x >> half, x & self._mask
+        for key in self._round_keys:
+            left, right = right, left ^ (_mix(right ^ key) & self._mask)
+        return (left << half) | right
+
+    def permute(self, positions) -> np.ndarray:
+        """Combination index of each of ``positions``, taken modulo the
+        number of combinations."""
+        x = np.asarray(positions, dtype=np.int64) % self.space
+        x = self._feistel(x.astype(np.uint64))
+        # Cycle-walk values that landed outside the product, at most a
+        # few rounds as the Feistel domain is under 4x its size
+        outside = x >= np.uint64(self.space)
+        while outside.any():
+            x[outside] = self._feistel(x[outside])
+            outside = x >= np.uint64(self.space)
+        return x.astype(np.int64)
+
+    def take(self, positions) -> List[np.ndarray]:
+        """Elements of each pool making up the combinations at ``positions``."""
+        index = self.permute(positions)
+        columns = []
+        for pool, size in zip(reversed(self.pools), reversed(self.sizes)):
+            index, element = np.divmod(index, size)
+            columns.append(pool[element])
+        return columns[::-1]
+
+
+_lock = threading.Lock()
+_MAX_CACHED = 64
+_samplers = OrderedDict()
+
+
+def _cached(key, refs, build):
+    # ``refs`` keeps the keyed objects alive so their ids can't be reused
+    with _lock:
+        entry = _samplers.get(key)
+        if entry is not None:
+            _samplers.move_to_end(key)
+            return entry[1]
+
+    sampler = build()
+    with _lock:
+        _samplers[key] = (refs, sampler)
+        while len(_samplers) > _MAX_CACHED:
+            _samplers.popitem(last=False)
+    return sampler
+
+
+def element_sampler(elements):
+    """Sampler for Faker style ``elements``: a mapping of element to weight
+    is drawn with an alias table, anything else uniformly."""
+    def build():
+        if isinstance(elements, dict):
+            return AliasSampler(elements.keys(), list(elements.values()))
+        return UniformSampler(elements)
+
+    return _cached(('elements', id(elements), len(elements)), elements, build)
+
+
+def key_pool_sampler(*pools, what: str = 'keys'):
+    """Uniform sampler over the concatenation of key ``pools``, reused for
+    as long as none of the pools is replaced or grows."""
+    def build():
+        non_empty = [np.asarray(pool) for pool in pools if len(pool)]
+        if not non_empty:
+            return UniformSampler([], what=what)
+        return UniformSampler(np.concatenate(non_empty), what=what)
+
+    key = ('pools', what) + tuple((id(pool), len(pool)) for pool in pools)
+    return _cached(key, pools, build)
+
+
+def combination_sampler(*pools):
+    """Combinations of ``pools``, rebuilt only when a pool is replaced or
+    grows."""
+    key = ('combinations',) + tuple((id(pool), len(pool)) for pool in pools)
+    return _cached(key, pools, lambda: CombinationSampler(pools))
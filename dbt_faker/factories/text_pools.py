@@ -0,0 +1,126 @@
+# stdlib
+import logging
+import os
+import threading
+import zlib
+from typing import Dict, Optional
+
+# third party
+import faker
+import numpy as np
+
+# first party
+from dbt_faker.utils.metrics import run_metrics
+
+
+logger = logging.getLogger(__name__)
+
+# Distinct values kept per provider.  Smaller pools are cheaper to build and
+# load but repeat values more often.  These build in about 3s altogether,
+# which a fresh CI runner without the pool directory cached pays every run.
+DEFAULT_TEXT_POOL_SIZES: Dict[str, int] = {
+    'bs': 10_000,
+    'catch_phrase': 10_000,
+    'company': 2_000,
+    'domain_word': 1_000,
+    'name': 5_000,
+    'phone_number': 10_000,
+    'street_address': 5_000,
+}
+
+DEFAULT_TEXT_POOL_DIR = os.path.join(
+    os.path.expanduser('~'), '.cache', 'dbt_faker', 'text_pools'
+)
+
+
+class TextPool:
+    """Pre-generated values of a Faker provider, drawn uniformly."""
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+
+    def __len__(self):
+        return len(self.values)
+
+    def draw(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        return self.values[rng.integers(0, len(self.values), size=n)].astype(object)
+
+
+def build_values(provider: str, size: int, locale: str) -> np.ndarray:
+    """Up to ``size`` distinct values of ``provider``.  Faker is seeded from
+    the provider name so the same version of Faker builds the same pool."""
+    fake = faker.Faker(locale)
+    fake.seed_instance(zlib.crc32(provider.encode()))
+    values = {}
+    for _ in range(size * 3):
+        values[fake.format(provider)] = None
+        if len(values) == size:
+            break
+    return np.array(list(values))
+
+
+class TextPools:
+    """Text pools per provider, built once and kept as ``.npy`` files in
+    ``directory`` that are memory-mapped when they're loaded again.
+
+    Files are keyed on the provider, locale, size and Faker version, so
+    changing any of them builds a new pool.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        sizes: Optional[Dict[str, int]] = None,
+        locale: str = 'en_US',
+    ):
+        self.directory = directory or os.environ.get(
+            'DBT_FAKER_TEXT_POOL_DIR', DEFAULT_TEXT_POOL_DIR
+        )
+        self.sizes = dict(DEFAULT_TEXT_POOL_SIZES if sizes is None else sizes)
+        self.locale = locale
+        self._pools: Dict[str, TextPool] = {}
+        self._lock = threading.Lock()
+
+    def path(self, provider: str) -> str:
+        version = faker.VERSION.replace('.', '_')
+        name = f'{provider}.{self.locale}.{self.sizes[provider]}.{version}.npy'
+        return os.path.join(self.directory, name)
+
+    def set_size(self, provider: str, size: int):
+        with self._lock:
+            self.sizes[provider] = size
+            self._pools.pop(provider, None)
+
+    def get(self, provider: str) -> TextPool:
+        with self._lock:
+            if provider not in self._pools:
+                self._pools[provider] = TextPool(self._load(provider))
+            return self._pools[provider]
+
+    def _load(self, provider: str) -> np.ndarray:
+        path = self.path(provider)
+        if os.path.exists(path):
+            return np.load(path, mmap_mode='r')
+
+        logger.info(f'Building a text pool of {self.sizes[provider]} {provider} values')
+        # Its own stage, so the first table drawing from the pool isn't
+        # charged for building it
+        with run_metrics.stage(f'text_pools.{provider}', 'build') as stage:
+            values = build_values(provider, self.sizes[provider], self.locale)
+            stage.rows = len(values)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.tmp.npy'
+            np.save(tmp_path, values)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f'Text pool {provider} is kept in memory only: {e}')
+            return values
+        return np.load(path, mmap_mode='r')
+
+    def clear(self):
+        with self._lock:
+            self._pools.clear()
+
+
+text_pools = TextPools()
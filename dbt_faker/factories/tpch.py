@@ -1,19 +1,17 @@
 # stdlib
-import random
 from collections import OrderedDict
 from itertools import product
 
 # third party
 import factory
-import sqlalchemy as sa
-from faker import Faker
 
 # first party
 from dbt_faker.orms import tpch
 from dbt_faker.factories.common import (
-    _get_current_records,
     dbtFactory,
+    KeyCombination,
     RandomLazyFunction,
+    records_getter,
     Session
 )
 
@@ -23,28 +21,12 @@ def productize_lists(*ls, sep: str = ' '):
     return [sep.join(ls) for ls in list_product]
 
 
-def get_nation_records():
-    return _get_current_records(tpch.Nation, 'n_nationkey', 100)
-
-
-def get_region_records():
-    return _get_current_records(tpch.Region, 'r_regionkey', 100)
-
-
-def get_supplier_records():
-    return _get_current_records(tpch.Supplier, 's_suppkey', 100)
-
-
-def get_customer_records():
-    return _get_current_records(tpch.Customer, 'c_custkey', 25)
-
-
-def get_part_records():
-    return _get_current_records(tpch.Part, 'p_partkey', 10)
-
-
-def get_order_records():
-    return _get_current_records(tpch.Order, 'o_orderkey', 10)
+get_nation_records = records_getter(tpch.Nation, 'n_nationkey', 100)
+get_region_records = records_getter(tpch.Region, 'r_regionkey', 100)
+get_supplier_records = records_getter(tpch.Supplier, 's_suppkey', 100)
+get_customer_records = records_getter(tpch.Customer, 'c_custkey', 25)
+get_part_records = records_getter(tpch.Part, 'p_partkey', 10)
+get_order_records = records_getter(tpch.Order, 'o_orderkey', 10)
 
 
 # Part
@@ -224,8 +206,9 @@ class PartSuppFactory(dbtFactory):
         sqlalchemy_session = Session
     
     ps_partsuppkey = factory.Sequence(lambda n: n)
-    ps_partkey = RandomLazyFunction(get_part_records)
-    ps_suppkey = RandomLazyFunction(get_supplier_records)
+    ps_partkey, ps_suppkey = KeyCombination(
+        get_part_records, get_supplier_records
+    ).keys
     ps_availqty = factory.Faker('random_int', min=1, max=10000)
     ps_supplycost = factory.Faker('random_int', min=1, max=1000)
     ps_comment = factory.Faker('bs')
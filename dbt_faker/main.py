@@ -1,23 +1,61 @@
 # stdlib
+import contextlib
+import datetime
 import logging
 import random
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Tuple, Union
 
 # third party
-import pandas as pd
 import sqlalchemy as sa
 
 # first party
 from dbt_faker.db.base import get_warehouse_engine
-from dbt_faker.etl.common import dataframe_to_sql, get_ids_to_update
+from dbt_faker.db.dialects import get_dialect
+from dbt_faker.db.metadata import table_registry
+from dbt_faker.db.sequences import sequence_allocator
+from dbt_faker.etl.common import (
+    dataframe_to_sql,
+    existing_row_hashes,
+    get_ids_to_update,
+    stream_to_sink,
+    stream_to_sql,
+    timed_dedupe_chunks,
+    update_rows,
+)
 from dbt_faker.etl import tpch_etl
-from dbt_faker.factories.common import factory_to_dict
+from dbt_faker.etl.dedup import drop_duplicate_rows
+from dbt_faker.etl.scheduler import run_tables
+from dbt_faker.etl.sinks import BufferSink, FileSink
+from dbt_faker.etl.snapshots import BatchSnapshot
+from dbt_faker.factories import clock
+from dbt_faker.factories.columnar import (
+    estimate_row_bytes,
+    factory_to_chunks,
+    factory_to_df,
+    sequence_values,
+)
+from dbt_faker.factories.common import prefetch_key_pools, seed_key_pools
+from dbt_faker.factories.key_pools import key_pool_cache, key_registry
+from dbt_faker.factories.profiling import active_profiler, profile_declarations
+from dbt_faker.utils.metrics import run_metrics
 
 
-logging.basicConfig(format='%(name)s - %(levelname)s - %(asctime)s - %(message)s', level=logging.INFO)
+logging.basicConfig(
+    format='%(name)s - %(levelname)s - %(asctime)s - %(message)s',
+    level=logging.INFO,
+)
 
 # Set defaults
 DEFAULT_UPDATE_CADENCE = .15
 DEFAULT_ROWS_TO_UPDATE = (1, 100)
+DEFAULT_CHUNK_ROWS = 50000
+DEFAULT_LOADER = 'to_sql'
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_IN_FLIGHT = 2
+DEFAULT_BACKFILL_BATCH_DAYS = 7
 
 
 ETL_SOURCES = [
@@ -25,99 +63,623 @@ ETL_SOURCES = [
 ]
 
 
-if __name__ == '__main__':
-    source_engine = get_warehouse_engine()
+def select_sources(
+    sources: List[str] = None, tables: List[str] = None
+) -> List[Tuple[Dict, List[Dict]]]:
+    """The ETL sources named in ``sources`` (every source by default), each
+    paired with its table configs, limited to ``tables`` if given."""
+    wanted_sources = {name.lower() for name in sources or []}
+    wanted_tables = {name.lower() for name in tables or []}
+
+    unknown = wanted_sources - {s['schema'].lower() for s in ETL_SOURCES}
+    if unknown:
+        raise ValueError(f'Unknown sources {sorted(unknown)}')
+
+    selected = []
+    found = set()
     for etl_source in ETL_SOURCES:
-        
-        # Set source level variables
-        source_schema = etl_source['schema']
-        total_rows = random.randint(*etl_source['rows'])
-        
-        logging.info(f'{source_schema} ETL is beginning.')
-        
-        # Loop through each orm/factory in config
-        for orm_config in etl_source['config']:
-            source_table = sa.Table(
-                orm_config['orm'].__tablename__,
-                sa.MetaData(schema=source_schema, bind=source_engine),
-                *(col._copy() for col in orm_config['orm'].__table__.c),
+        if wanted_sources and etl_source['schema'].lower() not in wanted_sources:
+            continue
+        config = [
+            orm_config for orm_config in etl_source['config']
+            if not wanted_tables
+            or orm_config['orm'].__tablename__.lower() in wanted_tables
+        ]
+        found |= {orm_config['orm'].__tablename__.lower() for orm_config in config}
+        if config:
+            selected.append((etl_source, config))
+
+    unknown = wanted_tables - found
+    if unknown:
+        raise ValueError(f'Unknown tables {sorted(unknown)}')
+    return selected
+
+
+def source_models(etl_sources: List[Dict] = None) -> List:
+    """The orm models of every table of ``etl_sources`` (every source by
+    default), reference tables included."""
+    return [
+        orm_config['orm']
+        for etl_source in etl_sources or ETL_SOURCES
+        for orm_config in (
+            etl_source.get('reference_tables', []) + etl_source['config']
+        )
+    ]
+
+
+def seed_reference_tables(etl_sources: List[Dict] = None):
+    """Fill the empty reference tables of ``etl_sources`` (nation, region...)
+    so the tables drawing keys from them can be generated in a new
+    warehouse."""
+    engine = get_warehouse_engine()
+
+    def seed(orm_config):
+        table = table_registry.get(orm_config['orm']).table
+        with engine.connect() as conn:
+            count = sa.select(sa.func.count()).select_from(table)
+            if conn.execute(count).scalar():
+                return
+        df = factory_to_df(orm_config['factory'], orm_config['rows'])
+        dataframe_to_sql(df, engine, table.name, table.schema)
+        logging.info(f'{table.fullname} table seeded with {len(df)} rows.')
+
+    for etl_source in etl_sources or ETL_SOURCES:
+        run_tables(etl_source.get('reference_tables', []), seed, max_workers=1)
+
+
+def rows_for_bytes(config: List[Dict], target_bytes: int) -> int:
+    """Total rows for a source so the new rows of ``config`` take up about
+    ``target_bytes`` (in memory, before loading)."""
+    bytes_per_total_row = sum(
+        orm_config['perc_of_total_rows']
+        * estimate_row_bytes(orm_config['factory'])
+        for orm_config in config
+        if orm_config['perc_of_total_rows']
+    )
+    if not bytes_per_total_row:
+        return 0
+    return int(target_bytes / bytes_per_total_row)
+
+
+def run_table(
+    orm_config: Dict,
+    source_schema: str,
+    source_engine: sa.engine.Engine,
+    total_rows: int,
+    seed: int = None,
+    shard: Tuple[int, int] = (0, 1),
+    rows: int = None,
+    update: str = 'cadence',
+    insert: bool = True,
+    update_cadence: float = DEFAULT_UPDATE_CADENCE,
+    rows_to_update: Tuple[int, int] = None,
+    dry_run: bool = False,
+    sink: Union[FileSink, BufferSink] = None,
+):
+    """Update and insert rows of one table.
+
+    ``update`` is one of 'cadence' (update with probability
+    ``update_cadence``), 'always' or 'never'.  ``rows`` overrides the new row
+    count otherwise derived from ``total_rows``, and ``rows_to_update`` the
+    update_rows range of the table.  A ``dry_run`` generates the rows but
+    doesn't write them, a ``sink`` takes them instead of the warehouse.
+    """
+    source_table = table_registry.get(orm_config['orm']).table_in(source_schema)
+
+    logging.info(
+        f'Fake data generation for {source_schema}.{source_table.name} table beginning.'
+    )
+
+    # Seeded runs get a stream per table so thread scheduling can't change it
+    rand = random.Random(f'{seed}:{source_table.name}') if seed is not None else random
+    should_update = update == 'always' or (
+        update == 'cadence'
+        and rand.random() < orm_config.get('update_cadence', update_cadence)
+    )
+
+    # Updates only touch existing rows, so they run on a separate thread
+    # while the new rows are generated and loaded.  They aren't part of the
+    # sharded batch either, only the first shard runs them.
+    with ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix=f'update-{source_table.name}'
+    ) as executor:
+        update_future = None
+        if should_update and shard[0] == 0:
+            update_future = executor.submit(
+                _update_table,
+                orm_config,
+                source_table,
+                source_engine,
+                rows_to_update=rows_to_update,
+                dry_run=dry_run,
             )
-            
-            logging.info(f'Fake data generation for {source_schema}.{source_table.name} table beginning.')
-            
-            # Initialize factory
-            factory = orm_config['factory']
-            
-            should_update = random.random() < orm_config.get(
-                'update_cadence', DEFAULT_UPDATE_CADENCE
+
+        # Create some new data
+        if rows is not None:
+            new_rows = rows
+        else:
+            new_rows = int(round(total_rows * orm_config['perc_of_total_rows'], 0))
+        if insert and new_rows:
+            _insert_rows(
+                orm_config,
+                source_table,
+                source_engine,
+                new_rows,
+                seed=seed,
+                shard=shard,
+                dry_run=dry_run,
+                sink=sink,
             )
-            if should_update:
-
-                # Table needs to have a primary key or will fail with KeyError
-                primary_key = [c.name for c in source_table.c if c.primary_key][0]
-                
-                # Get IDs that we want to update
-                ids = get_ids_to_update(
-                    source_table,
-                    source_engine,
-                    orm_config,
-                    primary_key,
-                    DEFAULT_ROWS_TO_UPDATE
+
+        if update_future is not None:
+            update_future.result()
+
+
+def _update_table(
+    orm_config: Dict,
+    source_table: sa.Table,
+    source_engine: sa.engine.Engine,
+    rows_to_update: Tuple[int, int] = None,
+    dry_run: bool = False,
+):
+    name = f'{source_table.schema}.{source_table.name}'
+    table_info = table_registry.get(orm_config['orm'])
+    primary_key = table_info.primary_key
+
+    # Get IDs that we want to update
+    with run_metrics.stage(name, 'update_sample') as stage:
+        ids = get_ids_to_update(
+            source_table,
+            source_engine,
+            dict(orm_config, update_rows=rows_to_update) if rows_to_update else orm_config,
+            primary_key,
+            DEFAULT_ROWS_TO_UPDATE
+        )
+        stage.rows = len(ids)
+
+    # Update existing rows with predefined set of columns
+    if len(ids) > 0:
+        with run_metrics.stage(name, 'update_generate') as stage:
+            # Updated rows keep their keys, so no sequence range is reserved.
+            # Reserving one would shift the keys of the first shard only.
+            update_df = factory_to_df(
+                orm_config['factory'],
+                len(ids),
+                start=sequence_allocator.peek(orm_config['orm']),
+            )
+            stage.rows = len(update_df)
+        update_df[primary_key] = ids
+        # The bookkeeping timestamp is always updated as well
+        update_cols = table_info.update_columns(orm_config.get('update_cols'))
+
+        if dry_run:
+            logging.info(f'{name} table would have {len(ids)} rows updated (dry run).')
+        else:
+            with run_metrics.stage(name, 'update') as stage, \
+                    source_engine.begin() as conn:
+                matched = update_rows(
+                    conn, source_table, update_df, primary_key, update_cols
                 )
-                
-                # Update existing rows with predefined set of columns
-                if len(ids) > 0:
-                    data = factory_to_dict(factory, len(ids))
-                    update_df = pd.DataFrame(data)
-                    update_df[primary_key] = ids
-                    update_cols = orm_config.get('update_cols', [
-                        col for col in update_df.columns if col != primary_key
-                    ])
-                    
-                    # Ensure that the timestamp is updated as well on the record
-                    update_cols.append('_etl_updated_timestamp')
-                    with source_engine.begin() as conn:
-                        
-                        # Insert raw data into temp table
-                        dataframe_to_sql(
-                            update_df,
-                            source_engine,
-                            'temp_update_tbl',
-                            source_schema,
-                            if_exists='replace',
-                            unique_subset=orm_config.get('unique_subset', None)
-                        )
-                        
-                        # Create update statment
-                        update_sql = f'''
-                        update {source_schema}.{source_table.name} as s
-                        set {', '.join([f's.{col} = t.{col}' for col in update_cols])}
-                        from {source_schema}.temp_update_tbl as t
-                        where s.{primary_key} = t.{primary_key};
-                        '''
-                        conn.execute(update_sql)
-                        conn.execute(f'drop table {source_schema}.temp_update_tbl;')
-                        
-                    logging.info(f'{source_schema}.{source_table.name} table has been updated with {len(ids)} rows.')
-                
-            # Create some new data
-            new_rows = int(round(total_rows * orm_config['perc_of_total_rows'], 0))
-            if new_rows:
-                data = factory_to_dict(factory, new_rows)
-                df = pd.DataFrame(data)
-                dataframe_to_sql(
-                    df,
-                    source_engine, 
-                    source_table.name, 
-                    source_schema,
-                    unique_subset=orm_config.get('unique_subset', None)
+                stage.rows = max(matched, 0)
+
+            # Some drivers don't report how many rows an executemany matched
+            if matched < 0:
+                logging.info(
+                    f'{name} table has been updated, {len(ids)} rows sent, '
+                    'matched count unknown.'
+                )
+            else:
+                logging.info(
+                    f'{name} table has been updated with {matched} of {len(ids)} '
+                    'rows matched.'
                 )
-                logging.info(f'{source_schema}.{source_table.name} table has {len(df)} new rows.')
-
-        if 'post_sql' in etl_source.keys():
-            with source_engine.begin() as conn:
-                for sql_statement in etl_source['post_sql']:
-                    conn.execute(sql_statement)
-            logging.info('post_sql executed')
-    
+
+
+def _insert_rows(
+    orm_config: Dict,
+    source_table: sa.Table,
+    source_engine: sa.engine.Engine,
+    new_rows: int,
+    seed: int = None,
+    shard: Tuple[int, int] = (0, 1),
+    dry_run: bool = False,
+    sink: Union[FileSink, BufferSink] = None,
+):
+    name = f'{source_table.schema}.{source_table.name}'
+    model = orm_config['orm']
+    primary_key = table_registry.get(model).primary_key
+    unique_subset = orm_config.get('unique_subset', None)
+    start = sequence_allocator.reserve(model, new_rows)
+    chunks = factory_to_chunks(
+        orm_config['factory'],
+        new_rows,
+        orm_config.get('chunk_rows', DEFAULT_CHUNK_ROWS),
+        seed=seed,
+        shard=shard,
+        start=start,
+    )
+    # New keys become eligible parents for the tables loaded after.  A
+    # shard only sees its own chunks, so seeded runs publish the keys of
+    # the whole batch up front instead, as every shard reserved the same
+    # sequence range.  Keys of rows dropped as duplicates are included.
+    batch_keys = None
+    if seed is not None:
+        batch_keys = sequence_values(
+            orm_config['factory'], primary_key, start, new_rows
+        )
+    if batch_keys is not None:
+        key_registry.publish(model, batch_keys)
+    on_load = (
+        (lambda df: key_registry.publish(model, df[primary_key]))
+        if batch_keys is None and shard[1] == 1 else None
+    )
+    seen = None
+    if unique_subset and orm_config.get('dedupe_existing', False):
+        with run_metrics.stage(name, 'dedup_seed') as stage:
+            # Rows other shards of this batch already loaded don't count
+            seen = existing_row_hashes(
+                source_table,
+                source_engine,
+                unique_subset,
+                where=source_table.c[primary_key] < start,
+            )
+            stage.rows = len(seen)
+    if dry_run:
+        generated_rows = generated_bytes = 0
+        for df in timed_dedupe_chunks(chunks, name, unique_subset, seen):
+            generated_rows += len(df)
+            generated_bytes += int(df.memory_usage(index=False, deep=True).sum())
+            if on_load is not None:
+                on_load(df)
+        logging.info(
+            f'{name} table would have {generated_rows} new rows, '
+            f'{generated_bytes} bytes in memory (dry run).'
+        )
+        return
+
+    if sink is not None:
+        written_rows = stream_to_sink(
+            chunks,
+            sink,
+            source_table.name,
+            source_table.schema,
+            unique_subset=unique_subset,
+            on_load=on_load,
+            max_in_flight=orm_config.get('max_in_flight', DEFAULT_MAX_IN_FLIGHT),
+            seen=seen,
+        )
+        logging.info(f'{name} table has {written_rows} new rows ({sink.stage}).')
+        return
+
+    loaded_rows = stream_to_sql(
+        chunks,
+        source_engine,
+        source_table.name,
+        source_table.schema,
+        unique_subset=unique_subset,
+        loader=orm_config.get('loader', DEFAULT_LOADER),
+        on_load=on_load,
+        max_in_flight=orm_config.get('max_in_flight', DEFAULT_MAX_IN_FLIGHT),
+        seen=seen,
+        **orm_config.get('loader_options', {}),
+    )
+    logging.info(f'{name} table has {loaded_rows} new rows.')
+
+
+def run(
+    command: str = 'run',
+    selected: List[Tuple[Dict, List[Dict]]] = None,
+    rows: int = None,
+    target_bytes: int = None,
+    update_cadence: float = DEFAULT_UPDATE_CADENCE,
+    dry_run: bool = False,
+    seed: int = None,
+    shard: Tuple[int, int] = (0, 1),
+    metrics_json: str = None,
+    prometheus_textfile: str = None,
+    statsd: Tuple[str, int] = None,
+    profile: bool = False,
+    profile_allocations: bool = False,
+    sink: FileSink = None,
+    backfill: Tuple[datetime.date, datetime.date] = None,
+    batch_days: int = DEFAULT_BACKFILL_BATCH_DAYS,
+    snapshot: BatchSnapshot = None,
+):
+    """Run ``command`` over the ``selected`` sources and tables.
+
+    'run' is the scheduled job: tables are updated at their cadence and get
+    new rows.  'generate' only inserts and 'update' only updates, every
+    table.  ``rows`` is the exact number of rows to insert (or update) per
+    table and ``target_bytes`` sizes the inserts of each source instead.
+
+    Stage metrics of the run are logged and, if asked for, written as a
+    JSON report, a Prometheus textfile or sent to StatsD, failed runs
+    included.  ``profile`` ranks the factory declarations by time spent
+    (and memory allocated with ``profile_allocations``); tables then run
+    one at a time.
+
+    With a file ``sink`` new rows are written to files rather than the
+    warehouse, which is still read for parent keys, and nothing is
+    updated.
+
+    'backfill' runs 'run' for every day of the ``backfill`` (first, last)
+    date range, see ``_backfill``.
+
+    Sharded runs start from the sequences and key pools of a ``snapshot``
+    of the batch (see ``BatchSnapshot``) and use its seed.
+    """
+    if selected is None:
+        selected = select_sources()
+    if snapshot is not None:
+        if seed is not None and seed != snapshot.seed:
+            raise ValueError(
+                f'Seed {seed} differs from the batch snapshot seed {snapshot.seed}'
+            )
+        seed = snapshot.seed
+    elif shard[1] > 1:
+        raise ValueError('Sharded runs need a snapshot of the batch')
+    run_metrics.reset()
+    table_seconds = {}
+    status = 'failed'
+    profiler = None
+    profiling = (
+        profile_declarations(allocations=profile_allocations)
+        if profile or profile_allocations else contextlib.nullcontext()
+    )
+    try:
+        with profiling as profiler, (
+            snapshot.applied(selected) if snapshot is not None
+            else contextlib.nullcontext()
+        ):
+            source_engine = get_warehouse_engine()
+            if backfill is not None:
+                table_seconds = _backfill(
+                    selected,
+                    source_engine,
+                    *backfill,
+                    rows=rows,
+                    target_bytes=target_bytes,
+                    update_cadence=update_cadence,
+                    seed=seed,
+                    batch_days=batch_days,
+                )
+            else:
+                for etl_source, config in selected:
+                    table_seconds.update(_run_source(
+                        etl_source,
+                        config,
+                        source_engine,
+                        command=command,
+                        rows=rows,
+                        target_bytes=target_bytes,
+                        update_cadence=update_cadence,
+                        dry_run=dry_run,
+                        seed=seed,
+                        shard=shard,
+                        sink=sink,
+                    ))
+        status = 'succeeded'
+    finally:
+        if sink is not None:
+            files = sink.close()
+            logging.info(f'{len(files)} files written to {sink.directory}')
+        report = run_metrics.report(
+            command=command,
+            status=status,
+            dry_run=dry_run,
+            tables=table_seconds,
+            key_pool_cache=key_pool_cache.stats(),
+        )
+        if profiler is not None:
+            report['declarations'] = profiler.report()
+            logging.info(f'Declaration profile:\n{profiler.format_report(top=25)}')
+        for stage in report['stages']:
+            logging.info(
+                f'{stage["table"]} {stage["stage"]}: {stage["seconds"]:.2f}s, '
+                f'{stage["rows"]} rows, {stage["bytes"]} bytes'
+            )
+        logging.info(f'Key pool cache: {report["key_pool_cache"]}')
+        if metrics_json:
+            run_metrics.write_json(metrics_json, report)
+        if prometheus_textfile:
+            run_metrics.write_prometheus(prometheus_textfile)
+        if statsd:
+            run_metrics.send_statsd(*statsd)
+
     logging.info('Fake data generated!')
+
+
+def _backfill(
+    selected: List[Tuple[Dict, List[Dict]]],
+    source_engine: sa.engine.Engine,
+    first_day: datetime.date,
+    last_day: datetime.date,
+    rows: int = None,
+    target_bytes: int = None,
+    update_cadence: float = DEFAULT_UPDATE_CADENCE,
+    seed: int = None,
+    batch_days: int = DEFAULT_BACKFILL_BATCH_DAYS,
+) -> Dict[str, float]:
+    """Simulate the scheduled 'run' of every day from ``first_day`` to
+    ``last_day`` in one process.
+
+    Each day's inserts and updates are stamped with that day (see
+    ``clock.simulate``).  Key pools, sequences and the keys created on
+    earlier days carry over from day to day, seeded or not, so later days
+    reference the rows of earlier ones.  New rows are buffered and loaded
+    together every ``batch_days`` days, so updates only reach rows loaded
+    by an earlier batch.
+
+    Parents that get no new rows of their own by default (TPCH supplier)
+    need rows in the warehouse already, e.g. from ``generate --rows``.
+    """
+    table_seconds: Dict[str, float] = {}
+    buffer = BufferSink()
+    days = (last_day - first_day).days + 1
+    for day_index in range(days):
+        day = first_day + datetime.timedelta(days=day_index)
+        logging.info(f'Backfilling {day}.')
+        with clock.simulate(day):
+            for etl_source, config in selected:
+                source_seed = seed if seed is not None else etl_source.get('seed')
+                # Every day gets its own rows, while the key pools sampled
+                # with the source's seed carry over
+                day_seed = (
+                    zlib.crc32(f'{source_seed}:{day}'.encode())
+                    if source_seed is not None else None
+                )
+                timings = _run_source(
+                    etl_source,
+                    config,
+                    source_engine,
+                    command='run',
+                    rows=rows,
+                    target_bytes=target_bytes,
+                    update_cadence=update_cadence,
+                    dry_run=False,
+                    seed=day_seed,
+                    shard=(0, 1),
+                    sink=buffer,
+                    sample_seed=source_seed,
+                )
+                for table, seconds in timings.items():
+                    table_seconds[table] = table_seconds.get(table, 0) + seconds
+
+        if (day_index + 1) % batch_days == 0 or day_index == days - 1:
+            _load_buffer(buffer, selected, source_engine)
+    return table_seconds
+
+
+def _load_buffer(
+    buffer: BufferSink,
+    selected: List[Tuple[Dict, List[Dict]]],
+    source_engine: sa.engine.Engine,
+):
+    """Load the rows in ``buffer``, parent tables before the tables
+    referencing them."""
+    logging.info(f'Loading {buffer.rows()} buffered rows.')
+    for etl_source, config in selected:
+        schema = etl_source['schema']
+
+        def load(orm_config):
+            table = orm_config['orm'].__tablename__
+            df = buffer.drain(table, schema)
+            if df is None:
+                return
+            # Days were only deduplicated against the rows already loaded
+            df = drop_duplicate_rows(df, orm_config.get('unique_subset'))
+            dataframe_to_sql(
+                df,
+                source_engine,
+                table,
+                schema,
+                loader=orm_config.get('loader', DEFAULT_LOADER),
+                **orm_config.get('loader_options', {}),
+            )
+            logging.info(f'{schema}.{table} table has {len(df)} new rows.')
+
+        run_tables(
+            config, load,
+            max_workers=etl_source.get('max_workers', DEFAULT_MAX_WORKERS),
+        )
+
+
+def _run_source(
+    etl_source: Dict,
+    config: List[Dict],
+    source_engine: sa.engine.Engine,
+    command: str,
+    rows: int,
+    target_bytes: int,
+    update_cadence: float,
+    dry_run: bool,
+    seed: int,
+    shard: Tuple[int, int],
+    sink: Union[FileSink, BufferSink] = None,
+    sample_seed: int = None,
+) -> Dict[str, float]:
+    """Run the tables of one ETL source; returns the seconds spent on each.
+
+    Key pools are sampled with ``sample_seed``, the source's seed by
+    default.
+    """
+    # Set source level variables
+    source_schema = etl_source['schema']
+    source_seed = seed if seed is not None else etl_source.get('seed')
+    if shard[1] > 1 and source_seed is None:
+        raise ValueError(
+            f'{source_schema} has no seed, sharded runs need one so the '
+            'shards agree on the batch'
+        )
+    if sample_seed is not None or source_seed is not None:
+        seed_key_pools(sample_seed if sample_seed is not None else source_seed)
+    total_rows = random.Random(source_seed).randint(*etl_source['rows'])
+    if target_bytes is not None:
+        total_rows = rows_for_bytes(config, target_bytes)
+
+    logging.info(f'{source_schema} ETL is beginning.')
+
+    # Sample every parent key pool in the background from the start, rather
+    # than when the first table needing it gets to generate
+    prefetch = ThreadPoolExecutor(
+        max_workers=etl_source.get('max_workers', DEFAULT_MAX_WORKERS),
+        thread_name_prefix='key-prefetch',
+    )
+    prefetch_key_pools([orm_config['factory'] for orm_config in config], prefetch)
+    prefetch.shutdown(wait=False)
+
+    # Tables run concurrently once the tables they reference are loaded
+    timings = run_tables(
+        config,
+        partial(
+            run_table,
+            source_schema=source_schema,
+            source_engine=source_engine,
+            total_rows=total_rows,
+            seed=source_seed,
+            shard=shard,
+            rows=rows if command != 'update' else None,
+            update=(
+                'never' if isinstance(sink, FileSink)
+                else {'run': 'cadence', 'generate': 'never'}.get(command, 'always')
+            ),
+            insert=command != 'update',
+            update_cadence=update_cadence,
+            rows_to_update=(rows, rows) if command == 'update' and rows else None,
+            dry_run=dry_run,
+            sink=sink,
+        ),
+        # Profiled runs are serial so tables don't inflate each other's times
+        max_workers=(
+            1 if active_profiler() is not None
+            else etl_source.get('max_workers', DEFAULT_MAX_WORKERS)
+        ),
+    )
+
+    # post_sql tidies up after inserts, so update-only runs skip it too
+    if (
+        'post_sql' in etl_source.keys()
+        and shard[0] == 0
+        and command != 'update'
+        and not dry_run
+        and sink is None
+    ):
+        with run_metrics.stage(source_schema, 'post_sql'), \
+                source_engine.begin() as conn:
+            use_schema = get_dialect(conn).use_schema(source_schema)
+            if use_schema:
+                conn.exec_driver_sql(use_schema)
+            for sql_statement in etl_source['post_sql']:
+                conn.exec_driver_sql(sql_statement)
+        logging.info('post_sql executed')
+
+    return {
+        f'{source_schema}.{table}': seconds
+        for table, seconds in timings.items()
+    }
+
+
+if __name__ == '__main__':
+    from dbt_faker.cli import main
+
+    main()
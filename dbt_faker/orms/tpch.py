@@ -5,6 +5,7 @@ from typing import Any
 import sqlalchemy as sa
 
 # first party
+from dbt_faker.db.metadata import table_registry
 from dbt_faker.db.orms import EtlBookkeepingMixin, WarehouseBase
 
 
@@ -24,12 +25,12 @@ class Customer(WarehouseBase, TpchSchemaMixin):
     c_address = sa.Column(sa.String)
     c_nationkey = sa.Column(
         sa.Integer,
-        sa.ForeignKey('Nation.n_nationkey'), 
+        sa.ForeignKey(f'{TPCH_SCHEMA}.nation.n_nationkey'), 
         nullable=False
     )
     c_phone = sa.Column(sa.String)
     c_acctbal = sa.Column(sa.Numeric(38, 0))
-    c_mktsegment = sa.Column(sa.String)
+    c_mktsegment = sa.Column(sa.String, info={'categorical': True})
     c_comment = sa.Column(sa.String)
     user_id = sa.Column(sa.Integer)
 
@@ -39,24 +40,32 @@ class LineItem(WarehouseBase, TpchSchemaMixin):
     l_linekey = sa.Column(sa.Integer, primary_key=True)
 
     l_orderkey = sa.Column(
-        sa.Integer, sa.ForeignKey('Order.o_orderkey'), nullable=False
+        sa.Integer,
+        sa.ForeignKey(f'{TPCH_SCHEMA}.orders.o_orderkey'),
+        nullable=False
     )
     l_partkey = sa.Column(
-        sa.Integer, sa.ForeignKey('Part.p_partkey'), nullable=False)
+        sa.Integer,
+        sa.ForeignKey(f'{TPCH_SCHEMA}.part.p_partkey'),
+        nullable=False
+    )
     l_suppkey = sa.Column(
-        sa.Integer, sa.ForeignKey('Supplier.s_suppkey'), nullable=False)
+        sa.Integer,
+        sa.ForeignKey(f'{TPCH_SCHEMA}.supplier.s_suppkey'),
+        nullable=False
+    )
     l_linenumber = sa.Column(sa.Integer, nullable=False)
     l_quantity = sa.Column(sa.Integer)
     l_extendedprice = sa.Column(sa.Integer)
     l_discount = sa.Column(sa.Integer, default=0)
     l_tax = sa.Column(sa.Integer, default=0)
-    l_returnflag = sa.Column(sa.String)
-    l_linestatus = sa.Column(sa.String)
+    l_returnflag = sa.Column(sa.String, info={'categorical': True})
+    l_linestatus = sa.Column(sa.String, info={'categorical': True})
     l_shipdate = sa.Column(sa.Date)
     l_commitdate = sa.Column(sa.Date)
     l_receiptdate = sa.Column(sa.Date)
-    l_shipinstruct = sa.Column(sa.String)
-    l_shipmode = sa.Column(sa.String)
+    l_shipinstruct = sa.Column(sa.String, info={'categorical': True})
+    l_shipmode = sa.Column(sa.String, info={'categorical': True})
     l_comment = sa.Column(sa.String)
     
     
@@ -74,12 +83,14 @@ class Order(WarehouseBase, TpchSchemaMixin):
     o_orderkey = sa.Column(sa.Integer, primary_key=True)
     
     o_custkey = sa.Column(
-        sa.Integer, sa.ForeignKey('Customer.c_custkey'), nullable=False
+        sa.Integer,
+        sa.ForeignKey(f'{TPCH_SCHEMA}.customer.c_custkey'),
+        nullable=False
     )
-    o_orderstatus = sa.Column(sa.String)
+    o_orderstatus = sa.Column(sa.String, info={'categorical': True})
     o_totalprice = sa.Column(sa.Integer)
     o_orderdate = sa.Column(sa.Date)
-    o_orderpriority = sa.Column(sa.String)
+    o_orderpriority = sa.Column(sa.String, info={'categorical': True})
     o_clerk = sa.Column(sa.String)
     o_shippriority = sa.Column(sa.String, default=0)
     o_comment = sa.Column(sa.String)
@@ -90,11 +101,11 @@ class Part(WarehouseBase, TpchSchemaMixin):
     p_partkey = sa.Column(sa.Integer, primary_key=True)
     
     p_name = sa.Column(sa.String)
-    p_mfgr = sa.Column(sa.String)
+    p_mfgr = sa.Column(sa.String, info={'categorical': True})
     p_brand = sa.Column(sa.String)
-    p_type = sa.Column(sa.String)
+    p_type = sa.Column(sa.String, info={'categorical': True})
     p_size = sa.Column(sa.Integer)
-    p_container = sa.Column(sa.String)
+    p_container = sa.Column(sa.String, info={'categorical': True})
     p_retailprice = sa.Column(sa.Integer)
     p_comment = sa.Column(sa.String)
     
@@ -104,10 +115,14 @@ class PartSupp(WarehouseBase, TpchSchemaMixin):
     ps_partsuppkey = sa.Column(sa.Integer, primary_key=True)
     
     ps_partkey = sa.Column(
-        sa.Integer, sa.ForeignKey('Part.p_partkey'), nullable=False
+        sa.Integer,
+        sa.ForeignKey(f'{TPCH_SCHEMA}.part.p_partkey'),
+        nullable=False
     )
     ps_suppkey = sa.Column(
-        sa.Integer, sa.ForeignKey('Supplier.s_suppkey'), nullable=False
+        sa.Integer,
+        sa.ForeignKey(f'{TPCH_SCHEMA}.supplier.s_suppkey'),
+        nullable=False
     )
     ps_availqty = sa.Column(sa.Integer)
     ps_supplycost = sa.Column(sa.Integer)
@@ -132,3 +147,6 @@ class Supplier(WarehouseBase, TpchSchemaMixin):
     s_phone = sa.Column(sa.String)
     s_acctbal = sa.Column(sa.Integer)
     s_comment = sa.Column(sa.String)
+
+
+table_registry.register(*TpchSchemaMixin.__subclasses__())
@@ -0,0 +1,192 @@
+# stdlib
+import contextlib
+import datetime
+import json
+import os
+import re
+import socket
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, Tuple
+
+
+class _Stage:
+    __slots__ = ('rows', 'bytes', 'started', 'child_seconds', 'discard')
+
+    def __init__(self, started: float):
+        self.discard = False
+        self.rows = 0
+        self.bytes = 0
+        self.started = started
+        self.child_seconds = 0.0
+
+
+class RunMetrics:
+    """Wall time, rows and bytes per table and stage of an ETL run.
+
+    Stages nest: time spent in a stage entered while another is running on
+    the same thread (e.g. generating a chunk while deduplicating) only
+    counts towards the inner one, so the stages of a table add up to its
+    wall time.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._stages: Dict[Tuple[str, str], Dict] = {}
+            self._counters: Dict[Tuple[str, str], int] = {}
+            self.started_at = datetime.datetime.now(datetime.timezone.utc)
+            self._started = self.clock()
+
+    @contextlib.contextmanager
+    def stage(self, table: str, stage: str) -> Iterator[_Stage]:
+        """Time a stage of ``table``; set ``rows`` and ``bytes`` on the
+        yielded object to record them as well, or ``discard`` to drop it."""
+        stack = self._local.__dict__.setdefault('stack', [])
+        current = _Stage(self.clock())
+        stack.append(current)
+        try:
+            yield current
+        finally:
+            stack.pop()
+            elapsed = self.clock() - current.started
+            if current.discard:
+                return
+            if stack:
+                stack[-1].child_seconds += elapsed
+            self.record(
+                table,
+                stage,
+                seconds=elapsed - current.child_seconds,
+                rows=current.rows,
+                bytes=current.bytes,
+            )
+
+    def record(
+        self,
+        table: str,
+        stage: str,
+        seconds: float = 0.0,
+        rows: int = 0,
+        bytes: int = 0,
+    ):
+        with self._lock:
+            totals = self._stages.setdefault(
+                (table, stage),
+                {'calls': 0, 'seconds': 0.0, 'rows': 0, 'bytes': 0},
+            )
+            totals['calls'] += 1
+            totals['seconds'] += seconds
+            totals['rows'] += rows
+            totals['bytes'] += bytes
+
+    def increment(self, table: str, name: str, count: int = 1):
+        with self._lock:
+            key = (table, name)
+            self._counters[key] = self._counters.get(key, 0) + count
+
+    def timed(self, chunks: Iterable, table: str, stage: str) -> Iterator:
+        """Pass ``chunks`` through, timing the production of each one as
+        ``stage`` and counting its rows."""
+        chunks = iter(chunks)
+        while True:
+            with self.stage(table, stage) as current:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    current.discard = True
+                else:
+                    current.rows = len(chunk)
+            if chunk is None:
+                return
+            yield chunk
+
+    def report(self, **extra) -> Dict:
+        with self._lock:
+            stages = [
+                dict(table=table, stage=stage, **totals)
+                for (table, stage), totals in sorted(self._stages.items())
+            ]
+            counters = [
+                {'table': table, 'name': name, 'value': value}
+                for (table, name), value in sorted(self._counters.items())
+            ]
+            report = {
+                'started_at': self.started_at.isoformat(),
+                'seconds': self.clock() - self._started,
+                'stages': stages,
+                'counters': counters,
+            }
+        report.update(extra)
+        return report
+
+    def write_json(self, path: str, report: Dict = None):
+        report = report if report is not None else self.report()
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+
+    def prometheus_text(self) -> str:
+        report = self.report()
+        lines = []
+
+        def gauge(name, help_text, samples):
+            lines.append(f'# HELP dbt_faker_{name} {help_text}')
+            lines.append(f'# TYPE dbt_faker_{name} gauge')
+            for labels, value in samples:
+                label_text = ','.join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f'dbt_faker_{name}{{{label_text}}} {value}')
+
+        for field, help_text in (
+            ('seconds', 'Wall time spent in the stage during the last run'),
+            ('rows', 'Rows handled by the stage during the last run'),
+            ('bytes', 'Bytes written by the stage during the last run'),
+            ('calls', 'Times the stage ran during the last run'),
+        ):
+            gauge(f'stage_{field}', help_text, [
+                ({'table': s['table'], 'stage': s['stage']}, s[field])
+                for s in report['stages']
+            ])
+        gauge('counter', 'Event counts during the last run', [
+            ({'table': c['table'], 'name': c['name']}, c['value'])
+            for c in report['counters']
+        ])
+        gauge('run_seconds', 'Wall time of the last run', [({}, report['seconds'])])
+        gauge('last_run_timestamp_seconds', 'When the last run started', [
+            ({}, self.started_at.timestamp())
+        ])
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str):
+        """Write the node_exporter textfile collector format.  The file is
+        replaced atomically so a half-written file is never scraped."""
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+    def send_statsd(self, host: str, port: int = 8125, prefix: str = 'dbt_faker'):
+        report = self.report()
+
+        def name(*parts):
+            return '.'.join(re.sub(r'[^\w-]', '_', str(part)) for part in parts)
+
+        lines = []
+        for s in report['stages']:
+            metric = name(prefix, 'stage', s['table'], s['stage'])
+            lines.append(f'{metric}.seconds:{s["seconds"] * 1000:.3f}|ms')
+            lines.append(f'{metric}.rows:{s["rows"]}|c')
+            lines.append(f'{metric}.bytes:{s["bytes"]}|c')
+        for c in report['counters']:
+            lines.append(f'{name(prefix, c["table"], c["name"])}:{c["value"]}|c')
+        lines.append(f'{name(prefix, "run")}.seconds:{report["seconds"] * 1000:.3f}|ms')
+
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            for line in lines:
+                sock.sendto(line.encode(), (host, port))
+
+
+run_metrics = RunMetrics()
@@ -0,0 +1,39 @@
+# stdlib
+import os
+
+# third party
+import pytest
+
+
+# Never reach a real warehouse from the tests
+os.environ['WAREHOUSE_URL'] = 'sqlite://'
+
+
+@pytest.fixture(autouse=True, scope='session')
+def small_text_pools(tmp_path_factory):
+    """Build small text pools once, away from the user's cache."""
+    from dbt_faker.factories.text_pools import DEFAULT_TEXT_POOL_SIZES, text_pools
+
+    text_pools.directory = str(tmp_path_factory.mktemp('text_pools'))
+    for provider in DEFAULT_TEXT_POOL_SIZES:
+        text_pools.set_size(provider, 200)
+
+
+@pytest.fixture
+def run_state():
+    """Forget the keys, sequences and engines a run keeps in the process,
+    before and after the test."""
+    from dbt_faker.db.base import dispose_engines, register_engine
+    from dbt_faker.db.sequences import sequence_allocator
+    from dbt_faker.factories.key_pools import key_pool_cache, key_registry
+
+    def reset():
+        dispose_engines()
+        sequence_allocator.reset()
+        key_registry.clear()
+        key_pool_cache.invalidate()
+
+    reset()
+    yield reset
+    reset()
+    register_engine('warehouse', lambda: os.environ.get('WAREHOUSE_URL'))
@@ -0,0 +1,99 @@
+# stdlib
+import datetime
+
+# third party
+import pytest
+
+# first party
+from dbt_faker.db.base import get_warehouse_engine
+from dbt_faker.db.local import use_local_warehouse
+from dbt_faker.etl.tpch import tpch_etl
+from dbt_faker.factories import clock
+from dbt_faker.main import run, seed_reference_tables, source_models
+
+
+FIRST_DAY = datetime.date(2024, 1, 1)
+LAST_DAY = datetime.date(2024, 1, 5)
+DAYS = [str(FIRST_DAY + datetime.timedelta(days=i)) for i in range(5)]
+DAY_ROWS = 50
+PRIMARY_KEYS = {
+    'customer': 'c_custkey',
+    'part': 'p_partkey',
+    'orders': 'o_orderkey',
+    'lineitem': 'l_linekey',
+}
+
+
+@pytest.fixture
+def warehouse(tmp_path, run_state):
+    path = str(tmp_path / 'dev.db')
+    use_local_warehouse(path, source_models([tpch_etl]))
+    seed_reference_tables([tpch_etl])
+    # The rows the backfill starts from are all from before it
+    with clock.simulate(FIRST_DAY - datetime.timedelta(days=30)):
+        run(command='generate', selected=[(tpch_etl, tpch_etl['config'])], rows=100)
+    run_state()
+    use_local_warehouse(path, source_models([tpch_etl]))
+    return path
+
+
+def backfill(update_cadence, **kwargs):
+    # Tables' own cadences are overridden too
+    config = [dict(orm_config, update_cadence=update_cadence) for orm_config in tpch_etl['config']]
+    run(
+        command='backfill',
+        selected=[(tpch_etl, config)],
+        backfill=(FIRST_DAY, LAST_DAY),
+        rows=DAY_ROWS,
+        batch_days=2,
+        **kwargs,
+    )
+
+
+def query(sql):
+    with get_warehouse_engine().connect() as conn:
+        return conn.exec_driver_sql(sql).fetchall()
+
+
+def test_every_day_gets_its_own_rows(warehouse):
+    backfill(update_cadence=0)
+    for table, key in PRIMARY_KEYS.items():
+        # Keys after the 100 rows the backfill started from are new rows
+        per_day = dict(query(f'''
+            select substr(_etl_updated_timestamp, 1, 10), count(*)
+            from "TPCH".{table}
+            where {key} > 100
+            group by 1
+        '''))
+        assert per_day == dict.fromkeys(DAYS, DAY_ROWS), table
+        [(rows, keys)] = query(f'select count(*), count(distinct {key}) from "TPCH".{table}')
+        assert rows == keys == 100 + 5 * DAY_ROWS
+
+
+@pytest.mark.parametrize('seed', [None, 5])
+def test_later_days_reference_rows_of_earlier_days(warehouse, seed):
+    backfill(update_cadence=0, seed=seed)
+    [(orders, orphans, earlier_days)] = query(f'''
+        select
+            count(*),
+            sum(c.c_custkey is null),
+            sum(substr(c._etl_updated_timestamp, 1, 10)
+                between '{FIRST_DAY}' and substr(o._etl_updated_timestamp, 1, 10))
+        from "TPCH".orders as o
+        left join "TPCH".customer as c on c.c_custkey = o.o_custkey
+        where o.o_orderkey > 100
+    ''')
+    assert orders == 5 * DAY_ROWS
+    assert orphans == 0
+    assert earlier_days > 0
+
+
+def test_updates_are_stamped_with_their_day(warehouse):
+    backfill(update_cadence=1)
+    [(updated,)] = query(f'''
+        select count(*) from "TPCH".customer
+        where c_custkey <= 100 and _etl_updated_timestamp >= '{FIRST_DAY}'
+    ''')
+    assert updated > 0
+    [(latest,)] = query('select max(substr(_etl_updated_timestamp, 1, 10)) from "TPCH".customer')
+    assert latest == str(LAST_DAY)
@@ -0,0 +1,166 @@
+# stdlib
+import argparse
+import os
+
+# third party
+import pytest
+
+# first party
+from dbt_faker import cli
+from dbt_faker import main as runner
+from dbt_faker.etl.snapshots import BatchSnapshot
+
+
+@pytest.fixture
+def runs(monkeypatch):
+    """The keyword arguments of every ``runner.run`` call."""
+    calls = []
+    monkeypatch.setattr(runner, 'run', lambda **kwargs: calls.append(kwargs))
+    return calls
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('1000', 1000),
+    ('500MB', 500 * 10 ** 6),
+    ('2GiB', 2 * 2 ** 30),
+    ('1.5 kb', 1500),
+])
+def test_sizes(value, expected):
+    assert cli.parse_size(value) == expected
+
+
+@pytest.mark.parametrize('value', ['', 'MB', '5 parsecs', '-1'])
+def test_invalid_sizes(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        cli.parse_size(value)
+
+
+def test_shards():
+    assert cli.parse_shard('1/4') == (1, 4)
+    for value in ['4/4', '-1/2', '1', 'a/b']:
+        with pytest.raises(argparse.ArgumentTypeError):
+            cli.parse_shard(value)
+
+
+def test_run_is_the_default_command(runs, tmp_path):
+    snapshot = str(tmp_path / 'batch.json')
+    BatchSnapshot(3, {'TPCH.orders': 42}, {}).write(snapshot)
+    cli.main([
+        '--rows', '10', '--table', 'orders', '--seed', '3',
+        '--shard', '1/2', '--snapshot', snapshot,
+    ])
+    [call] = runs
+    assert call['command'] == 'run'
+    assert call['rows'] == 10
+    assert call['seed'] == 3
+    assert call['shard'] == (1, 2)
+    assert call['snapshot'].sequences == {'TPCH.orders': 42}
+    assert call['update_cadence'] == runner.DEFAULT_UPDATE_CADENCE
+    assert [
+        orm_config['orm'].__tablename__
+        for _, config in call['selected'] for orm_config in config
+    ] == ['orders']
+
+
+def test_generate_by_size(runs):
+    cli.main(['generate', '--bytes', '2MB', '--dry-run'])
+    [call] = runs
+    assert call['command'] == 'generate'
+    assert call['target_bytes'] == 2 * 10 ** 6
+    assert call['rows'] is None
+    assert call['dry_run']
+
+
+def test_rows_and_bytes_are_exclusive(runs, capsys):
+    with pytest.raises(SystemExit) as exit:
+        cli.main(['generate', '--rows', '10', '--bytes', '1MB'])
+    assert exit.value.code == 2
+    assert 'not allowed with argument' in capsys.readouterr().err
+    assert not runs
+
+
+@pytest.mark.parametrize('argv, error', [
+    (['--table', 'nope'], "Unknown tables ['nope']"),
+    (['--source', 'nope'], "Unknown sources ['nope']"),
+    (['--rows', '0'], 'Expected a positive integer, got 0'),
+    (['--shard', '0/2', '--seed', '3'], '--shard needs --snapshot'),
+    (['--snapshot', 'missing.json'], 'Invalid snapshot missing.json'),
+])
+def test_usage_errors(runs, capsys, argv, error):
+    with pytest.raises(SystemExit) as exit:
+        cli.main(argv)
+    assert exit.value.code == 2
+    assert error in capsys.readouterr().err
+    assert not runs
+
+
+def test_list(runs, capsys):
+    cli.main(['list', '--table', 'lineitem'])
+    assert capsys.readouterr().out.split() == ['TPCH', 'lineitem', '100%', 'of', 'rows']
+    assert not runs
+
+
+@pytest.mark.parametrize('url, error', [
+    (None, 'No URL configured for the "warehouse" engine: set WAREHOUSE_URL or pass --local'),
+    ('not a url', 'Invalid WAREHOUSE_URL'),
+])
+def test_warehouse_errors(runs, run_state, monkeypatch, capsys, url, error):
+    if url is None:
+        monkeypatch.delenv('WAREHOUSE_URL')
+    else:
+        monkeypatch.setenv('WAREHOUSE_URL', url)
+    with pytest.raises(SystemExit) as exit:
+        cli.main(['generate', '--dry-run'])
+    assert exit.value.code == 2
+    assert error in capsys.readouterr().err
+    assert not runs
+
+
+def test_snapshot(runs, run_state, tmp_path, capsys):
+    snapshot = str(tmp_path / 'batch.json')
+    cli.main([
+        'snapshot', snapshot, '--table', 'orders', '--seed', '3',
+        '--local', str(tmp_path / 'warehouse.db'),
+    ])
+    assert capsys.readouterr().out == f'Batch snapshot written to {snapshot}\n'
+    batch = BatchSnapshot.read(snapshot)
+    assert batch.seed == 3
+    assert batch.sequences == {'TPCH.orders': 1}
+    assert {table for table, _, _ in batch.key_pools} == {'TPCH.customer'}
+    assert not runs
+
+    with pytest.raises(SystemExit):
+        cli.main(['generate', '--seed', '4', '--snapshot', snapshot])
+    assert '--seed 4 differs from the snapshot seed 3' in capsys.readouterr().err
+
+
+@pytest.mark.parametrize('command', [[], ['run'], ['generate'], ['backfill']])
+def test_help_says_concurrent_writers_are_unsupported(capsys, command):
+    with pytest.raises(SystemExit):
+        cli.build_parser().parse_args(command + ['--help'])
+    assert 'at once is not supported' in ' '.join(capsys.readouterr().out.split())
+
+
+def test_dry_runs_need_an_existing_local_warehouse(runs, run_state, tmp_path, capsys):
+    path = tmp_path / 'warehouse.db'
+    with pytest.raises(SystemExit):
+        cli.main(['generate', '--dry-run', '--local', str(path)])
+    assert 'run without --dry-run first to create it' in capsys.readouterr().err
+    assert not os.listdir(tmp_path)
+    assert not runs
+
+
+def test_dry_runs_dont_write_to_the_local_warehouse(runs, run_state, tmp_path):
+    path = str(tmp_path / 'warehouse.db')
+    cli.main(['generate', '--local', path])
+    files = {name: os.path.getmtime(tmp_path / name) for name in os.listdir(tmp_path)}
+    runs.clear()
+
+    cli.main(['generate', '--dry-run', '--local', path])
+    [call] = runs
+    assert call['dry_run']
+    # No reference rows seeded or tables created, nor anything else written
+    assert {name: os.path.getmtime(tmp_path / name) for name in os.listdir(tmp_path)} == files
+    with pytest.raises(Exception, match='readonly'):
+        with runner.get_warehouse_engine().begin() as conn:
+            conn.exec_driver_sql('delete from "TPCH".nation')
@@ -0,0 +1,77 @@
+# third party
+import factory
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.orm import declarative_base
+
+# first party
+from dbt_faker.db.sequences import sequence_allocator
+from dbt_faker.factories.columnar import factory_to_chunks
+
+
+Base = declarative_base()
+
+
+class Order(Base):
+    __tablename__ = 'orders'
+    o_orderkey = sa.Column(sa.Integer, primary_key=True)
+    o_comment = sa.Column(sa.String)
+    o_orderpriority = sa.Column(sa.String)
+    o_totalprice = sa.Column(sa.Float)
+
+
+class OrderFactory(factory.Factory):
+    class Meta:
+        model = Order
+
+    o_orderkey = factory.Sequence(lambda n: n)
+    o_comment = factory.Faker('sentence')
+    o_orderpriority = factory.Faker('random_element', elements=['1-URGENT', '2-HIGH', '3-LOW'])
+    o_totalprice = factory.Faker('pyfloat', min_value=1, max_value=1000)
+
+
+@pytest.fixture(autouse=True)
+def warehouse(monkeypatch):
+    engine = sa.create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(Order.__table__.insert(), {'o_orderkey': 99})
+    monkeypatch.setattr(sequence_allocator, 'engine_getter', lambda: engine)
+    sequence_allocator.reset()
+    yield engine
+    sequence_allocator.reset()
+    engine.dispose()
+
+
+def generate(rows, chunk_rows, seed, shard=(0, 1)):
+    # Every run starts from the same warehouse state
+    sequence_allocator.reset()
+    return list(factory_to_chunks(OrderFactory, rows, chunk_rows, seed=seed, shard=shard))
+
+
+@pytest.mark.parametrize('shards', [2, 3])
+def test_shards_generate_the_rows_of_an_unsharded_run(shards):
+    single = pd.concat(generate(1000, 64, seed=7), ignore_index=True)
+    sharded = pd.concat(
+        [df for i in range(shards) for df in generate(1000, 64, seed=7, shard=(i, shards))]
+    ).sort_values('o_orderkey', ignore_index=True)
+
+    assert single['o_orderkey'].tolist() == list(range(100, 1100))
+    pd.testing.assert_frame_equal(sharded, single)
+
+
+def test_the_seed_decides_the_rows():
+    first = pd.concat(generate(200, 50, seed=7), ignore_index=True)
+    again = pd.concat(generate(200, 50, seed=7), ignore_index=True)
+    other = pd.concat(generate(200, 50, seed=8), ignore_index=True)
+    pd.testing.assert_frame_equal(first, again)
+    assert not first['o_comment'].equals(other['o_comment'])
+
+
+def test_chunks_reserve_the_whole_range():
+    chunks = generate(130, 50, seed=None)
+    assert [len(df) for df in chunks] == [50, 50, 30]
+    assert [df['o_orderkey'].iloc[0] for df in chunks] == [100, 150, 200]
+    assert sequence_allocator.peek(Order) == 230
+    assert generate(130, 50, seed=None, shard=(1, 2))[0]['o_orderkey'].iloc[0] == 150
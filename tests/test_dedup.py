@@ -0,0 +1,87 @@
+# third party
+import numpy as np
+import pandas as pd
+import pytest
+
+# first party
+from dbt_faker.etl.common import dedupe_chunks, timed_dedupe_chunks
+from dbt_faker.etl.dedup import RowHashSet, drop_duplicate_rows, row_hashes
+from dbt_faker.utils.metrics import run_metrics
+
+
+KEYS = [1, -5, 2 ** 31 - 1, 0]
+
+
+@pytest.mark.parametrize('dtype', ['Int32', 'int32', 'int64', 'Int16'])
+def test_row_hashes_dont_depend_on_the_integer_dtype(dtype):
+    keys = KEYS if dtype != 'Int16' else [1, -5, 300, 0]
+    expected = pd.DataFrame({'a': pd.array(keys, dtype='Int64'), 'b': 'x'})
+    df = pd.DataFrame({'a': pd.array(keys, dtype=dtype), 'b': 'x'})
+    assert row_hashes(df, ['a', 'b']).tolist() == row_hashes(expected, ['a', 'b']).tolist()
+
+
+def test_row_hashes_only_hash_the_given_columns():
+    df = pd.DataFrame({'a': [1, 1], 'b': [2, 2], 'c': ['x', 'y']})
+    hashes = row_hashes(df, ['a', 'b'])
+    assert hashes[0] == hashes[1]
+    assert row_hashes(df, ['a', 'c'])[0] != row_hashes(df, ['a', 'c'])[1]
+
+
+def test_existing_int32_rows_are_duplicates_of_generated_int64_rows():
+    # Rows read back from the warehouse are Int32, generated ones int64
+    existing = pd.DataFrame({
+        'ps_partkey': pd.array([1, 2, -3], dtype='Int32'),
+        'ps_suppkey': pd.array([10, 20, 30], dtype='Int32'),
+    })
+    seen = RowHashSet()
+    seen.add(row_hashes(existing, ['ps_partkey', 'ps_suppkey']))
+
+    chunk = pd.DataFrame({
+        'ps_partkey': np.array([1, -3, 4, 4], dtype='int64'),
+        'ps_suppkey': np.array([10, 30, 40, 40], dtype='int64'),
+    })
+    keep = seen.new_rows(chunk, ['ps_partkey', 'ps_suppkey'])
+    assert keep.tolist() == [False, False, True, False]
+    assert len(seen) == 4
+
+
+def test_dedupe_chunks_drops_duplicates_across_chunks():
+    columns = ['a', 'b']
+    chunks = [
+        pd.DataFrame({'a': [1, 2, 2], 'b': [1, 2, 2], 'c': [0, 1, 2]}),
+        pd.DataFrame({'a': pd.array([2, 3], dtype='Int32'), 'b': [2, 3], 'c': [3, 4]}),
+        pd.DataFrame({'a': [], 'b': [], 'c': []}),
+        pd.DataFrame({'a': [1, 4], 'b': [1, 4], 'c': [5, 6]}),
+    ]
+    deduped = pd.concat([df for df in dedupe_chunks(iter(chunks), columns) if len(df)])
+    assert deduped['c'].tolist() == [0, 1, 4, 6]
+
+
+@pytest.mark.parametrize('unique_subset, stages', [
+    (None, ['generate']),
+    (['a'], ['dedup', 'generate']),
+])
+def test_only_tables_with_a_unique_subset_have_a_dedup_stage(unique_subset, stages):
+    run_metrics.reset()
+    chunks = [pd.DataFrame({'a': [1, 1]}), pd.DataFrame({'a': [2, 1]})]
+    deduped = list(timed_dedupe_chunks(iter(chunks), 'T.t', unique_subset))
+    assert sum(len(df) for df in deduped) == (4 if unique_subset is None else 2)
+    assert [stage['stage'] for stage in run_metrics.report()['stages']] == stages
+    run_metrics.reset()
+
+
+def test_hash_set_finds_hashes_across_merged_runs():
+    seen = RowHashSet()
+    rng = np.random.default_rng(1)
+    added = [rng.integers(0, 2 ** 63, size=size, dtype=np.uint64) for size in (1, 5, 2, 64, 3, 0)]
+    for hashes in added:
+        seen.add(hashes)
+    everything = np.concatenate(added)
+    assert seen.contains(everything).all()
+    assert not seen.contains(everything + np.uint64(1)).any()
+
+
+def test_drop_duplicate_rows_without_columns_keeps_every_row():
+    df = pd.DataFrame({'a': [1, 1]})
+    assert drop_duplicate_rows(df) is df
+    assert drop_duplicate_rows(df, ['a'])['a'].tolist() == [1]
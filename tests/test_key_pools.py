@@ -0,0 +1,107 @@
+# third party
+import pytest
+
+# first party
+from dbt_faker.factories.key_pools import KeyPoolCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def model(name):
+    return type(name, (), {'__tablename__': name, '__table_args__': {'schema': 'TEST'}})
+
+
+Customer = model('customer')
+Orders = model('orders')
+Part = model('part')
+
+
+class Loader:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, model, primary_key, sample):
+        self.calls.append(model.__tablename__)
+        return range(sample)
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def loader():
+    return Loader()
+
+
+def test_pools_are_loaded_once_until_they_expire(clock, loader):
+    cache = KeyPoolCache(ttl=60, clock=clock)
+    assert len(cache.get(Customer, 'id', 10, loader)) == 10
+    clock.now = 59
+    cache.get(Customer, 'id', 10, loader)
+    assert loader.calls == ['customer']
+
+    clock.now = 61
+    cache.get(Customer, 'id', 10, loader)
+    assert loader.calls == ['customer', 'customer']
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (1, 2)
+    assert stats['keys'] == 10
+
+
+def test_models_can_have_their_own_ttl(clock, loader):
+    cache = KeyPoolCache(ttl=60, clock=clock)
+    cache.set_ttl(Orders, 5)
+    cache.get(Customer, 'id', 10, loader)
+    cache.get(Orders, 'id', 10, loader)
+    clock.now = 10
+    cache.get(Customer, 'id', 10, loader)
+    cache.get(Orders, 'id', 10, loader)
+    assert loader.calls == ['customer', 'orders', 'orders']
+
+
+def test_sample_sizes_are_pooled_apart(clock, loader):
+    cache = KeyPoolCache(clock=clock)
+    assert len(cache.get(Customer, 'id', 10, loader)) == 10
+    assert len(cache.get(Customer, 'id', 20, loader)) == 20
+    assert len(loader.calls) == 2
+
+
+def test_least_recently_used_pools_are_evicted_first(clock, loader):
+    cache = KeyPoolCache(max_keys=25, clock=clock)
+    cache.get(Customer, 'id', 10, loader)
+    cache.get(Orders, 'id', 10, loader)
+    cache.get(Customer, 'id', 10, loader)
+    cache.get(Part, 'id', 10, loader)
+
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['keys'] == 20
+    assert set(stats['pools']) == {'TEST.customer.id (10)', 'TEST.part.id (10)'}
+
+
+def test_a_pool_larger_than_the_cache_is_still_returned(clock, loader):
+    cache = KeyPoolCache(max_keys=5, clock=clock)
+    cache.get(Customer, 'id', 3, loader)
+    assert len(cache.get(Orders, 'id', 10, loader)) == 10
+    assert set(cache.stats()['pools']) == {'TEST.orders.id (10)'}
+
+
+def test_invalidate_drops_pools(clock, loader):
+    cache = KeyPoolCache(clock=clock)
+    cache.get(Customer, 'id', 10, loader)
+    cache.get(Orders, 'id', 10, loader)
+    cache.invalidate(Customer)
+    cache.get(Customer, 'id', 10, loader)
+    cache.get(Orders, 'id', 10, loader)
+    assert loader.calls == ['customer', 'orders', 'customer']
+
+    cache.invalidate()
+    assert cache.stats()['keys'] == 0
@@ -0,0 +1,83 @@
+# third party
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+
+# first party
+from dbt_faker.etl import loaders
+from dbt_faker.etl.loaders import get_loader, stage_loader, to_sql_loader
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(loaders, '_staging_failed', set())
+    engine = sa.create_engine('sqlite://')
+    with engine.begin() as conn:
+        conn.exec_driver_sql('create table orders (id integer, status text, placed timestamp)')
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        'id': [1, 2, 3],
+        'status': ['O', 'F', None],
+        'placed': pd.to_datetime(
+            ['2024-01-01 10:00:00', '2024-01-02 00:00:00', '2024-01-03 23:59:59']
+        ),
+    })
+
+
+def table_rows(engine):
+    with engine.connect() as conn:
+        return conn.exec_driver_sql('select id, status from orders order by id').fetchall()
+
+
+@pytest.mark.parametrize('file_format', ['parquet', 'csv'])
+def test_stage_loader_copies_the_staged_file_in(engine, df, file_format):
+    stage_loader(df, engine, 'orders', None, file_format=file_format)
+    stage_loader(df.iloc[:1], engine, 'orders', None, file_format=file_format)
+    assert table_rows(engine) == [(1, 'O'), (1, 'O'), (2, 'F'), (3, None)]
+
+
+def test_stage_loader_keeps_timestamps(engine, df):
+    stage_loader(df, engine, 'orders', None)
+    with engine.connect() as conn:
+        placed = conn.exec_driver_sql('select placed from orders order by id').scalars().all()
+    assert pd.to_datetime(placed).tolist() == df['placed'].tolist()
+
+
+def test_stage_loader_uses_to_sql_to_replace_tables(engine, df):
+    stage_loader(df, engine, 'orders', None)
+    stage_loader(df.iloc[:2], engine, 'orders', None, if_exists='replace')
+    assert table_rows(engine) == [(1, 'O'), (2, 'F')]
+
+
+def test_failed_copies_are_rolled_back_and_loaded_with_to_sql(engine, df, monkeypatch):
+    copies = []
+
+    def failing_copier(conn, path, columns, table, schema):
+        copies.append(path)
+        conn.exec_driver_sql("insert into orders (id, status) values (99, 'X')")
+        raise sa.exc.OperationalError('put', {}, Exception('no privileges on stage'))
+
+    monkeypatch.setitem(loaders.STAGE_COPIERS, 'sqlite', failing_copier)
+    stage_loader(df, engine, 'orders', None)
+    stage_loader(df.iloc[:1], engine, 'orders', None)
+
+    # Later chunks of the table don't try staging again
+    assert len(copies) == 1
+    assert table_rows(engine) == [(1, 'O'), (1, 'O'), (2, 'F'), (3, None)]
+
+
+def test_to_sql_loader_appends(engine, df):
+    to_sql_loader(df, engine, 'orders', None)
+    assert len(table_rows(engine)) == 3
+
+
+def test_loaders_are_found_by_name():
+    assert get_loader('stage') is stage_loader
+    assert get_loader('to_sql') is to_sql_loader
+    with pytest.raises(ValueError, match='Unknown loader "copy"'):
+        get_loader('copy')
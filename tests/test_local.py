@@ -0,0 +1,121 @@
+# third party
+import pytest
+import sqlalchemy as sa
+
+# first party
+from dbt_faker.db.base import get_warehouse_engine
+from dbt_faker.db.local import SQLITE_BUSY_TIMEOUT_MS, local_backend, use_local_warehouse
+from dbt_faker.etl.tpch import tpch_etl
+from dbt_faker.main import run, seed_reference_tables, source_models
+
+
+# Child column, parent table and parent key of the TPCH foreign keys
+FOREIGN_KEYS = [
+    ('nation', 'n_regionkey', 'region', 'r_regionkey'),
+    ('customer', 'c_nationkey', 'nation', 'n_nationkey'),
+    ('supplier', 's_nationkey', 'nation', 'n_nationkey'),
+    ('partsupp', 'ps_partkey', 'part', 'p_partkey'),
+    ('partsupp', 'ps_suppkey', 'supplier', 's_suppkey'),
+    ('orders', 'o_custkey', 'customer', 'c_custkey'),
+    ('lineitem', 'l_orderkey', 'orders', 'o_orderkey'),
+    ('lineitem', 'l_partkey', 'part', 'p_partkey'),
+    ('lineitem', 'l_suppkey', 'supplier', 's_suppkey'),
+]
+
+
+def count(conn, sql):
+    return conn.exec_driver_sql(sql).scalar()
+
+
+@pytest.mark.parametrize('path, backend', [
+    ('dev.duckdb', 'duckdb'),
+    ('dev.db', 'sqlite'),
+    ('dev.SQLITE3', 'sqlite'),
+])
+def test_backends(path, backend):
+    assert local_backend(path) == backend
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match='Unknown local warehouse dev.csv'):
+        local_backend('dev.csv')
+
+
+def test_sqlite_schemas_are_attached_files(tmp_path, run_state):
+    path = tmp_path / 'dev.db'
+    use_local_warehouse(str(path), source_models([tpch_etl]))
+    assert (tmp_path / 'dev.tpch.db').exists()
+
+    inspector = sa.inspect(get_warehouse_engine())
+    assert set(inspector.get_table_names(schema='TPCH')) == {
+        'region', 'nation', 'supplier', 'customer', 'part', 'partsupp', 'orders', 'lineitem'
+    }
+
+
+def test_sqlite_waits_on_other_writers(tmp_path, run_state):
+    use_local_warehouse(str(tmp_path / 'dev.db'), source_models([tpch_etl]))
+    with get_warehouse_engine().connect() as conn:
+        assert count(conn, 'pragma busy_timeout') == SQLITE_BUSY_TIMEOUT_MS
+
+
+@pytest.mark.parametrize('name', ['dev.db', 'dev.duckdb'])
+def test_opening_without_creating(tmp_path, run_state, name):
+    path = str(tmp_path / name)
+    with pytest.raises(ValueError, match='not found'):
+        use_local_warehouse(path, source_models([tpch_etl]), create=False)
+    assert not list(tmp_path.iterdir())
+
+    nation = [orm_config['orm'] for orm_config in tpch_etl['reference_tables']][-1:]
+    use_local_warehouse(path, nation)
+    with pytest.raises(ValueError, match='has no TPCH.region'):
+        use_local_warehouse(path, source_models([tpch_etl]), create=False)
+
+    use_local_warehouse(path, nation, create=False)
+    with get_warehouse_engine().connect() as conn:
+        assert count(conn, 'select count(*) from "TPCH".nation') == 0
+        with pytest.raises(sa.exc.DBAPIError):
+            conn.exec_driver_sql('create table "TPCH".region (r_regionkey int)')
+
+
+@pytest.mark.parametrize('seed', [None, 3])
+@pytest.mark.parametrize('name', ['dev.db', 'dev.duckdb'])
+def test_generate_and_run_on_a_new_warehouse(tmp_path, run_state, name, seed):
+    path = str(tmp_path / name)
+    use_local_warehouse(path, source_models([tpch_etl]))
+    seed_reference_tables([tpch_etl])
+    seed_reference_tables([tpch_etl])
+    # Children draw from the keys of the parents generated before them
+    run(command='generate', selected=[(tpch_etl, tpch_etl['config'])], rows=200, seed=seed)
+
+    run_state()
+    use_local_warehouse(path, source_models([tpch_etl]))
+    run(
+        command='run',
+        selected=[(tpch_etl, tpch_etl['config'])],
+        rows=100,
+        update_cadence=1,
+        seed=seed,
+    )
+
+    with get_warehouse_engine().connect() as conn:
+        assert count(conn, 'select count(*) from "TPCH".region') == 5
+        assert count(conn, 'select count(*) from "TPCH".nation') == 25
+        for table in ['supplier', 'customer', 'part', 'orders', 'lineitem']:
+            assert count(conn, f'select count(*) from "TPCH".{table}') == 300
+        # Pairs already in the warehouse are dropped
+        assert 0 < count(conn, 'select count(*) from "TPCH".partsupp') <= 300
+
+        for child, column, parent, key in FOREIGN_KEYS:
+            orphans = count(conn, f'''
+                select count(*) from "TPCH".{child}
+                where {column} not in (select {key} from "TPCH".{parent})
+            ''')
+            assert orphans == 0, f'{child}.{column}'
+
+
+def test_missing_parents_are_named(tmp_path, run_state):
+    use_local_warehouse(str(tmp_path / 'dev.db'), source_models([tpch_etl]))
+    partsupp = [orm_config for orm_config in tpch_etl['config']
+                if orm_config['orm'].__tablename__ == 'partsupp']
+    with pytest.raises(ValueError, match='No parent keys for TPCH.part to draw from'):
+        run(command='generate', selected=[(tpch_etl, partsupp)], rows=10)
@@ -0,0 +1,32 @@
+# stdlib
+import subprocess
+import sys
+
+# first party
+from dbt_faker.db.metadata import table_registry
+from dbt_faker.orms import tpch
+
+
+def test_importing_the_orms_doesnt_import_pandas():
+    code = 'import sys, dbt_faker.orms.tpch; print("pandas" in sys.modules)'
+    result = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == 'False'
+
+
+def test_table_info():
+    info = table_registry.get(tpch.LineItem)
+    assert info.fullname == 'TPCH.lineitem'
+    assert info.primary_key == 'l_linekey'
+    assert info.referenced_tables == {'orders', 'part', 'supplier'}
+    assert info.bookkeeping_columns == ['_etl_updated_timestamp']
+    assert '_etl_updated_timestamp' not in info.update_columns()[:-1]
+
+
+def test_dtypes():
+    dtypes, parse_dates = table_registry.get(tpch.Order).dtypes(
+        ['o_orderkey', 'o_orderdate']
+    )
+    assert dtypes == {'o_orderkey': 'Int32'}
+    assert parse_dates == ['o_orderdate']
@@ -0,0 +1,115 @@
+# stdlib
+import random
+
+# third party
+import numpy as np
+import pytest
+
+# first party
+from dbt_faker.factories.samplers import (
+    AliasSampler,
+    CombinationSampler,
+    UniformSampler,
+    element_sampler,
+    key_pool_sampler,
+)
+
+
+def test_alias_sampler_follows_the_weights():
+    weights = {'a': .5, 'b': .3, 'c': .2, 'never': 0}
+    sampler = AliasSampler(weights.keys(), list(weights.values()))
+    draws = sampler.draw(np.random.default_rng(1), 200_000)
+    for element, weight in weights.items():
+        assert np.mean(draws == element) == pytest.approx(weight, abs=.01)
+
+
+def test_alias_sampler_draw_one_follows_the_weights():
+    sampler = AliasSampler(['x', 'y'], [9, 1])
+    rand = random.Random(1)
+    draws = [sampler.draw_one(rand) for _ in range(50_000)]
+    assert draws.count('y') / len(draws) == pytest.approx(.1, abs=.01)
+
+
+def test_weighted_elements_get_an_alias_sampler():
+    weights = {'O': 2, 'F': 1}
+    assert isinstance(element_sampler(weights), AliasSampler)
+    assert isinstance(element_sampler(['O', 'F']), UniformSampler)
+    assert element_sampler(weights) is element_sampler(weights)
+
+
+def test_uniform_sampler_draws_every_element():
+    sampler = UniformSampler(['a', 'b', 'c'])
+    assert set(sampler.draw(np.random.default_rng(1), 1000).tolist()) == {'a', 'b', 'c'}
+    rand = random.Random(1)
+    assert {sampler.draw_one(rand) for _ in range(1000)} == {'a', 'b', 'c'}
+
+
+@pytest.mark.parametrize('make_sampler', [
+    lambda values: UniformSampler(values),
+    lambda values: AliasSampler(values, np.ones(len(values))),
+])
+def test_python_elements_are_only_built_for_single_draws(make_sampler):
+    sampler = make_sampler(np.arange(100_000))
+    sampler.draw(np.random.default_rng(1), 10)
+    assert len(sampler) == 100_000
+    assert sampler._elements is None
+
+    drawn = sampler.draw_one(random.Random(1))
+    assert type(drawn) is int
+    assert sampler._elements is not None
+
+
+def test_key_pool_sampler_draws_from_every_pool():
+    sampler = key_pool_sampler(np.array([1, 2]), np.array([], dtype=int), [3])
+    assert isinstance(sampler, UniformSampler)
+    assert set(sampler.draw(np.random.default_rng(1), 1000).tolist()) == {1, 2, 3}
+
+
+def test_empty_key_pool_names_what_is_missing():
+    sampler = key_pool_sampler(np.arange(0), [], what='parent keys for T.x')
+    with pytest.raises(ValueError, match='No parent keys for T.x to draw from'):
+        sampler.draw(np.random.default_rng(), 3)
+    with pytest.raises(ValueError, match='No parent keys for T.x to draw from'):
+        sampler.draw_one()
+
+
+def test_key_pool_sampler_is_rebuilt_when_a_pool_grows():
+    pool = [1, 2]
+    sampler = key_pool_sampler(pool)
+    assert key_pool_sampler(pool) is sampler
+    pool.append(3)
+    assert len(key_pool_sampler(pool)) == 3
+
+
+@pytest.mark.parametrize('sizes', [(1, 1), (7, 11), (3, 5, 4), (97, 2), (10, 300)])
+def test_combinations_dont_repeat_up_to_the_product(sizes):
+    pools = [np.arange(size) * 10 + i for i, size in enumerate(sizes)]
+    sampler = CombinationSampler(pools)
+    assert len(sampler) == np.prod(sizes)
+
+    positions = np.arange(len(sampler))
+    assert sorted(sampler.permute(positions)) == list(positions)
+    combinations = set(zip(*(column.tolist() for column in sampler.take(positions))))
+    assert len(combinations) == len(sampler)
+    for column, pool in zip(sampler.take(positions), pools):
+        assert set(column.tolist()) == set(pool.tolist())
+
+
+def test_combinations_wrap_around_after_the_product():
+    sampler = CombinationSampler([np.arange(5), np.arange(3)])
+    first = sampler.permute(np.arange(15))
+    assert sampler.permute(np.arange(15, 30)).tolist() == first.tolist()
+
+
+def test_combinations_depend_only_on_the_pools():
+    pools = [np.arange(50), np.arange(40)]
+    positions = np.arange(100, 200)
+    first = CombinationSampler(pools).take(positions)
+    again = CombinationSampler([pool.copy() for pool in pools]).take(positions)
+    for a, b in zip(first, again):
+        assert a.tolist() == b.tolist()
+
+
+def test_combinations_of_an_empty_pool_fail():
+    with pytest.raises(ValueError):
+        CombinationSampler([np.arange(3), np.arange(0)])
@@ -0,0 +1,150 @@
+# stdlib
+import threading
+
+# third party
+import factory
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.orm import declarative_base
+
+# first party
+from dbt_faker.etl.scheduler import run_tables, table_dependencies
+from dbt_faker.factories.common import RandomLazyFunction, records_getter
+
+
+Base = declarative_base()
+
+
+class Region(Base):
+    __tablename__ = 'region'
+    id = sa.Column(sa.Integer, primary_key=True)
+
+
+class Nation(Base):
+    # Only linked to region by its foreign key
+    __tablename__ = 'nation'
+    id = sa.Column(sa.Integer, primary_key=True)
+    region_id = sa.Column(sa.Integer, sa.ForeignKey('region.id'))
+
+
+class Customer(Base):
+    # Only linked to nation by the factory drawing nation keys
+    __tablename__ = 'customer'
+    id = sa.Column(sa.Integer, primary_key=True)
+    nation_id = sa.Column(sa.Integer)
+
+
+class Orders(Base):
+    __tablename__ = 'orders'
+    id = sa.Column(sa.Integer, primary_key=True)
+    customer_id = sa.Column(sa.Integer, sa.ForeignKey('customer.id'))
+    nation_id = sa.Column(sa.Integer, sa.ForeignKey('nation.id'))
+
+
+class Audit(Base):
+    __tablename__ = 'audit'
+    id = sa.Column(sa.Integer, primary_key=True)
+
+
+class PlainFactory(factory.Factory):
+    class Meta:
+        model = dict
+
+
+class CustomerFactory(PlainFactory):
+    nation_id = RandomLazyFunction(records_getter(Nation, 'id', 100))
+
+
+def orm_config(orm, factory_class=PlainFactory):
+    return {'orm': orm, 'factory': factory_class}
+
+
+# Children listed before their parents, the order has to come from the keys
+CONFIG = [
+    orm_config(Orders),
+    orm_config(Customer, CustomerFactory),
+    orm_config(Audit),
+    orm_config(Nation),
+    orm_config(Region),
+]
+
+
+def test_dependencies_come_from_foreign_keys_and_key_lookups():
+    assert table_dependencies(CONFIG) == {
+        0: {1, 3},
+        1: {3},
+        2: set(),
+        3: {4},
+        4: set(),
+    }
+
+
+def test_models_outside_the_config_are_ignored():
+    assert table_dependencies([orm_config(Orders), orm_config(Region)]) == {0: set(), 1: set()}
+
+
+@pytest.mark.parametrize('max_workers', [1, 4])
+def test_tables_start_after_what_they_depend_on(max_workers):
+    events = []
+    lock = threading.Lock()
+
+    def run_table(orm_config):
+        table = orm_config['orm'].__tablename__
+        with lock:
+            events.append(('start', table))
+        with lock:
+            events.append(('end', table))
+
+    timings = run_tables(CONFIG, run_table, max_workers=max_workers)
+    assert set(timings) == {'orders', 'customer', 'audit', 'nation', 'region'}
+
+    position = {event: i for i, event in enumerate(events)}
+    for child, parent in [
+        ('nation', 'region'),
+        ('customer', 'nation'),
+        ('orders', 'customer'),
+        ('orders', 'nation'),
+    ]:
+        assert position[('end', parent)] < position[('start', child)]
+
+
+def test_dependents_of_a_failed_table_never_start():
+    started = []
+
+    def run_table(orm_config):
+        started.append(orm_config['orm'].__tablename__)
+        if orm_config['orm'] is Nation:
+            raise RuntimeError('nation failed')
+
+    with pytest.raises(RuntimeError, match='nation failed'):
+        run_tables(CONFIG, run_table, max_workers=1)
+    assert 'customer' not in started
+    assert 'orders' not in started
+
+
+def test_circular_dependencies_are_refused():
+    class RegionFactory(PlainFactory):
+        capital_id = RandomLazyFunction(records_getter(Nation, 'id', 100))
+
+    config = [orm_config(Nation), orm_config(Region, RegionFactory), orm_config(Audit)]
+    with pytest.raises(ValueError, match=r"\['nation', 'region'\]"):
+        run_tables(config, lambda orm_config: None)
+
+
+QualifiedBase = declarative_base(metadata=sa.MetaData(schema='TEST'))
+
+
+class QualifiedRegion(QualifiedBase):
+    __tablename__ = 'region'
+    id = sa.Column(sa.Integer, primary_key=True)
+
+
+class QualifiedNation(QualifiedBase):
+    __tablename__ = 'nation'
+    id = sa.Column(sa.Integer, primary_key=True)
+    region_id = sa.Column(sa.Integer, sa.ForeignKey('TEST.region.id'))
+
+
+def test_schema_qualified_foreign_keys_are_dependencies():
+    config = [orm_config(QualifiedNation), orm_config(QualifiedRegion)]
+    assert table_dependencies(config) == {0: {1}, 1: set()}
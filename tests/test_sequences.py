@@ -0,0 +1,59 @@
+# stdlib
+from concurrent.futures import ThreadPoolExecutor
+
+# third party
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.orm import declarative_base
+
+# first party
+from dbt_faker.db.sequences import SequenceAllocator
+
+
+Base = declarative_base()
+
+
+class Customer(Base):
+    __tablename__ = 'customer'
+    c_custkey = sa.Column(sa.Integer, primary_key=True)
+
+
+class Supplier(Base):
+    __tablename__ = 'supplier'
+    s_suppkey = sa.Column(sa.Integer, primary_key=True)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = sa.create_engine(f'sqlite:///{tmp_path / "warehouse.db"}')
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(Customer.__table__.insert(), [{'c_custkey': 7}, {'c_custkey': 41}])
+    yield engine
+    engine.dispose()
+
+
+def test_reservations_start_after_the_existing_keys(engine):
+    allocator = SequenceAllocator(lambda: engine)
+    assert allocator.peek(Customer) == 42
+    assert allocator.reserve(Customer, 10) == 42
+    assert allocator.reserve(Customer, 5) == 52
+    assert allocator.peek(Customer) == 57
+    assert allocator.reserve(Supplier, 3) == 1
+
+
+def test_concurrent_reservations_dont_overlap(engine):
+    allocator = SequenceAllocator(lambda: engine)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        starts = list(executor.map(lambda _: allocator.reserve(Customer, 100), range(64)))
+    assert sorted(starts) == list(range(42, 42 + 64 * 100, 100))
+
+
+def test_reset_reads_the_warehouse_again(engine):
+    allocator = SequenceAllocator(lambda: engine)
+    allocator.reserve(Customer, 10)
+    with engine.begin() as conn:
+        conn.execute(Customer.__table__.insert(), {'c_custkey': 100})
+    assert allocator.peek(Customer) == 52
+    allocator.reset(Customer)
+    assert allocator.peek(Customer) == 101
@@ -0,0 +1,169 @@
+# stdlib
+import shutil
+import sqlite3
+
+# third party
+import pytest
+
+# first party
+from dbt_faker.db.base import dispose_engines
+from dbt_faker.db.local import use_local_warehouse
+from dbt_faker.db.sequences import sequence_allocator
+from dbt_faker.etl.snapshots import BatchSnapshot
+from dbt_faker.etl.tpch import tpch_etl
+from dbt_faker.factories.key_pools import key_pool_cache, key_registry
+from dbt_faker.main import run, seed_reference_tables, source_models
+
+
+CHUNK_ROWS = 300
+SEED = 7
+SKIPPED_COLUMNS = {'_etl_updated_timestamp'}
+
+
+def use_warehouse(directory):
+    """Start from a clean process state on the local warehouse in
+    ``directory``, as a new shard process would."""
+    dispose_engines()
+    sequence_allocator.reset()
+    key_registry.clear()
+    key_pool_cache.invalidate()
+    use_local_warehouse(str(directory / 'warehouse.db'), source_models([tpch_etl]))
+
+
+def sharded_selection():
+    # Small chunks so every shard gets some of the batch
+    return [(tpch_etl, [
+        dict(orm_config, chunk_rows=CHUNK_ROWS) for orm_config in tpch_etl['config']
+    ])]
+
+
+def run_batch(shard=(0, 1), snapshot=None):
+    run(
+        command='run',
+        selected=sharded_selection(),
+        rows=4 * CHUNK_ROWS,
+        update_cadence=1,
+        seed=SEED,
+        shard=shard,
+        snapshot=snapshot,
+    )
+    dispose_engines()
+
+
+def table_rows(directory, orm_config, skipped=()):
+    """The rows of the table of ``orm_config`` by primary key, without the
+    ``skipped`` columns."""
+    table = orm_config['orm'].__table__
+    primary_key = list(table.primary_key.columns)[0].name
+    columns = [col.name for col in table.c if col.name not in skipped]
+    conn = sqlite3.connect(str(directory / f'warehouse.{table.schema.lower()}.db'))
+    try:
+        query = f'select {primary_key}, {", ".join(columns)} from {table.name}'
+        return {row[0]: row[1:] for row in conn.execute(query)}
+    finally:
+        conn.close()
+
+
+def copy_warehouse(source, directory):
+    for path in source.iterdir():
+        shutil.copy(path, directory)
+    return directory
+
+
+@pytest.fixture(scope='module')
+def base_warehouse(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('base')
+    use_warehouse(directory)
+    seed_reference_tables([tpch_etl])
+    run(command='generate', selected=[(tpch_etl, tpch_etl['config'])], rows=CHUNK_ROWS)
+    dispose_engines()
+    return directory
+
+
+@pytest.fixture(scope='module')
+def runs(base_warehouse, tmp_path_factory):
+    """The same seeded run with updates, unsharded on a copy of the base
+    warehouse, and as two shards run one after the other on another copy.
+    The shards start from a snapshot taken before either of them ran."""
+    single = copy_warehouse(base_warehouse, tmp_path_factory.mktemp('single'))
+    use_warehouse(single)
+    run_batch()
+
+    shared = copy_warehouse(base_warehouse, tmp_path_factory.mktemp('shared'))
+    snapshot_path = str(shared / 'batch.json')
+    use_warehouse(shared)
+    BatchSnapshot.take(sharded_selection(), seed=SEED).write(snapshot_path)
+    dispose_engines()
+
+    after_shard0 = {}
+    for shard in [(0, 2), (1, 2)]:
+        use_warehouse(shared)
+        run_batch(shard, BatchSnapshot.read(snapshot_path))
+        if shard == (0, 2):
+            after_shard0 = {
+                orm_config['orm'].__tablename__: table_rows(shared, orm_config)
+                for orm_config in tpch_etl['config']
+            }
+    return {'single': single, 'shared': shared, 'after_shard0': after_shard0}
+
+
+@pytest.mark.parametrize(
+    'orm_config', tpch_etl['config'], ids=lambda oc: oc['orm'].__tablename__
+)
+def test_shards_on_one_warehouse_insert_the_rows_of_an_unsharded_run(
+    base_warehouse, runs, orm_config
+):
+    # Updates change existing rows at random, leave their columns out
+    skipped = SKIPPED_COLUMNS | set(orm_config.get('update_cols', []))
+    base = table_rows(base_warehouse, orm_config, skipped)
+
+    def new_rows(rows):
+        return {key: row for key, row in rows.items() if key not in base}
+
+    single = new_rows(table_rows(runs['single'], orm_config, skipped))
+    shared = new_rows(table_rows(runs['shared'], orm_config, skipped))
+    shard0 = new_rows(runs['after_shard0'][orm_config['orm'].__tablename__])
+    assert single
+    assert shared == single
+    assert 0 < len(shard0) < len(shared)
+
+
+def test_only_the_first_shard_updates(base_warehouse, runs):
+    updated_by_shard0 = set()
+    for orm_config in tpch_etl['config']:
+        table = orm_config['orm'].__tablename__
+        base = table_rows(base_warehouse, orm_config)
+        after_shard0 = runs['after_shard0'][table]
+        after_shard1 = table_rows(runs['shared'], orm_config)
+        if any(after_shard0[key] != row for key, row in base.items()):
+            updated_by_shard0.add(table)
+        assert all(after_shard1[key] == after_shard0[key] for key in base)
+    # Which rows get updated isn't seeded, only that some do
+    assert updated_by_shard0
+
+
+def test_shards_need_a_snapshot(base_warehouse):
+    use_warehouse(base_warehouse)
+    with pytest.raises(ValueError, match='snapshot'):
+        run_batch((0, 2))
+    dispose_engines()
+
+
+def test_snapshot_round_trips(base_warehouse, tmp_path):
+    use_warehouse(base_warehouse)
+    snapshot = BatchSnapshot.take(sharded_selection(), seed=SEED)
+    dispose_engines()
+    snapshot.write(str(tmp_path / 'batch.json'))
+    read = BatchSnapshot.read(str(tmp_path / 'batch.json'))
+
+    assert read.seed == SEED
+    assert read.sequences == snapshot.sequences
+    orders = next(
+        orm_config for orm_config in tpch_etl['config']
+        if orm_config['orm'].__tablename__ == 'orders'
+    )
+    assert read.sequences['TPCH.orders'] == max(table_rows(base_warehouse, orders)) + 1
+    assert read.key_pools.keys() == snapshot.key_pools.keys()
+    for key, keys in snapshot.key_pools.items():
+        assert read.key_pools[key].dtype == keys.dtype
+        assert read.key_pools[key].tolist() == keys.tolist()
@@ -0,0 +1,95 @@
+# stdlib
+import os
+
+# third party
+import numpy as np
+import pandas as pd
+import pytest
+
+# first party
+from dbt_faker.etl import sinks
+from dbt_faker.etl.sinks import FileSink
+
+
+def orders(rows, day='2024-01-31', start=0):
+    return pd.DataFrame({
+        'o_orderkey': np.arange(start, start + rows),
+        'o_comment': [f'order {i}' for i in range(start, start + rows)],
+        '_etl_updated_timestamp': pd.Timestamp(f'{day} 10:00') + pd.to_timedelta(
+            np.arange(rows), unit='s'
+        ),
+    })
+
+
+def read(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path, compression='gzip')
+
+
+def read_all(paths):
+    df = pd.concat([read(path) for path in paths], ignore_index=True)
+    return df.sort_values('o_orderkey', ignore_index=True)
+
+
+def relative(sink, paths):
+    return sorted(os.path.relpath(path, sink.directory) for path in paths)
+
+
+@pytest.mark.parametrize('file_format', ['parquet', 'csv'])
+def test_rows_are_partitioned_on_their_date(tmp_path, file_format):
+    with FileSink(str(tmp_path), file_format=file_format) as sink:
+        sink.write(orders(5, '2024-01-31'), 'orders', 'TPCH')
+        sink.write(pd.concat([orders(3, '2024-01-31', 5), orders(4, '2024-02-01', 8)]),
+                   'orders', 'TPCH')
+    files = sink.close()
+
+    extension = sinks.FILE_EXTENSIONS[file_format]
+    assert relative(sink, files) == [
+        f'TPCH/orders/etl_updated_timestamp_date=2024-01-31/part-00000-{sink.run_id}.{extension}',
+        f'TPCH/orders/etl_updated_timestamp_date=2024-02-01/part-00000-{sink.run_id}.{extension}',
+    ]
+    assert read_all(files)['o_orderkey'].tolist() == list(range(12))
+    assert len(read(files[0])) == 8
+
+
+def test_tables_without_the_partition_column_arent_partitioned(tmp_path):
+    sink = FileSink(str(tmp_path))
+    sink.write(orders(3).drop(columns='_etl_updated_timestamp'), 'orders', 'TPCH')
+    assert relative(sink, sink.close()) == [f'TPCH/orders/part-00000-{sink.run_id}.parquet']
+
+
+@pytest.mark.parametrize('file_format', ['parquet', 'csv'])
+def test_full_files_are_rolled_over(tmp_path, file_format):
+    # Compressed csv only reaches the disk once the gzip buffer fills up
+    rows = 10_000
+    sink = FileSink(str(tmp_path), file_format=file_format, max_file_bytes=1)
+    for chunk in range(3):
+        assert sink.write(orders(rows, start=chunk * rows), 'orders', 'TPCH') == rows
+    files = sink.close()
+
+    assert len(files) > 1
+    assert [os.path.basename(path).split('-')[1] for path in files] == [
+        f'{i:05d}' for i in range(len(files))
+    ]
+    assert all(len(read(path)) % rows == 0 for path in files)
+    assert read_all(files)['o_orderkey'].tolist() == list(range(3 * rows))
+
+
+def test_csv_without_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setattr(sinks, '_pyarrow_available', lambda: False)
+    sink = FileSink(str(tmp_path))
+    assert sink.file_format == 'csv'
+    sink.write(orders(3), 'orders', 'TPCH')
+    sink.write(orders(2, '2024-02-01', 3), 'orders', 'TPCH')
+    sink.write(orders(2, start=5), 'orders', 'TPCH')
+    files = sink.close()
+
+    assert len(files) == 2
+    assert read(files[0])['o_orderkey'].tolist() == [0, 1, 2, 5, 6]
+    assert read_all(files)['o_orderkey'].tolist() == list(range(7))
+
+
+def test_unsupported_format(tmp_path):
+    with pytest.raises(ValueError, match='Unsupported file format: json'):
+        FileSink(str(tmp_path), file_format='json')
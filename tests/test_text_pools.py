@@ -0,0 +1,44 @@
+# stdlib
+import os
+
+# third party
+import numpy as np
+
+# first party
+from dbt_faker.factories.text_pools import TextPools
+from dbt_faker.utils.metrics import run_metrics
+
+
+def test_pools_are_built_once_and_reloaded(tmp_path):
+    pools = TextPools(str(tmp_path), sizes={'name': 50})
+    values = pools.get('name').values
+    assert len(set(values.tolist())) == 50
+    assert os.path.exists(pools.path('name'))
+
+    reloaded = TextPools(str(tmp_path), sizes={'name': 50}).get('name').values
+    assert isinstance(reloaded, np.memmap)
+    assert reloaded.tolist() == values.tolist()
+
+
+def test_a_new_size_builds_a_new_pool(tmp_path):
+    pools = TextPools(str(tmp_path), sizes={'name': 50})
+    pools.get('name')
+    pools.set_size('name', 20)
+    assert len(pools.get('name')) == 20
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_draws_only_pool_values(tmp_path):
+    pool = TextPools(str(tmp_path), sizes={'bs': 30}).get('bs')
+    drawn = pool.draw(np.random.default_rng(1), 500)
+    assert drawn.dtype == object
+    assert set(drawn.tolist()) <= set(pool.values.tolist())
+
+
+def test_building_is_its_own_stage(tmp_path):
+    run_metrics.reset()
+    TextPools(str(tmp_path), sizes={'name': 50}).get('name')
+    TextPools(str(tmp_path), sizes={'name': 50}).get('name')
+    [stage] = run_metrics.report()['stages']
+    assert (stage['table'], stage['stage'], stage['rows']) == ('text_pools.name', 'build', 50)
+    run_metrics.reset()
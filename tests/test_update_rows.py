@@ -0,0 +1,98 @@
+# stdlib
+import logging
+
+# third party
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+
+# first party
+from dbt_faker import main
+from dbt_faker.db.local import use_local_warehouse
+from dbt_faker.db.metadata import table_registry
+from dbt_faker.etl.common import update_rows
+from dbt_faker.etl.tpch import tpch_etl
+
+
+metadata = sa.MetaData()
+orders = sa.Table(
+    'orders',
+    metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('status', sa.String),
+    sa.Column('price', sa.Float),
+    sa.Column('updated', sa.DateTime),
+)
+
+
+@pytest.fixture
+def engine():
+    engine = sa.create_engine('sqlite://')
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(orders.insert(), [
+            {'id': i, 'status': 'O', 'price': 1.0, 'updated': None} for i in range(1, 6)
+        ])
+    yield engine
+    engine.dispose()
+
+
+def table_rows(engine):
+    with engine.connect() as conn:
+        return conn.execute(
+            sa.select(orders.c.id, orders.c.status, orders.c.price).order_by(orders.c.id)
+        ).fetchall()
+
+
+@pytest.mark.parametrize('batch_rows', [1000, 2])
+def test_only_the_update_columns_of_matching_rows_change(engine, batch_rows):
+    changed = pd.DataFrame({
+        'id': [2, 4, 5, 99],
+        'status': ['F', 'P', 'F', 'F'],
+        'price': [9.0, 9.0, 9.0, 9.0],
+        'updated': pd.to_datetime(['2024-01-02'] * 4),
+    })
+    with engine.begin() as conn:
+        matched = update_rows(
+            conn, orders, changed, 'id', ['status', 'updated'], batch_rows=batch_rows
+        )
+
+    assert matched == 3
+    assert table_rows(engine) == [
+        (1, 'O', 1.0), (2, 'F', 1.0), (3, 'O', 1.0), (4, 'P', 1.0), (5, 'F', 1.0)
+    ]
+    with engine.connect() as conn:
+        updated = conn.execute(
+            sa.select(orders.c.updated).where(orders.c.id == 2)
+        ).scalar_one()
+    assert updated == pd.Timestamp('2024-01-02').to_pydatetime()
+
+
+def test_updates_roll_back_with_the_callers_transaction(engine):
+    changed = pd.DataFrame({'id': [1], 'status': ['F']})
+    with pytest.raises(RuntimeError):
+        with engine.begin() as conn:
+            update_rows(conn, orders, changed, 'id', ['status'])
+            raise RuntimeError
+    assert table_rows(engine)[0] == (1, 'O', 1.0)
+
+
+@pytest.mark.parametrize('matched, message', [
+    (3, 'TPCH.nation table has been updated with 3 of 3 rows matched.'),
+    (-1, 'TPCH.nation table has been updated, 3 rows sent, matched count unknown.'),
+])
+def test_unknown_matched_counts_are_logged_as_such(
+    tmp_path, run_state, monkeypatch, caplog, matched, message
+):
+    engine = use_local_warehouse(str(tmp_path / 'dev.db'), main.source_models([tpch_etl]))
+    main.seed_reference_tables([tpch_etl])
+    monkeypatch.setattr(main, 'update_rows', lambda *args: matched)
+    [nation] = [
+        orm_config for orm_config in tpch_etl['reference_tables']
+        if orm_config['orm'].__tablename__ == 'nation'
+    ]
+    with caplog.at_level(logging.INFO):
+        main._update_table(
+            nation, table_registry.get(nation['orm']).table, engine, rows_to_update=(3, 3)
+        )
+    assert message in caplog.messages